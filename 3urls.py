@@ -11,7 +11,9 @@ Uso:
     python extract_urls_and_secrets.py alvo1 [alvo2 ...] [-o file] [-os file]
 
 Onde “alvo” pode ser:
-    • Caminho para um arquivo local a ser analisado;
+    • Caminho para um arquivo local a ser analisado (também .gz/.bz2/.xz/.zst
+      e tarballs, lidos em fluxo sem extrair);
+    • Um diretório, percorrido recursivamente (--include/--exclude);
     • Uma URL iniciando com http:// ou https://;
     • Um arquivo .txt cujas linhas sejam URLs.
 
@@ -21,15 +23,78 @@ Exemplos:
 
     # Analisa diversos alvos, inclusive lista de URLs
     python extract_urls_and_secrets.py local.js urls.txt https://foo.com/bar.js -o urls.csv -os secrets.tsv
+
+    # Bundles/HARs gigantes: lê em janelas sobrepostas com memória constante
+    python extract_urls_and_secrets.py dump.har --stream --chunk-size 4
+
+    # Lista grande de JS: 32 downloads simultâneos, no máximo 4 por host
+    python extract_urls_and_secrets.py js_urls.txt -w 32 --per-host 4
+
+    # Árvore de fontes extraída: 8 processos, só .js/.ts, sem node_modules
+    python extract_urls_and_secrets.py src_dump/ -j 8 --include '*.js' --include '*.ts' --exclude node_modules
+
+    # Escopo enorme: grava enquanto analisa, dedup em disco, retomável
+    python extract_urls_and_secrets.py js_urls.txt -w 32 --incremental --jsonl achados.jsonl \\
+        --state run.sqlite [--resume]
+
+    # Execução diária: bundles sem mudança vêm do cache (hash/ETag)
+    python extract_urls_and_secrets.py js_urls.txt -w 32 --cache ~/.cache/3urls.sqlite
 """
 
 import argparse
+import bz2
+import codecs
+import contextlib
+import fnmatch
+import gzip
+import hashlib
+import json
+import lzma
+import math
+import mmap
+import os
 import pathlib
 import re
+import sqlite3
 import sys
-import urllib.request
-from collections import OrderedDict
-from typing import Dict, Iterable, List, Set, Tuple
+import tarfile
+import threading
+import time
+import zlib
+from collections import OrderedDict, deque
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import (
+    BinaryIO,
+    Callable,
+    Deque,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Pattern,
+    Sequence,
+    Set,
+    TextIO,
+    Tuple,
+    Union,
+)
+
+try:  # opcionais: Content-Encoding br e arquivos .zst
+    import brotli  # type: ignore
+except ImportError:
+    brotli = None
+try:
+    import zstandard  # type: ignore
+except ImportError:
+    zstandard = None
+
+import requests
+
+import instrumentacao
+from cliente_http import BACKOFF, RETRIES, TIMEOUT, USER_AGENT, ClienteHTTP, charset_de
+from dedup import BLOOM_CAPACITY, BLOOM_FP_RATE, BloomDedup, DiskDedup, MemoryDedup
+from instrumentacao import contar, fase, medir
 
 # ---------------------------------------------------------------------------
 # 1) URLs
@@ -56,6 +121,7 @@ URL_RE = re.compile(
 # 2) Segredos
 # ---------------------------------------------------------------------------
 
+# Ao mudar um padrão, revise também sua âncora em ANCHORS (abaixo).
 SECRET_PATTERNS: Dict[str, str] = OrderedDict(
     {
         "Authorization Bearer": r"Bearer\s+[A-Za-z0-9\-_.=]+",
@@ -70,20 +136,279 @@ SECRET_PATTERNS: Dict[str, str] = OrderedDict(
 
 SECRET_RES = {k: re.compile(v) for k, v in SECRET_PATTERNS.items()}
 
+# (URLs únicas, pares (tipo, valor)) na ordem de extract_urls/extract_secrets
+ScanResult = Tuple[List[str], List[Tuple[str, str]]]
+
+# ---------------------------------------------------------------------------
+# 3) Motor de passada única
+# ---------------------------------------------------------------------------
+
+URL_KEY = "URL"
+
+# Todo match de um padrão começa com um dos prefixos abaixo, dados como pares
+# (primeiros caracteres possíveis, restante do prefixo). Os prefixos viram uma
+# só alternação, que o re percorre em C pulando direto para os caracteres
+# iniciais; em cada posição encontrada só rodam os padrões cujo prefixo começa
+# com aquele caractere. Padrão sem entrada aqui continua com finditer próprio.
+ANCHORS: Dict[str, List[Tuple[str, str]]] = {
+    URL_KEY: [("/", ""), ("hH", r"(?i:ttps?://)"), ("fF", r"(?i:tp://)")],
+    "Authorization Bearer": [("B", "earer")],
+    "Authorization Basic": [("B", "asic")],
+    "JWT": [("e", "y[Jj]")],
+    "AWS Access Key": [("A", "KIA")],
+    "Google API Key": [("A", "Iza")],
+    "Heroku API Key": [("0123456789abcdef", r"(?<![A-Za-z0-9].)[a-f0-9]{31}")],
+    "Generic Secret": [
+        ("aA", r'(?i:pi)[=:\\"\' ]'),
+        ("sS", r'(?i:ecret)[=:\\"\' ]'),
+        ("tT", r'(?i:oken)[=:\\"\' ]'),
+        ("kK", r'(?i:ey)[=:\\"\' ]'),
+    ],
+}
+
+# Índice 0 = URLs; os demais seguem a ordem de SECRET_PATTERNS
+PATTERN_RES: List[Tuple[str, Pattern[str]]] = [(URL_KEY, URL_RE)]
+PATTERN_RES += list(SECRET_RES.items())
+
+
+def _compile_anchors() -> Tuple[Optional[Pattern[str]], Dict[str, List[int]]]:
+    alts: List[str] = []
+    first: Dict[str, List[int]] = {}
+    for i, (name, _) in enumerate(PATTERN_RES):
+        for chars, tail in ANCHORS.get(name, ()):
+            for c in chars:
+                alts.append(re.escape(c) + tail)
+                idxs = first.setdefault(c, [])
+                if i not in idxs:
+                    idxs.append(i)
+    return (re.compile("|".join(alts)) if alts else None), first
+
+
+ANCHOR_RE, FIRST_CHAR = _compile_anchors()
+UNANCHORED = [i for i, (name, _) in enumerate(PATTERN_RES) if name not in ANCHORS]
+
+# ---------------------------------------------------------------------------
+# 4) Leitura em janelas (modo --stream)
+# ---------------------------------------------------------------------------
+
+CHUNK_SIZE = 1 << 20  # 1 MiB por janela (múltiplo de mmap.ALLOCATIONGRANULARITY)
+OVERLAP = 64 << 10  # sobreposição entre janelas = maior match garantido inteiro
+LOOKBEHIND = 16  # contexto mantido antes do ponto de retomada p/ (?<!...)
+
+ACCEPT_ENCODING = "gzip, deflate" + (", br" if brotli is not None else "")
+
+# Orçamento de CPU por padrão: segundos por MB de texto antes de desligá-lo
+# (o normal fica abaixo de 0,05 s/MB). 0 desliga a guarda.
+GUARD_SECONDS_PER_MB = 2.0
+
+
+def configure_guard(seconds_per_mb: float) -> None:
+    """Ajusta a guarda; também usado como initializer do pool de processos."""
+    global GUARD_SECONDS_PER_MB
+    GUARD_SECONDS_PER_MB = seconds_per_mb
+
 
 # ---------------------------------------------------------------------------
 # Funções utilitárias
 # ---------------------------------------------------------------------------
 
 
+class DecodingReader:
+    """
+    Descompressão incremental de um corpo HTTP (Content-Encoding gzip,
+    deflate e, com o pacote brotli, br). ``read(n)`` devolve até ``n`` bytes já
+    descomprimidos, sem nunca descomprimir muito além do que foi pedido.
+    """
+
+    def __init__(self, raw: BinaryIO, encoding: str) -> None:
+        self.raw = raw
+        self.encoding = encoding.strip().lower()
+        if self.encoding in ("gzip", "x-gzip"):
+            self.obj = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        elif self.encoding == "deflate":
+            self.obj = zlib.decompressobj()
+        elif self.encoding == "br" and brotli is not None:
+            self.obj = brotli.Decompressor()
+        else:
+            raise ValueError(f"Content-Encoding não suportado: {encoding}")
+        self.buf = bytearray()
+        self.pending = b""
+        self.started = False
+        self.eof = False
+
+    def _decompress(self, data: bytes, want: int) -> bytes:
+        if self.encoding == "br":
+            return self.obj.process(data)
+        try:
+            out = self.obj.decompress(data, max(want, 1))
+        except zlib.error:
+            if self.encoding != "deflate" or self.started:
+                raise
+            # Muitos servidores mandam "deflate" cru, sem cabeçalho zlib
+            self.obj = zlib.decompressobj(-zlib.MAX_WBITS)
+            out = self.obj.decompress(data, max(want, 1))
+        self.started = True
+        self.pending = self.obj.unconsumed_tail
+        if self.obj.eof and self.obj.unused_data and self.encoding != "deflate":
+            # gzip com vários membros concatenados
+            self.pending = self.obj.unused_data
+            self.obj = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        return out
+
+    def read(self, n: int = -1) -> bytes:
+        if n is None or n < 0:
+            return b"".join(iter(lambda: self.read(CHUNK_SIZE), b""))
+        while len(self.buf) < n and not self.eof:
+            data, self.pending = self.pending, b""
+            if not data:
+                data = self.raw.read(CHUNK_SIZE)
+            if not data:
+                if self.encoding != "br":
+                    self.buf += self.obj.flush()
+                self.eof = True
+                break
+            self.buf += self._decompress(data, n - len(self.buf))
+        out = bytes(self.buf[:n])
+        del self.buf[:n]
+        return out
+
+
+def decoded_body(resp) -> BinaryIO:
+    """O corpo da resposta, descomprimido conforme o Content-Encoding."""
+    encoding = (resp.headers.get("Content-Encoding") or "identity").strip().lower()
+    if encoding == "identity":
+        return resp
+    return DecodingReader(resp, encoding)  # type: ignore[return-value]
+
+
 def fetch_url(url: str) -> str:
     """Baixa o conteúdo de uma URL e devolve str (utf‑8)."""
-    try:
-        with urllib.request.urlopen(url, timeout=15) as resp:
-            charset = resp.headers.get_content_charset() or "utf-8"
-            return resp.read().decode(charset, errors="ignore")
-    except Exception as e:
-        sys.exit(f"Erro baixando {url}: {e}")
+    with open_url(url) as resp:
+        return decoded_body(resp.raw).read().decode(charset_de(resp.headers), errors="ignore")
+
+
+@contextlib.contextmanager
+def open_url(url: str) -> Iterator[requests.Response]:
+    """
+    Abre a URL (aceitando compressão) e devolve a resposta sem ler o corpo.
+    Erros de rede/HTTP sobem ao chamador, que decide se a execução continua.
+    """
+    with http_client().abrir(url) as resp:
+        resp.raise_for_status()
+        yield resp
+
+
+def iter_reader_chunks(
+    reader: BinaryIO, chunk_size: int = CHUNK_SIZE, charset: str = "utf-8"
+) -> Iterator[str]:
+    """Lê ``reader`` em blocos de ``chunk_size`` bytes, já decodificados."""
+    decoder = codecs.getincrementaldecoder(charset)(errors="ignore")
+    while True:
+        block = reader.read(chunk_size)
+        if not block:
+            break
+        yield decoder.decode(block)
+    tail = decoder.decode(b"", final=True)
+    if tail:
+        yield tail
+
+
+def iter_url_chunks(url: str, chunk_size: int = CHUNK_SIZE) -> Iterator[str]:
+    """Lê o corpo da URL em blocos de ``chunk_size`` bytes, já decodificados."""
+    with open_url(url) as resp:
+        yield from iter_reader_chunks(decoded_body(resp.raw), chunk_size, charset_de(resp.headers))
+
+
+# Assinaturas de compressão reconhecidas em arquivos locais
+MAGIC = {
+    b"\x1f\x8b": "gzip",
+    b"BZh": "bz2",
+    b"\xfd7zXZ\x00": "xz",
+    b"\x28\xb5\x2f\xfd": "zstd",
+}
+TAR_SUFFIXES = (".tar", ".tgz", ".tbz2", ".txz", ".tzst")
+
+
+def local_compression(path: pathlib.Path) -> Optional[str]:
+    """gzip/bz2/xz/zstd pelo cabeçalho do arquivo, ou None se não comprimido."""
+    with path.open("rb") as f:
+        head = f.read(6)
+    for magic, kind in MAGIC.items():
+        if head.startswith(magic):
+            return kind
+    return None
+
+
+def is_tar(path: pathlib.Path) -> bool:
+    name = path.name.lower()
+    return name.endswith(TAR_SUFFIXES) or ".tar." in name
+
+
+@contextlib.contextmanager
+def open_local(path: pathlib.Path) -> Iterator[BinaryIO]:
+    """Abre o arquivo local, descomprimindo em fluxo se preciso."""
+    kind = local_compression(path)
+    if kind == "gzip":
+        f: BinaryIO = gzip.open(path, "rb")  # type: ignore[assignment]
+    elif kind == "bz2":
+        f = bz2.open(path, "rb")  # type: ignore[assignment]
+    elif kind == "xz":
+        f = lzma.open(path, "rb")  # type: ignore[assignment]
+    elif kind == "zstd":
+        if zstandard is None:
+            raise RuntimeError(f"{path}: .zst exige o pacote zstandard (pip install zstandard)")
+        raw = path.open("rb")
+        f = zstandard.ZstdDecompressor().stream_reader(raw, closefd=True)
+    else:
+        f = path.open("rb")
+    with f:
+        yield f
+
+
+def iter_tar_members(
+    path: pathlib.Path,
+    chunk_size: int = CHUNK_SIZE,
+    skip: Optional[Callable[[str], bool]] = None,
+) -> Iterator[Tuple[str, Iterator[str]]]:
+    """
+    Percorre um tar (comprimido ou não) em fluxo, sem extrair nada em disco,
+    devolvendo (nome, blocos de texto) para cada arquivo regular. Cada
+    iterador de blocos precisa ser consumido antes de avançar para o próximo.
+    Membros para os quais ``skip("arquivo.tar.gz!membro")`` é verdadeiro são
+    pulados sem serem lidos.
+    """
+    with open_local(path) as f, tarfile.open(fileobj=f, mode="r|") as tf:
+        for member in tf:
+            if not member.isfile():
+                continue
+            if skip is not None and skip(f"{path}!{member.name}"):
+                continue
+            fh = tf.extractfile(member)
+            if fh is not None:
+                yield member.name, iter_reader_chunks(fh, chunk_size)
+
+
+def iter_file_chunks(path: pathlib.Path, chunk_size: int = CHUNK_SIZE) -> Iterator[str]:
+    """
+    Lê um arquivo local via mmap em blocos de ``chunk_size`` bytes (utf-8).
+    As páginas já lidas são devolvidas ao kernel, então o RSS não cresce com
+    o tamanho do arquivo.
+    """
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="ignore")
+    with path.open("rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        if size == 0:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            for off in range(0, size, chunk_size):
+                end = min(off + chunk_size, size)
+                text = decoder.decode(mm[off:end])
+                if hasattr(mm, "madvise"):
+                    mm.madvise(mmap.MADV_DONTNEED, off, end - off)
+                yield text
+    tail = decoder.decode(b"", final=True)
+    if tail:
+        yield tail
 
 
 def extract_urls(text: str) -> List[str]:
@@ -107,35 +432,793 @@ def extract_secrets(text: str) -> List[Tuple[str, str]]:
     return found
 
 
-def iter_targets(targets: Iterable[str]) -> Iterable[Tuple[str, str]]:
+class StreamScanner:
     """
-    Itera sobre cada alvo, devolvendo tuplas (descrição, conteúdo).
-    A descrição é usada para mensagens; o conteúdo, para análise.
+    Aplica URL_RE e SECRET_RES numa única passada sobre o texto, que pode
+    chegar inteiro ou em janelas sobrepostas.
+
+    A passada percorre ANCHOR_RE e, em cada candidato, tenta só os padrões
+    cujo prefixo combina ali; padrões em UNANCHORED usam finditer próprio.
+    Cada padrão guarda a posição absoluta onde sua próxima busca recomeça, o
+    que reproduz exatamente a sequência de matches de ``rx.finditer``.
+
+    Numa janela só são aceitos matches que começam antes do corte (fim da
+    janela - ``overlap``); o que começa depois é procurado de novo na janela
+    seguinte, já com o texto completo. Assim um match que cruza a fronteira é
+    encontrado inteiro e uma única vez. Nas janelas intermediárias cada
+    tentativa enxerga no máximo ``overlap`` caracteres, então matches maiores
+    saem truncados; no texto inteiro (sem --stream) não há esse limite.
+
+    Guarda contra entradas patológicas: o tempo de cada padrão é somado e, se
+    passar de GUARD_SECONDS_PER_MB por MB de texto já analisado, o padrão é
+    desligado para o resto deste alvo e o evento vai para o stderr (e para
+    ``tripped``). Padrões sem âncora só são verificados entre um match e outro.
+
+    O resultado tem a mesma ordem/deduplicação de extract_urls/extract_secrets.
+    """
+
+    def __init__(self, overlap: int = OVERLAP, label: str = "") -> None:
+        self.overlap = overlap
+        self.label = label
+        self.buf = ""
+        self.base = 0  # offset absoluto de buf[0]
+        self.next_pos = [0] * len(PATTERN_RES)
+        self.urls: Dict[str, None] = {}
+        self.found: List[List[str]] = [[] for _ in PATTERN_RES]
+        self.spent = [0.0] * len(PATTERN_RES)
+        self.off = [False] * len(PATTERN_RES)
+        self.tripped: Dict[str, int] = {}
+
+    def _trip(self, i: int, offset: int) -> None:
+        name = PATTERN_RES[i][0]
+        self.off[i] = True
+        self.tripped[name] = offset
+        print(
+            f"[GUARD] {self.label or '<texto>'}: padrão '{name}' desligado no offset"
+            f" {offset} após {self.spent[i]:.1f}s (entrada patológica)",
+            file=sys.stderr,
+        )
+
+    def feed(self, text: str, final: bool = False) -> None:
+        started = time.perf_counter()
+        buf = self.buf + text
+        n = len(buf)
+        cut = n if final else n - self.overlap
+        nxt = [p - self.base for p in self.next_pos]
+        urls, found, spent, off = self.urls, self.found, self.spent, self.off
+        # Só as janelas intermediárias limitam a tentativa ao overlap; no texto
+        # inteiro (ou na última janela) o match vai até onde o padrão for
+        limit = n if final else self.overlap
+        guard = GUARD_SECONDS_PER_MB
+        allowance = guard * max(1.0, (self.base + cut) / 1e6) if guard > 0 else math.inf
+        clock = time.perf_counter
+
+        if ANCHOR_RE is not None:
+            search = ANCHOR_RE.search
+            pos = min(nxt[i] for idxs in FIRST_CHAR.values() for i in idxs)
+            while pos < cut:
+                m = search(buf, pos)
+                if m is None:
+                    break
+                p = m.start()
+                if p >= cut:
+                    break
+                pos = p + 1
+                for i in FIRST_CHAR[buf[p]]:
+                    if p >= nxt[i] and not off[i]:
+                        t0 = clock()
+                        hit = PATTERN_RES[i][1].match(buf, p, p + limit)
+                        spent[i] += clock() - t0
+                        if hit:
+                            if i:
+                                found[i].append(hit.group(0))
+                            else:
+                                urls.setdefault(hit.group(0))
+                            nxt[i] = hit.end()
+                        if spent[i] > allowance:
+                            self._trip(i, self.base + p)
+
+        for i in UNANCHORED:
+            if nxt[i] >= cut or off[i]:
+                continue
+            t0 = clock()
+            for hit in PATTERN_RES[i][1].finditer(buf, nxt[i]):
+                if hit.start() >= cut:
+                    break
+                if i:
+                    found[i].append(hit.group(0))
+                else:
+                    urls.setdefault(hit.group(0))
+                nxt[i] = hit.end()
+                if spent[i] + clock() - t0 > allowance:
+                    break
+            spent[i] += clock() - t0
+            if spent[i] > allowance:
+                self._trip(i, self.base + nxt[i])
+
+        self.next_pos = [self.base + max(p, cut) for p in nxt]
+
+        # Descarta o que nenhum padrão vai revisitar (mantendo o lookbehind)
+        keep = max(0, min(self.next_pos) - self.base - LOOKBEHIND)
+        self.buf = buf[keep:]
+        self.base += keep
+        medir("regex", time.perf_counter() - started)
+        contar("bytes.texto", len(text))
+
+    def close(self) -> None:
+        self.feed("", final=True)
+        self.buf = ""
+
+    def results(self) -> ScanResult:
+        secrets = [
+            (name, v) for (name, _), vals in zip(PATTERN_RES[1:], self.found[1:]) for v in vals
+        ]
+        return list(self.urls), secrets
+
+
+def extract_all(text: str, label: str = "") -> ScanResult:
+    """(extract_urls(text), extract_secrets(text)) numa única passada."""
+    scanner = StreamScanner(label=label)
+    scanner.feed(text, final=True)
+    return scanner.results()
+
+
+def scan_stream(
+    chunks: Iterable[str], overlap: int = OVERLAP, label: str = ""
+) -> ScanResult:
+    """Equivalente a (extract_urls(texto), extract_secrets(texto)) em janelas."""
+    scanner = StreamScanner(overlap, label)
+    for chunk in chunks:
+        scanner.feed(chunk)
+    scanner.close()
+    return scanner.results()
+
+
+def _glob_match(rel: str, globs: Sequence[str]) -> bool:
+    name = rel.rsplit("/", 1)[-1]
+    return any(fnmatch.fnmatchcase(rel, g) or fnmatch.fnmatchcase(name, g) for g in globs)
+
+
+def walk_dir(
+    top: pathlib.Path,
+    include: Sequence[str] = (),
+    exclude: Sequence[str] = (),
+) -> Iterator[pathlib.Path]:
+    """
+    Percorre ``top`` recursivamente em ordem alfabética (ordem determinística).
+    Globs casam com o caminho relativo (a/b.js) ou só com o nome; um diretório
+    que casa com ``exclude`` nem é visitado. Sem ``include``, vale tudo.
     """
+    for root, dirs, files in os.walk(top):
+        rel_root = pathlib.Path(root).relative_to(top).as_posix()
+        prefix = "" if rel_root == "." else rel_root + "/"
+        dirs[:] = sorted(d for d in dirs if not _glob_match(prefix + d, exclude))
+        for name in sorted(files):
+            rel = prefix + name
+            if include and not _glob_match(rel, include):
+                continue
+            if _glob_match(rel, exclude):
+                continue
+            yield pathlib.Path(root, name)
+
+
+def expand_targets(
+    targets: Iterable[str],
+    include: Sequence[str] = (),
+    exclude: Sequence[str] = (),
+    skip: Optional[Callable[[str], bool]] = None,
+) -> Iterator[Union[str, pathlib.Path]]:
+    """
+    Expande os alvos da linha de comando: URLs saem como str, arquivos locais
+    como Path e listas .txt são abertas e lidas linha a linha. Diretórios são
+    percorridos com walk_dir e todo arquivo neles é analisado como conteúdo
+    (um .txt dentro de um diretório não é tratado como lista de URLs).
+    Alvos para os quais ``skip(str(alvo))`` é verdadeiro são omitidos.
+    """
+    for src in _expand_targets(targets, include, exclude):
+        if skip is None or not skip(str(src)):
+            yield src
+
+
+def _expand_targets(
+    targets: Iterable[str], include: Sequence[str], exclude: Sequence[str]
+) -> Iterator[Union[str, pathlib.Path]]:
     for target in targets:
         # URL?
         if re.match(r"^https?://", target, flags=re.I):
-            yield target, fetch_url(target)
+            yield target
             continue
 
         path = pathlib.Path(target)
         if not path.exists():
             sys.exit(f"Alvo '{target}' não existe e não é URL válida.")
 
+        if path.is_dir():
+            yield from walk_dir(path, include, exclude)
+            continue
+
         # Arquivo .txt só com URLs?
         if path.suffix.lower() == ".txt":
             try:
-                for ln in path.read_text(encoding="utf-8", errors="ignore").splitlines():
-                    ln = ln.strip()
-                    if ln and re.match(r"^https?://", ln, flags=re.I):
-                        yield ln, fetch_url(ln)
+                with path.open(encoding="utf-8", errors="ignore") as fh:
+                    for ln in fh:
+                        ln = ln.strip()
+                        if ln and re.match(r"^https?://", ln, flags=re.I):
+                            yield ln
             except Exception as e:
                 sys.exit(f"Erro lendo {path}: {e}")
         else:
+            yield path
+
+
+def iter_targets(
+    targets: Iterable[str],
+    stream: bool = False,
+    chunk_size: int = CHUNK_SIZE,
+    include: Sequence[str] = (),
+    exclude: Sequence[str] = (),
+    skip: Optional[Callable[[str], bool]] = None,
+) -> Iterable[Tuple[str, Union[str, Iterator[str]]]]:
+    """
+    Itera sobre cada alvo, devolvendo tuplas (descrição, conteúdo).
+    A descrição é usada para mensagens; o conteúdo, para análise.
+
+    Com ``stream=True`` o conteúdo é um iterador de blocos de texto, lidos sob
+    demanda (mmap para arquivos locais), em vez da string inteira. Arquivos
+    comprimidos são descomprimidos em fluxo e cada membro de um tar vira um
+    alvo próprio ("arquivo.tar.gz!membro"). Uma URL que falha levanta a
+    exceção de requests (no modo stream, ao consumir os blocos).
+    """
+    for src in expand_targets(targets, include, exclude, skip):
+        yield from _iter_source(src, stream, chunk_size, skip)
+
+
+def _iter_source(
+    src: Union[str, pathlib.Path],
+    stream: bool,
+    chunk_size: int,
+    skip: Optional[Callable[[str], bool]] = None,
+) -> Iterator[Tuple[str, Union[str, Iterator[str]]]]:
+    if isinstance(src, str):
+        if stream:
+            yield src, iter_url_chunks(src, chunk_size)
+        else:
+            yield src, fetch_url(src)
+        return
+
+    try:
+        if is_tar(src):
+            for name, chunks in iter_tar_members(src, chunk_size, skip):
+                yield f"{src}!{name}", (chunks if stream else "".join(chunks))
+            return
+        if local_compression(src) is not None:
+            with open_local(src) as f:
+                if stream:
+                    yield str(src), iter_reader_chunks(f, chunk_size)
+                else:
+                    yield str(src), f.read().decode("utf-8", errors="ignore")
+            return
+        if stream:
+            yield str(src), iter_file_chunks(src, chunk_size)
+        else:
+            yield str(src), src.read_text(encoding="utf-8", errors="ignore")
+    except Exception as e:
+        sys.exit(f"Erro lendo {src}: {e}")
+
+
+def scan_serial(
+    targets: Iterable[str],
+    stream: bool = False,
+    chunk_size: int = CHUNK_SIZE,
+    overlap: int = OVERLAP,
+    include: Sequence[str] = (),
+    exclude: Sequence[str] = (),
+    skip: Optional[Callable[[str], bool]] = None,
+    done: Optional[Callable[[str], None]] = None,
+) -> Iterator[Tuple[str, Optional[ScanResult], Optional[Exception]]]:
+    """
+    Caminho de ``-w 1``: analisa os alvos um a um, na ordem de entrada. Devolve
+    (descrição, resultado, erro) como ``scan_concurrent``; uma URL que falha
+    vira um erro só dela e os demais alvos seguem.
+
+    Um tar rende um resultado por membro; ``done(str(tar))`` é chamado depois
+    do último, para que um --resume pule o arquivo inteiro sem descomprimi-lo.
+    """
+    for src in expand_targets(targets, include, exclude, skip):
+        if isinstance(src, str):
             try:
-                yield str(path), path.read_text(encoding="utf-8", errors="ignore")
+                if stream:
+                    result = scan_stream(iter_url_chunks(src, chunk_size), overlap, src)
+                else:
+                    result = extract_all(fetch_url(src), src)
             except Exception as e:
-                sys.exit(f"Erro lendo {path}: {e}")
+                yield src, None, e
+            else:
+                yield src, result, None
+            continue
+        for desc, content in _iter_source(src, stream, chunk_size, skip):
+            if stream:
+                yield desc, scan_stream(content, overlap, desc), None  # type: ignore[arg-type]
+            else:
+                yield desc, extract_all(content, desc), None  # type: ignore[arg-type]
+        if done is not None and is_tar(src):
+            done(str(src))
+
+
+# ---------------------------------------------------------------------------
+# Download concorrente (modo --workers)
+# ---------------------------------------------------------------------------
+
+PENDING_PER_WORKER = 16  # resultados prontos/aguardando por worker
+HTTP: Optional[ClienteHTTP] = None
+
+
+def configure_http(
+    per_host: int = 4,
+    timeout: float = TIMEOUT,
+    retries: int = RETRIES,
+    rate: Optional[float] = None,
+) -> ClienteHTTP:
+    """
+    Cria o cliente HTTP do processo (cliente_http.ClienteHTTP): conexões
+    keep-alive, cache de DNS, reenvios limitados e no máximo ``per_host``
+    requisições simultâneas (``rate`` por segundo) por host.
+    """
+    global HTTP
+    if HTTP is not None:
+        HTTP.fechar()
+    HTTP = ClienteHTTP(
+        timeout=timeout,
+        retries=retries,
+        backoff=BACKOFF,
+        per_host=per_host,
+        rate=rate,
+        headers={"User-Agent": USER_AGENT, "Accept-Encoding": ACCEPT_ENCODING},
+    )
+    return HTTP
+
+
+def http_client() -> ClienteHTTP:
+    return HTTP or configure_http()
+
+
+# ---------------------------------------------------------------------------
+# Cache de resultados por conteúdo (modo --cache)
+# ---------------------------------------------------------------------------
+
+CACHE_VERSION = 1
+CACHE_MAX_MB = 512
+
+
+def patterns_signature() -> str:
+    """Hash dos padrões ativos; muda quando URL_RE/SECRET_PATTERNS mudam."""
+    spec = [CACHE_VERSION, URL_RE.pattern, URL_RE.flags, list(SECRET_PATTERNS.items())]
+    return hashlib.sha256(json.dumps(spec).encode("utf-8")).hexdigest()
+
+
+def hash_file(path: pathlib.Path, chunk_size: int = CHUNK_SIZE) -> str:
+    h = hashlib.sha256()
+    with path.open("rb") as f:
+        while True:
+            block = f.read(chunk_size)
+            if not block:
+                break
+            h.update(block)
+    return h.hexdigest()
+
+
+class ScanCache:
+    """
+    Cache SQLite de resultados, indexado pelo SHA-256 do conteúdo bruto.
+
+    Também guarda ``ETag``/``Last-Modified`` de cada URL para requisições
+    condicionais: um 304 reaproveita o resultado sem baixar nem analisar de
+    novo. O cache é descartado quando a assinatura dos padrões muda e, ao
+    fechar, as entradas menos usadas são removidas até caber em ``max_bytes``.
+    """
+
+    def __init__(self, path: pathlib.Path, max_bytes: int = CACHE_MAX_MB << 20) -> None:
+        self.path = path
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.not_modified = 0
+        self.db = sqlite3.connect(str(path), check_same_thread=False)
+        self.db.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+            CREATE TABLE IF NOT EXISTS results (
+                hash TEXT PRIMARY KEY, data BLOB, size INTEGER, used REAL
+            );
+            CREATE TABLE IF NOT EXISTS validators (
+                url TEXT PRIMARY KEY, etag TEXT, last_modified TEXT, hash TEXT
+            );
+            """
+        )
+        sig = patterns_signature()
+        row = self.db.execute("SELECT value FROM meta WHERE key = 'signature'").fetchone()
+        if row is None or row[0] != sig:
+            if row is not None:
+                print(f"[cache] Padrões mudaram; descartando {path}")
+            self.clear(sig)
+
+    def clear(self, sig: Optional[str] = None) -> None:
+        with self.lock, self.db:
+            self.db.execute("DELETE FROM results")
+            self.db.execute("DELETE FROM validators")
+            self.db.execute(
+                "INSERT OR REPLACE INTO meta VALUES ('signature', ?)",
+                (sig or patterns_signature(),),
+            )
+
+    def get(self, digest: str) -> Optional[ScanResult]:
+        with self.lock, self.db:
+            row = self.db.execute("SELECT data FROM results WHERE hash = ?", (digest,)).fetchone()
+            if row is None:
+                return None
+            self.db.execute("UPDATE results SET used = ? WHERE hash = ?", (time.time(), digest))
+            self.hits += 1
+        data = json.loads(row[0])
+        return data["urls"], [(t, v) for t, v in data["secrets"]]
+
+    def put(self, digest: str, result: ScanResult) -> None:
+        urls, secrets = result
+        data = json.dumps({"urls": urls, "secrets": secrets}).encode("utf-8")
+        with self.lock, self.db:
+            self.db.execute(
+                "INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?)",
+                (digest, data, len(data), time.time()),
+            )
+
+    def conditional_headers(self, url: str) -> Dict[str, str]:
+        """If-None-Match/If-Modified-Since, só se o resultado ainda estiver no cache."""
+        with self.lock:
+            row = self.db.execute(
+                "SELECT v.etag, v.last_modified FROM validators v"
+                " JOIN results r ON r.hash = v.hash WHERE v.url = ?",
+                (url,),
+            ).fetchone()
+        headers: Dict[str, str] = {}
+        if row:
+            if row[0]:
+                headers["If-None-Match"] = row[0]
+            if row[1]:
+                headers["If-Modified-Since"] = row[1]
+        return headers
+
+    def not_modified_result(self, url: str) -> Optional[ScanResult]:
+        with self.lock:
+            row = self.db.execute("SELECT hash FROM validators WHERE url = ?", (url,)).fetchone()
+        result = self.get(row[0]) if row else None
+        if result is not None:
+            self.not_modified += 1
+        return result
+
+    def remember(self, url: str, resp: requests.Response, digest: str) -> None:
+        etag, modified = resp.headers.get("ETag"), resp.headers.get("Last-Modified")
+        with self.lock, self.db:
+            if etag or modified:
+                self.db.execute(
+                    "INSERT OR REPLACE INTO validators VALUES (?, ?, ?, ?)",
+                    (url, etag, modified, digest),
+                )
+            else:
+                self.db.execute("DELETE FROM validators WHERE url = ?", (url,))
+
+    def close(self) -> None:
+        """Remove os resultados menos usados até caber em ``max_bytes``."""
+        with self.lock, self.db:
+            total = self.db.execute("SELECT COALESCE(SUM(size), 0) FROM results").fetchone()[0]
+            if total > self.max_bytes:
+                rows = self.db.execute("SELECT hash, size FROM results ORDER BY used DESC")
+                kept = 0
+                evict = []
+                for digest, size in rows:
+                    kept += size
+                    if kept > self.max_bytes:
+                        evict.append((digest,))
+                self.db.executemany("DELETE FROM results WHERE hash = ?", evict)
+                self.db.execute(
+                    "DELETE FROM validators WHERE hash NOT IN (SELECT hash FROM results)"
+                )
+        self.db.close()
+
+
+def scan_file(
+    path: pathlib.Path,
+    stream: bool = False,
+    chunk_size: int = CHUNK_SIZE,
+    overlap: int = OVERLAP,
+) -> ScanResult:
+    """
+    Analisa um arquivo local; função de módulo para rodar no pool de processos.
+    Arquivos comprimidos são lidos em fluxo; num tar, cada membro é analisado
+    à parte e os resultados são unidos na ordem do arquivo.
+    """
+    if is_tar(path):
+        urls: Dict[str, None] = {}
+        secrets: List[Tuple[str, str]] = []
+        for name, chunks in iter_tar_members(path, chunk_size):
+            m_urls, m_secrets = scan_stream(chunks, overlap, f"{path}!{name}")
+            urls.update(dict.fromkeys(m_urls))
+            secrets.extend(m_secrets)
+        return list(urls), secrets
+    if local_compression(path) is not None:
+        with open_local(path) as f:
+            if stream:
+                return scan_stream(iter_reader_chunks(f, chunk_size), overlap, str(path))
+            return extract_all(f.read().decode("utf-8", errors="ignore"), str(path))
+    if stream:
+        return scan_stream(iter_file_chunks(path, chunk_size), overlap, str(path))
+    return extract_all(path.read_text(encoding="utf-8", errors="ignore"), str(path))
+
+
+def scan_source(
+    src: Union[str, pathlib.Path],
+    client: ClienteHTTP,
+    stream: bool = False,
+    chunk_size: int = CHUNK_SIZE,
+    overlap: int = OVERLAP,
+    cache: Optional[ScanCache] = None,
+    procs: Optional[Executor] = None,
+) -> ScanResult:
+    """
+    Baixa/lê um alvo já expandido e o analisa assim que o corpo chega.
+    Com ``cache``, conteúdo já visto (mesmo hash ou 304) não é analisado de novo;
+    com ``procs``, a análise de arquivos locais roda no pool de processos.
+    """
+    if isinstance(src, pathlib.Path):
+        digest = hash_file(src, chunk_size) if cache else ""
+        result = cache.get(digest) if cache else None
+        if result is not None:
+            return result
+        if procs is not None:
+            result = procs.submit(scan_file, src, stream, chunk_size, overlap).result()
+        else:
+            result = scan_file(src, stream, chunk_size, overlap)
+        if cache:
+            cache.put(digest, result)
+        return result
+
+    headers = cache.conditional_headers(src) if cache else {}
+    while True:
+        with client.abrir(src, headers=headers) as resp:
+            if resp.status_code == 304 and cache:
+                result = cache.not_modified_result(src)
+                if result is not None:
+                    return result
+                headers = {}  # resultado sumiu do cache: baixa de novo
+                continue
+
+            resp.raise_for_status()
+            charset = charset_de(resp.headers)
+            reader = decoded_body(resp.raw)
+            if not stream:
+                body = reader.read()
+                digest = hashlib.sha256(body).hexdigest()
+                result = cache.get(digest) if cache else None
+                if result is None:
+                    result = extract_all(body.decode(charset, errors="ignore"), src)
+            else:
+                # No modo stream o hash só fica pronto no fim; a análise segue junto
+                h = hashlib.sha256()
+                decoder = codecs.getincrementaldecoder(charset)(errors="ignore")
+                scanner = StreamScanner(overlap, src)
+                while True:
+                    block = reader.read(chunk_size)
+                    if not block:
+                        break
+                    h.update(block)
+                    scanner.feed(decoder.decode(block))
+                scanner.feed(decoder.decode(b"", final=True))
+                scanner.close()
+                digest, result = h.hexdigest(), scanner.results()
+
+            if cache:
+                cache.put(digest, result)
+                cache.remember(src, resp, digest)
+            return result
+
+
+def scan_concurrent(
+    targets: Iterable[str],
+    workers: int,
+    stream: bool = False,
+    chunk_size: int = CHUNK_SIZE,
+    overlap: int = OVERLAP,
+    cache: Optional[ScanCache] = None,
+    jobs: int = 1,
+    include: Sequence[str] = (),
+    exclude: Sequence[str] = (),
+    skip: Optional[Callable[[str], bool]] = None,
+) -> Iterator[Tuple[str, Optional[ScanResult], Optional[Exception]]]:
+    """
+    Analisa os alvos num pool de ``workers`` threads, com conexões reaproveitadas.
+    Cada worker extrai URLs/segredos assim que o corpo chega; os resultados
+    são devolvidos na ordem de entrada como (descrição, resultado, erro), e
+    uma falha afeta só a própria URL.
+
+    Com ``jobs`` > 1, arquivos locais (inclusive os de diretórios) são
+    analisados num pool de processos, já que o re não libera o GIL.
+    """
+    client = http_client()
+    procs = None
+    if jobs > 1:
+        procs = ProcessPoolExecutor(
+            max_workers=jobs, initializer=configure_guard, initargs=(GUARD_SECONDS_PER_MB,)
+        )
+    window = max(1, workers, jobs) * PENDING_PER_WORKER
+    pending: Deque[Tuple[str, "Future[ScanResult]"]] = deque()
+
+    def drain() -> Tuple[str, Optional[ScanResult], Optional[Exception]]:
+        desc, fut = pending.popleft()
+        try:
+            return desc, fut.result(), None
+        except Exception as e:
+            return desc, None, e
+
+    try:
+        with ThreadPoolExecutor(max_workers=max(workers, jobs)) as ex:
+            for src in expand_targets(targets, include, exclude, skip):
+                if procs is not None and cache is None and isinstance(src, pathlib.Path):
+                    fut = procs.submit(scan_file, src, stream, chunk_size, overlap)
+                else:
+                    fut = ex.submit(
+                        scan_source, src, client, stream, chunk_size, overlap, cache, procs
+                    )
+                pending.append((str(src), fut))
+                if len(pending) >= window:
+                    yield drain()
+            while pending:
+                yield drain()
+    finally:
+        if procs is not None:
+            procs.shutdown(cancel_futures=True)
+
+
+# ---------------------------------------------------------------------------
+# Saída incremental com deduplicação limitada (modo --incremental)
+# ---------------------------------------------------------------------------
+
+CHECKPOINT_SECONDS = 5.0
+
+
+def mask_secret(t: str, v: str) -> str:
+    return v if t.startswith("Authorization") else v[:6] + "..." + v[-4:]
+
+
+def _finding_key(kind: str, value: str) -> bytes:
+    return hashlib.blake2b(f"{kind}\0{value}".encode("utf-8"), digest_size=16).digest()
+
+
+class RunState:
+    """
+    Estado persistente de uma execução (SQLite): alvos concluídos, tamanho de
+    cada saída no último checkpoint e, com --dedup disk/bloom, o conjunto de
+    achados já emitidos. Tudo é gravado no mesmo commit, então um --resume
+    trunca as saídas de volta ao último checkpoint e segue sem repetir linhas.
+    """
+
+    def __init__(self, path: pathlib.Path) -> None:
+        self.db = sqlite3.connect(str(path))
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value);
+            CREATE TABLE IF NOT EXISTS done (target TEXT PRIMARY KEY) WITHOUT ROWID;
+            CREATE TABLE IF NOT EXISTS outputs (path TEXT PRIMARY KEY, size INTEGER);
+            """
+        )
+
+    def reset(self) -> None:
+        with self.db:
+            for table in ("meta", "done", "outputs"):
+                self.db.execute(f"DELETE FROM {table}")
+            self.db.execute("DROP TABLE IF EXISTS seen")
+
+    def is_done(self, target: str) -> bool:
+        return self.db.execute("SELECT 1 FROM done WHERE target = ?", (target,)).fetchone() is not None
+
+    def output_size(self, path: pathlib.Path) -> Optional[int]:
+        row = self.db.execute("SELECT size FROM outputs WHERE path = ?", (str(path),)).fetchone()
+        return row[0] if row else None
+
+
+class FindingsWriter:
+    """
+    Grava URLs (-o), segredos (-os, TSV) e/ou JSONL à medida que cada alvo é
+    analisado, deduplicando entre alvos com ``dedup``. Sem arquivo de saída,
+    as linhas vão para o stdout (segredos mascarados). Os arquivos recebem
+    flush a cada checkpoint (``flush_every`` segundos e no fim).
+    """
+
+    def __init__(
+        self,
+        out_urls: Optional[pathlib.Path],
+        out_secrets: Optional[pathlib.Path],
+        out_jsonl: Optional[pathlib.Path],
+        dedup: Union[MemoryDedup, DiskDedup, BloomDedup],
+        state: Optional[RunState] = None,
+        resume: bool = False,
+        flush_every: float = CHECKPOINT_SECONDS,
+    ) -> None:
+        self.dedup = dedup
+        self.state = state
+        self.flush_every = flush_every
+        self.last_checkpoint = time.monotonic()
+        self.pending_done: List[str] = []
+        self.new_urls = 0
+        self.new_secrets = 0
+        self.files: Dict[str, TextIO] = {}
+        for kind, path in (("urls", out_urls), ("secrets", out_secrets), ("jsonl", out_jsonl)):
+            if path is not None:
+                self.files[kind] = self._open(path, resume)
+
+    def _open(self, path: pathlib.Path, resume: bool) -> TextIO:
+        size = self.state.output_size(path) if (self.state and resume) else None
+        if size is None or not path.exists():
+            return path.open("w", encoding="utf-8")
+        # Descarta o que foi escrito depois do último checkpoint
+        with path.open("r+b") as f:
+            f.truncate(size)
+        return path.open("a", encoding="utf-8")
+
+    def write(self, desc: str, urls: Iterable[str], secrets: Iterable[Tuple[str, str]]) -> None:
+        started = time.perf_counter()
+        add = self.dedup.add
+        f_urls, f_secrets, f_jsonl = (self.files.get(k) for k in ("urls", "secrets", "jsonl"))
+        for url in urls:
+            if not add(_finding_key("url", url)):
+                continue
+            self.new_urls += 1
+            if f_jsonl:
+                f_jsonl.write(json.dumps({"source": desc, "kind": "url", "value": url}) + "\n")
+            if f_urls:
+                f_urls.write(url + "\n")
+            elif not f_jsonl:
+                print(url)
+        for t, v in secrets:
+            if not add(_finding_key(t, v)):
+                continue
+            self.new_secrets += 1
+            if f_jsonl:
+                rec = {"source": desc, "kind": "secret", "type": t, "value": v}
+                f_jsonl.write(json.dumps(rec) + "\n")
+            if f_secrets:
+                f_secrets.write(f"{t}\t{v}\n")
+            elif not f_jsonl:
+                print(f"[{t}] {mask_secret(t, v)}")
+        self.mark_done(desc)
+        medir("escrita", time.perf_counter() - started)
+
+    def mark_done(self, target: str) -> None:
+        """Marca ``target`` como concluído; entra no próximo checkpoint."""
+        self.pending_done.append(target)
+        if time.monotonic() - self.last_checkpoint >= self.flush_every:
+            self.checkpoint()
+
+    def checkpoint(self) -> None:
+        for f in self.files.values():
+            f.flush()
+            os.fsync(f.fileno())
+        self.dedup.save()
+        if self.state is not None:
+            with self.state.db as db:
+                db.executemany(
+                    "INSERT OR IGNORE INTO done VALUES (?)", ((d,) for d in self.pending_done)
+                )
+                db.executemany(
+                    "INSERT OR REPLACE INTO outputs VALUES (?, ?)",
+                    ((f.name, f.tell()) for f in self.files.values()),
+                )
+        self.pending_done.clear()
+        self.last_checkpoint = time.monotonic()
+
+    def close(self) -> None:
+        self.checkpoint()
+        for f in self.files.values():
+            f.close()
 
 
 def main() -> None:
@@ -145,24 +1228,261 @@ def main() -> None:
     ap.add_argument(
         "targets",
         nargs="+",
-        help="Arquivo(s), URL(s) ou .txt com linhas de URLs a processar",
+        help="Arquivo(s), diretório(s), URL(s) ou .txt com linhas de URLs a processar",
     )
     ap.add_argument("-o", "--out-urls", type=pathlib.Path, help="Saída só de URLs")
     ap.add_argument(
         "-os", "--out-secrets", type=pathlib.Path, help="Saída só de segredos"
     )
+    ap.add_argument(
+        "--stream",
+        action="store_true",
+        help="Lê arquivos/respostas em janelas sobrepostas (memória constante)",
+    )
+    ap.add_argument(
+        "--chunk-size",
+        type=int,
+        default=CHUNK_SIZE >> 20,
+        help="Tamanho da janela em MiB no modo --stream (padrão: 1)",
+    )
+    ap.add_argument(
+        "--overlap",
+        type=int,
+        default=OVERLAP >> 10,
+        help="Sobreposição entre janelas em KiB = maior match garantido (padrão: 64)",
+    )
+    ap.add_argument(
+        "--guard",
+        type=float,
+        default=GUARD_SECONDS_PER_MB,
+        help="Desliga, no alvo, o padrão que gastar mais que N s por MB de texto"
+        f" (entrada patológica; 0 = sem guarda; padrão: {GUARD_SECONDS_PER_MB:g})",
+    )
+    ap.add_argument(
+        "-w",
+        "--workers",
+        type=int,
+        default=1,
+        help="Downloads/análises simultâneos com conexões reaproveitadas (padrão: 1 = serial)",
+    )
+    ap.add_argument(
+        "--per-host",
+        type=int,
+        default=4,
+        help="Máximo de requisições simultâneas por host (padrão: 4)",
+    )
+    ap.add_argument(
+        "--rate",
+        type=float,
+        metavar="REQ/S",
+        help="Máximo de requisições por segundo a cada host (padrão: sem limite)",
+    )
+    ap.add_argument(
+        "--timeout",
+        type=float,
+        default=TIMEOUT,
+        help=f"Timeout de leitura de cada requisição, em segundos (padrão: {TIMEOUT:g})",
+    )
+    ap.add_argument(
+        "--retries",
+        type=int,
+        default=RETRIES,
+        help=f"Reenvios em falha de conexão ou 429/5xx transitório (padrão: {RETRIES})",
+    )
+    ap.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=1,
+        help="Processos para analisar arquivos locais/diretórios (padrão: 1)",
+    )
+    ap.add_argument(
+        "--include",
+        action="append",
+        default=[],
+        metavar="GLOB",
+        help="Em diretórios, só arquivos que casam com o glob (repetível, ex.: '*.js')",
+    )
+    ap.add_argument(
+        "--exclude",
+        action="append",
+        default=[],
+        metavar="GLOB",
+        help="Em diretórios, ignora arquivos/pastas que casam com o glob (repetível)",
+    )
+    ap.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Grava/emite os achados já deduplicados enquanto analisa, com checkpoints",
+    )
+    ap.add_argument(
+        "--jsonl",
+        type=pathlib.Path,
+        help="Com --incremental: saída JSONL (source, kind, type, value) de URLs e segredos",
+    )
+    ap.add_argument(
+        "--dedup",
+        choices=("memory", "disk", "bloom"),
+        help="Deduplicação no modo --incremental: memory (exata), disk (exata, SQLite"
+        " em --state) ou bloom (memória fixa, com falsos positivos; padrão: memory,"
+        " ou disk com --state)",
+    )
+    ap.add_argument(
+        "--bloom-capacity",
+        type=int,
+        default=BLOOM_CAPACITY,
+        help=f"Achados previstos para --dedup bloom (padrão: {BLOOM_CAPACITY})",
+    )
+    ap.add_argument(
+        "--bloom-fp",
+        type=float,
+        default=BLOOM_FP_RATE,
+        help=f"Taxa de falso positivo do --dedup bloom até a capacidade (padrão: {BLOOM_FP_RATE})",
+    )
+    ap.add_argument(
+        "--state",
+        type=pathlib.Path,
+        help="SQLite com alvos concluídos/checkpoints (e o conjunto do --dedup disk)",
+    )
+    ap.add_argument(
+        "--resume",
+        action="store_true",
+        help="Com --state: pula alvos concluídos e continua as saídas do último checkpoint",
+    )
+    ap.add_argument(
+        "--flush-every",
+        type=float,
+        default=CHECKPOINT_SECONDS,
+        help=f"Intervalo entre checkpoints em segundos (padrão: {CHECKPOINT_SECONDS:g})",
+    )
+    ap.add_argument(
+        "--cache",
+        type=pathlib.Path,
+        help="Banco SQLite com resultados por hash de conteúdo e ETag/Last-Modified",
+    )
+    ap.add_argument(
+        "--cache-max-mb",
+        type=int,
+        default=CACHE_MAX_MB,
+        help=f"Tamanho máximo do cache em MiB (padrão: {CACHE_MAX_MB})",
+    )
+    ap.add_argument(
+        "--cache-clear", action="store_true", help="Esvazia o cache antes de começar"
+    )
+    instrumentacao.adicionar_argumentos(ap)
     args = ap.parse_args()
+    instrumentacao.configurar(args, lambda: {"http": http_client().estatisticas()})
+
+    chunk_size = max(1, args.chunk_size) << 20
+    overlap = max(1, args.overlap) << 10
+    if overlap >= chunk_size:
+        ap.error("--overlap precisa ser menor que --chunk-size")
+    configure_guard(max(0.0, args.guard))
+
+    dedup_mode = args.dedup or ("disk" if args.state else "memory")
+    if not args.incremental and (args.jsonl or args.dedup or args.state or args.resume):
+        ap.error("--jsonl/--dedup/--state/--resume exigem --incremental")
+    if args.resume and not args.state:
+        ap.error("--resume exige --state")
+    if dedup_mode == "disk" and not args.state:
+        ap.error("--dedup disk exige --state")
+    if dedup_mode == "memory" and args.state:
+        ap.error("--state exige --dedup disk ou bloom (o conjunto precisa ser persistido)")
+
+    state: Optional[RunState] = None
+    writer: Optional[FindingsWriter] = None
+    if args.incremental:
+        if args.state:
+            state = RunState(args.state)
+            if not args.resume:
+                state.reset()
+        dedup: Union[MemoryDedup, DiskDedup, BloomDedup]
+        if dedup_mode == "disk":
+            dedup = DiskDedup(state.db)
+        elif dedup_mode == "bloom":
+            dedup = BloomDedup(
+                args.bloom_capacity, args.bloom_fp, state.db if state else None
+            )
+        else:
+            dedup = MemoryDedup()
+        writer = FindingsWriter(
+            args.out_urls,
+            args.out_secrets,
+            args.jsonl,
+            dedup,
+            state,
+            args.resume,
+            args.flush_every,
+        )
+    skip = state.is_done if (state and args.resume) else None
 
     all_urls: List[str] = []
     all_secrets: List[Tuple[str, str]] = []
 
-    for desc, content in iter_targets(args.targets):
+    failures = 0
+    cache = ScanCache(args.cache, max(1, args.cache_max_mb) << 20) if args.cache else None
+    if cache and args.cache_clear:
+        cache.clear()
+
+    configure_http(max(1, args.per_host), args.timeout, max(0, args.retries), args.rate)
+
+    # O cache depende do caminho concorrente (validadores HTTP), mesmo com -w 1
+    if args.workers > 1 or args.jobs > 1 or cache:
+        results = scan_concurrent(
+            args.targets,
+            max(1, args.workers),
+            args.stream,
+            chunk_size,
+            overlap,
+            cache,
+            args.jobs,
+            args.include,
+            args.exclude,
+            skip,
+        )
+    else:
+        results = scan_serial(
+            args.targets,
+            args.stream,
+            chunk_size,
+            overlap,
+            args.include,
+            args.exclude,
+            skip,
+            writer.mark_done if writer else None,
+        )
+
+    for desc, found, err in results:
         print(f"--- Analisando {desc} ---")
-        urls = extract_urls(content)
-        secrets = extract_secrets(content)
+        contar("itens.alvos")
+        if found is None:
+            failures += 1
+            contar("itens.erros")
+            print(f"  [ERRO] {err}")
+            continue
+        urls, secrets = found
+        contar("itens.urls", len(urls))
+        contar("itens.segredos", len(secrets))
         print(f"  {len(urls):4d} URL(s) encontradas; {len(secrets):3d} segredo(s).")
-        all_urls.extend(urls)
-        all_secrets.extend(secrets)
+        if writer:
+            writer.write(desc, urls, secrets)
+        else:
+            all_urls.extend(urls)
+            all_secrets.extend(secrets)
+
+    if failures:
+        print(f"{failures} alvo(s) com erro.")
+    if cache:
+        print(
+            f"[cache] {cache.hits} resultado(s) reaproveitado(s),"
+            f" {cache.not_modified} sem download (304)."
+        )
+        cache.close()
+
+    if writer:
+        writer.close()
+        print(f"{writer.new_urls} URL(s) e {writer.new_secrets} segredo(s) novos emitidos.")
+        return
 
     # Deduplicação mantendo ordem
     all_urls = list(dict.fromkeys(all_urls))
@@ -170,7 +1490,8 @@ def main() -> None:
 
     # ---------- URLs ----------
     if args.out_urls:
-        args.out_urls.write_text("\n".join(all_urls), encoding="utf-8")  # \n = quebra de linha
+        with fase("escrita"):
+            args.out_urls.write_text("\n".join(all_urls), encoding="utf-8")  # \n = quebra de linha
         print(f"{len(all_urls)} URL(s) gravadas em {args.out_urls}")
     else:
         print("\n=== URLs ===")
@@ -179,15 +1500,15 @@ def main() -> None:
 
     # ---------- Segredos ----------
     if args.out_secrets:
-        args.out_secrets.write_text(
-            "\n".join(f"{t}\t{v}" for t, v in all_secrets), encoding="utf-8"
-        )
+        with fase("escrita"):
+            args.out_secrets.write_text(
+                "\n".join(f"{t}\t{v}" for t, v in all_secrets), encoding="utf-8"
+            )
         print(f"{len(all_secrets)} segredo(s) gravados em {args.out_secrets}")
     else:
         print("\n=== Segredos ===")
         for t, v in all_secrets:
-            masked = v if t.startswith("Authorization") else v[:6] + "..." + v[-4:]
-            print(f"[{t}] {masked}")
+            print(f"[{t}] {mask_secret(t, v)}")
         print(f"Total: {len(all_secrets)}")
 
 
@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+bench_listing.py ― Benchmark do extrator de listagens do index_of.py.
+
+Gera páginas "Index of" sintéticas nos formatos de Apache (tabela e <pre>),
+nginx, IIS e lighttpd e compara, formato a formato:
+
+* O caminho antigo (BeautifulSoup com html.parser, página inteira em memória)
+  contra ``extrair_entradas`` lendo a página em pedaços de 64 KiB;
+* Tempo e pico de memória (tracemalloc) de cada um;
+* Se os dois devolvem os mesmos href, e quantas entradas tiveram tamanho e
+  data reconhecidos.
+
+Uso:
+    python bench_listing.py
+    python bench_listing.py --entries 100000 --formats nginx iis
+    python bench_listing.py --page listagem.html   # página real salva em disco
+"""
+
+import argparse
+import pathlib
+import random
+import sys
+import time
+import tracemalloc
+from typing import Callable, Dict, Iterator, List, Tuple
+
+import index_of
+
+CHUNK = 1 << 16
+MESES = ('Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec')
+DIAS = ('Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday')
+
+
+def _itens(n: int, seed: int = 7) -> Iterator[Tuple[str, bool, int, time.struct_time]]:
+    rnd = random.Random(seed)
+    for i in range(n):
+        diretorio = rnd.random() < 0.1
+        nome = f"{'pasta' if diretorio else 'arquivo'}_{i:07d}" + ('' if diretorio else rnd.choice(('.txt', '.zip', '.tar.gz', '.sql')))
+        yield nome, diretorio, rnd.randrange(1, 1 << 32), time.gmtime(rnd.randrange(10**9, 17 * 10**8))
+
+
+def _humano(n: int) -> str:
+    for unidade in ('', 'K', 'M', 'G'):
+        if n < 1024:
+            return f"{n}{unidade}" if not unidade else f"{n:.1f}{unidade}"
+        n /= 1024
+    return f"{n:.1f}T"
+
+
+def apache_tabela(n: int) -> str:
+    linhas = ['<html><head><title>Index of /pub</title></head><body><h1>Index of /pub</h1><table>',
+              '<tr><th><a href="?C=N;O=D">Name</a></th><th><a href="?C=M;O=A">Last modified</a></th>'
+              '<th><a href="?C=S;O=A">Size</a></th></tr>',
+              '<tr><td valign="top"><img src="/icons/back.gif" alt="[PARENTDIR]"></td>'
+              '<td><a href="/">Parent Directory</a></td><td>&nbsp;</td><td align="right">  - </td></tr>']
+    for nome, d, tam, t in _itens(n):
+        href = nome + ('/' if d else '')
+        linhas.append(f'<tr><td valign="top"><img src="/icons/{"folder" if d else "text"}.gif" alt="[   ]"></td>'
+                      f'<td><a href="{href}">{href}</a></td><td align="right">{time.strftime("%Y-%m-%d %H:%M", t)}  </td>'
+                      f'<td align="right">{"  - " if d else _humano(tam)}</td><td>&nbsp;</td></tr>')
+    linhas.append('</table></body></html>')
+    return '\n'.join(linhas)
+
+
+def apache_pre(n: int) -> str:
+    linhas = ['<html><body><h1>Index of /pub</h1><pre><img src="/icons/blank.gif" alt="Icon "> '
+              '<a href="?C=N;O=D">Name</a>  <a href="?C=M;O=A">Last modified</a>  <a href="?C=S;O=A">Size</a>',
+              '<hr><img src="/icons/back.gif" alt="[PARENTDIR]"> <a href="/">Parent Directory</a>   -']
+    for nome, d, tam, t in _itens(n):
+        href = nome + ('/' if d else '')
+        data = f"{t.tm_mday:02d}-{MESES[t.tm_mon - 1]}-{t.tm_year} {t.tm_hour:02d}:{t.tm_min:02d}"
+        linhas.append(f'<img src="/icons/text.gif" alt="[TXT]"> <a href="{href}">{href}</a>   {data}  {"-" if d else _humano(tam)}  ')
+    linhas.append('<hr></pre></body></html>')
+    return '\n'.join(linhas)
+
+
+def nginx(n: int) -> str:
+    linhas = ['<html><head><title>Index of /pub/</title></head><body><h1>Index of /pub/</h1><hr><pre><a href="../">../</a>']
+    for nome, d, tam, t in _itens(n):
+        href = nome + ('/' if d else '')
+        data = f"{t.tm_mday:02d}-{MESES[t.tm_mon - 1]}-{t.tm_year} {t.tm_hour:02d}:{t.tm_min:02d}"
+        linhas.append(f'<a href="{href}">{href[:50]}</a>{" " * max(1, 51 - len(href))}{data} {"-" if d else tam:>19}')
+    linhas.append('</pre><hr></body></html>')
+    return '\r\n'.join(linhas)
+
+
+def iis(n: int) -> str:
+    partes = ['<html><head><title>host - /pub/</title></head><body><H1>host - /pub/</H1><hr>\n\n<pre>'
+              '<A HREF="/">[To Parent Directory]</A><br><br>']
+    for nome, d, tam, t in _itens(n):
+        hora = t.tm_hour % 12 or 12
+        data = f"{DIAS[t.tm_wday]}, {time.strftime('%B', t)} {t.tm_mday}, {t.tm_year} {hora:2d}:{t.tm_min:02d} {'PM' if t.tm_hour >= 12 else 'AM'}"
+        partes.append(f'{data:>40} {"&lt;dir&gt;" if d else tam:>12} <A HREF="/pub/{nome}{"/" if d else ""}">{nome}</A><br>')
+    partes.append('</pre><hr></body></html>')
+    return ''.join(partes)  # IIS costuma mandar tudo numa linha só
+
+
+def lighttpd(n: int) -> str:
+    linhas = ['<html><body><h2>Index of /pub/</h2><div class="list"><table summary="Directory Listing">',
+              '<thead><tr><th class="n">Name</th><th class="m">Last Modified</th><th class="s">Size</th></tr></thead><tbody>',
+              '<tr class="d"><td class="n"><a href="../">Parent Directory</a>/</td><td class="m">&nbsp;</td><td class="s">- &nbsp;</td></tr>']
+    for nome, d, tam, t in _itens(n):
+        href = nome + ('/' if d else '')
+        linhas.append(f'<tr><td class="n"><a href="{href}">{nome}</a></td><td class="m">'
+                      f'{time.strftime("%Y-%b-%d %H:%M:%S", t)}</td><td class="s">{"- &nbsp;" if d else _humano(tam)}</td></tr>')
+    linhas.append('</tbody></table></div></body></html>')
+    return '\n'.join(linhas)
+
+
+FORMATOS: Dict[str, Callable[[int], str]] = {
+    'apache': apache_tabela, 'apache-pre': apache_pre, 'nginx': nginx, 'iis': iis, 'lighttpd': lighttpd,
+}
+
+
+def _pedacos(texto: str) -> Iterator[str]:
+    for i in range(0, len(texto), CHUNK):
+        yield texto[i:i + CHUNK]
+
+
+def medir(fn: Callable[[], List]) -> Tuple[float, int, List]:
+    """
+    (segundos, pico de memória em bytes, resultado). O tempo vem de uma
+    execução sem tracemalloc, que sozinho deixaria tudo várias vezes mais lento.
+    """
+    inicio = time.perf_counter()
+    resultado = fn()
+    segundos = time.perf_counter() - inicio
+    del resultado
+    tracemalloc.start()
+    resultado = fn()
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return segundos, pico, resultado
+
+
+def comparar(nome: str, pagina: str, com_bs4: bool) -> bool:
+    ok = True
+    rapido_t, rapido_m, entradas = medir(lambda: list(index_of.extrair_entradas(_pedacos(pagina))))
+    com_meta = sum(1 for e in entradas if e.mtime is not None)
+    com_tam = sum(1 for e in entradas if e.tamanho is not None)
+    linha = (f"{nome:<11} {len(pagina) / (1 << 20):7.1f} MB  {len(entradas):>8} links  "
+             f"rápido {rapido_t:6.2f}s {rapido_m / (1 << 20):7.1f} MB")
+    if com_bs4:
+        bs4_t, bs4_m, hrefs = medir(lambda: index_of.extrair_links_bs4(pagina))
+        linha += f"  |  bs4 {bs4_t:6.2f}s {bs4_m / (1 << 20):7.1f} MB  ({bs4_t / rapido_t:4.1f}x)"
+        if [e.href for e in entradas] != hrefs:
+            ok = False
+            linha += "  [DIFERENTE]"
+    print(linha + f"  |  data em {com_meta}, tamanho em {com_tam}")
+    return ok
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Benchmark do extrator de listagens do index_of.py.")
+    ap.add_argument("--entries", type=int, default=20000, help="Entradas por página sintética (padrão: 20000)")
+    ap.add_argument("--formats", nargs="+", choices=sorted(FORMATOS), default=sorted(FORMATOS),
+                    help="Formatos a medir (padrão: todos)")
+    ap.add_argument("--page", type=pathlib.Path, action="append", default=[],
+                    help="Página de listagem real salva em disco (pode repetir)")
+    args = ap.parse_args()
+
+    com_bs4 = index_of.BeautifulSoup is not None
+    if not com_bs4:
+        print("[AVISO] beautifulsoup4 não instalado: medindo só o extrator rápido", file=sys.stderr)
+
+    ok = True
+    for nome in args.formats:
+        ok &= comparar(nome, FORMATOS[nome](args.entries), com_bs4)
+    for caminho in args.page:
+        ok &= comparar(caminho.name[:11], caminho.read_text(encoding="utf-8", errors="ignore"), com_bs4)
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
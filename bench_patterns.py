@@ -0,0 +1,329 @@
+#!/usr/bin/env python3
+"""
+bench_patterns.py ― Benchmark de URL_RE e SECRET_PATTERNS do 3urls.py.
+
+Mede, padrão a padrão:
+
+* Vazão (MB/s) de ``finditer`` sobre um corpus sintético de JS minificado e,
+  opcionalmente, sobre um corpus gravado (bundles reais salvos em disco);
+* A passada única (extract_all) contra as passadas separadas;
+* Entradas de pior caso: cada padrão roda sobre entradas adversariais de
+  tamanho n, 2n, 4n... A razão entre tempos consecutivos mostra o crescimento:
+  ~2 é linear, ~4 é quadrático.
+
+Uso:
+    # Só corpus sintético
+    python bench_patterns.py
+
+    # Grava um corpus a partir de uma lista de URLs e mede com ele
+    python bench_patterns.py --record js_urls.txt corpus/
+    python bench_patterns.py --corpus corpus/ --json atual.json
+
+    # Depois de mexer num padrão: compara com a medição anterior
+    python bench_patterns.py --corpus corpus/ --baseline atual.json
+"""
+
+import argparse
+import hashlib
+import importlib.util
+import json
+import math
+import pathlib
+import random
+import signal
+import sys
+import time
+import urllib.request
+from typing import Callable, Dict, List, Optional, Pattern, Tuple
+
+HERE = pathlib.Path(__file__).resolve().parent
+
+
+def load_3urls():
+    """Importa o 3urls.py (o nome começa com dígito, então não dá para usar import)."""
+    spec = importlib.util.spec_from_file_location("urls3", HERE / "3urls.py")
+    mod = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(mod)
+    return mod
+
+
+u = load_3urls()
+
+# ---------------------------------------------------------------------------
+# Corpora
+# ---------------------------------------------------------------------------
+
+WORDS = [
+    "function", "return", "var", "this", "null", "undefined", "prototype",
+    "length", "push", "call", "apply", "Object", "Array", "default", "exports",
+    "module", "require", "value", "key", "token", "api", "config", "window",
+    "document", "apiKey", "getElementById", "secret", "Basic", "Bearer",
+]
+
+
+def synthetic_js(size: int, seed: int = 7) -> str:
+    """JS minificado de mentira, com a mistura de símbolos de um bundle real."""
+    rnd = random.Random(seed)
+    out: List[str] = []
+    total = 0
+    i = 0
+    while total < size:
+        r = rnd.random()
+        if r < 0.5:
+            piece = f"{rnd.choice(WORDS)}.{rnd.choice(WORDS)}("
+        elif r < 0.6:
+            piece = f'"{rnd.choice(WORDS)}":{rnd.randint(0, 99999)},'
+        elif r < 0.65:
+            piece = "a/b"
+        elif r < 0.66:
+            piece = f'"https://cdn.example.com/{rnd.choice(WORDS)}/x.js?v={i}"'
+        elif r < 0.67:
+            piece = f'"/api/{rnd.choice(WORDS)}/{i}"'
+        elif r < 0.7:
+            piece = "{" + "".join(rnd.choice("abcdef0123456789") for _ in range(12)) + "}"
+        elif r < 0.72:
+            piece = '"data:image/png;base64,' + "".join(
+                rnd.choice("ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789+/")
+                for _ in range(120)
+            ) + '"'
+        elif r < 0.77:
+            piece = "e.exports=function(e,t,n){"
+        else:
+            piece = "}" + rnd.choice(";,)")
+        out.append(piece)
+        total += len(piece)
+        i += 1
+    return "".join(out)
+
+
+def recorded_corpus(paths: List[pathlib.Path]) -> str:
+    """Concatena os arquivos gravados (diretórios são percorridos)."""
+    parts: List[str] = []
+    for p in paths:
+        files = sorted(f for f in p.rglob("*") if f.is_file()) if p.is_dir() else [p]
+        for f in files:
+            parts.append(f.read_text(encoding="utf-8", errors="ignore"))
+    return "\n".join(parts)
+
+
+def record(url_list: pathlib.Path, out_dir: pathlib.Path) -> None:
+    """Baixa cada URL da lista para ``out_dir``, com nome pelo hash do conteúdo."""
+    out_dir.mkdir(parents=True, exist_ok=True)
+    for ln in url_list.read_text(encoding="utf-8", errors="ignore").splitlines():
+        url = ln.strip()
+        if not url:
+            continue
+        try:
+            with urllib.request.urlopen(url, timeout=15) as resp:
+                body = resp.read()
+        except Exception as e:
+            print(f"[ERRO] {url}: {e}")
+            continue
+        dest = out_dir / (hashlib.sha256(body).hexdigest()[:16] + ".js")
+        dest.write_bytes(body)
+        print(f"[+] {url} -> {dest} ({len(body)} bytes)")
+
+
+# Entradas adversariais por padrão: f(n) devolve ~n caracteres
+WORST_CASES: Dict[str, List[Tuple[str, Callable[[int], str]]]] = {
+    "URL": [
+        ("barras", lambda n: "/" * n),
+        ("caminho sem fim", lambda n: "/" + "a/" * (n // 2)),
+        ("esquemas repetidos", lambda n: "http:/" * (n // 6)),
+    ],
+    "Authorization Bearer": [("Bearer repetido", lambda n: "Bearer " * (n // 7))],
+    "Authorization Basic": [("Basic + espaços", lambda n: "Basic" + " " * n)],
+    "JWT": [
+        ("eyJ sem ponto", lambda n: "eyJ" * (n // 3)),
+        ("base64 de JSON", lambda n: ("eyJhIjoxfQ" * (n // 10))),
+    ],
+    "AWS Access Key": [("AKIA repetido", lambda n: "AKIA" * (n // 4))],
+    "Google API Key": [("AIza repetido", lambda n: "AIza" * (n // 4))],
+    "Heroku API Key": [
+        ("hex contínuo", lambda n: "a" * n),
+        ("hex quase 32", lambda n: ("0" * 31 + "-") * (n // 32)),
+    ],
+    "Generic Secret": [
+        ("key= repetido", lambda n: "key=" * (n // 4)),
+        ("separadores longos", lambda n: "api" + "=" * n),
+        ("valor curto repetido", lambda n: "token:abcdefghi " * (n // 16)),
+    ],
+}
+
+# ---------------------------------------------------------------------------
+# Medição
+# ---------------------------------------------------------------------------
+
+
+class Timeout(Exception):
+    pass
+
+
+def _alarm(signum, frame):
+    raise Timeout()
+
+
+def timed(fn: Callable[[], object], timeout: float) -> Optional[float]:
+    """Tempo de ``fn()`` em segundos, ou None se passar de ``timeout``."""
+    signal.signal(signal.SIGALRM, _alarm)
+    signal.setitimer(signal.ITIMER_REAL, timeout)
+    t0 = time.perf_counter()
+    try:
+        fn()
+    except Timeout:
+        return None
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+    return time.perf_counter() - t0
+
+
+def patterns() -> List[Tuple[str, Pattern[str]]]:
+    return [(u.URL_KEY, u.URL_RE)] + list(u.SECRET_RES.items())
+
+
+def bench_corpus(name: str, text: str, timeout: float) -> Dict[str, Optional[float]]:
+    """MB/s de cada padrão e da passada única sobre ``text``."""
+    mb = len(text.encode("utf-8")) / 1e6
+    print(f"\n=== Corpus {name} ({mb:.1f} MB) ===")
+    out: Dict[str, Optional[float]] = {}
+    total = 0.0
+    for pname, rx in patterns():
+        secs = timed(lambda: sum(1 for _ in rx.finditer(text)), timeout)
+        out[pname] = mb / secs if secs else None
+        total += secs if secs else timeout
+        print(f"  {pname:22s} {_fmt_rate(out[pname])}")
+    out["(passadas separadas)"] = mb / total
+    secs = timed(lambda: u.extract_all(text), timeout)
+    out["(passada única)"] = mb / secs if secs else None
+    print(f"  {'(passadas separadas)':22s} {_fmt_rate(out['(passadas separadas)'])}")
+    print(f"  {'(passada única)':22s} {_fmt_rate(out['(passada única)'])}")
+    return out
+
+
+def bench_worst(sizes: List[int], timeout: float) -> Dict[str, Dict[str, List[Optional[float]]]]:
+    """Tempos de cada padrão nas entradas adversariais, para cada tamanho."""
+    print(f"\n=== Pior caso (tamanhos: {', '.join(map(str, sizes))}) ===")
+    res = dict(patterns())
+    out: Dict[str, Dict[str, List[Optional[float]]]] = {}
+    for pname, cases in WORST_CASES.items():
+        rx = res.get(pname)
+        if rx is None:
+            continue
+        for label, gen in cases:
+            times: List[Optional[float]] = []
+            for n in sizes:
+                text = gen(n)
+                secs = None if times and times[-1] is None else timed(
+                    lambda: sum(1 for _ in rx.finditer(text)), timeout
+                )
+                times.append(secs)
+            out.setdefault(pname, {})[label] = times
+            growth = _growth(times, sizes)
+            flag = "  <-- SUPERLINEAR" if growth is None or growth > 3 else ""
+            cells = " ".join(f"{t * 1000:9.1f}ms" if t is not None else "  timeout" for t in times)
+            g = f"x{growth:.1f}" if growth is not None else "  -"
+            print(f"  {pname:22s} {label:22s} {cells}  {g}{flag}")
+    return out
+
+
+def _growth(times: List[Optional[float]], sizes: List[int]) -> Optional[float]:
+    """Razão média entre tempos consecutivos, normalizada para tamanho x2."""
+    ratios = []
+    for (t1, n1), (t2, n2) in zip(zip(times, sizes), zip(times[1:], sizes[1:])):
+        if t1 is None or t2 is None:
+            return None
+        if t1 > 1e-4:
+            ratios.append((t2 / t1) ** (1 / max(1e-9, math.log2(n2 / n1))))
+    return sum(ratios) / len(ratios) if ratios else 1.0
+
+
+def _fmt_rate(rate: Optional[float]) -> str:
+    return f"{rate:9.1f} MB/s" if rate is not None else "  timeout"
+
+
+def compare(current: dict, baseline: dict, tolerance: float) -> int:
+    """Aponta padrões que ficaram mais lentos que ``tolerance`` (fração)."""
+    print(f"\n=== Comparação com a linha de base (tolerância {tolerance:.0%}) ===")
+    regressions = 0
+    for corpus, rates in current.get("corpus", {}).items():
+        for pname, rate in rates.items():
+            old = baseline.get("corpus", {}).get(corpus, {}).get(pname)
+            if old is None:
+                continue
+            if rate is None or rate < old * (1 - tolerance):
+                regressions += 1
+                now = f"{rate:.1f}" if rate is not None else "timeout"
+                print(f"  [REGRESSÃO] {corpus}/{pname}: {old:.1f} -> {now} MB/s")
+    for pname, cases in current.get("worst", {}).items():
+        for label, times in cases.items():
+            old = baseline.get("worst", {}).get(pname, {}).get(label)
+            if not old or old[-1] is None:
+                continue
+            if times[-1] is None or times[-1] > old[-1] * (1 + tolerance) + 0.005:
+                regressions += 1
+                now = f"{times[-1] * 1000:.1f}ms" if times[-1] is not None else "timeout"
+                print(f"  [REGRESSÃO] pior caso {pname}/{label}: {old[-1] * 1000:.1f}ms -> {now}")
+    if not regressions:
+        print("  Nenhuma regressão.")
+    return regressions
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Benchmark dos padrões do 3urls.py.")
+    ap.add_argument("--size", type=int, default=8, help="Corpus sintético em MB (padrão: 8)")
+    ap.add_argument(
+        "--corpus", type=pathlib.Path, nargs="*", default=[], help="Arquivos/diretórios gravados"
+    )
+    ap.add_argument(
+        "--record",
+        nargs=2,
+        type=pathlib.Path,
+        metavar=("LISTA", "DIR"),
+        help="Baixa as URLs de LISTA para DIR (corpus gravado) e sai",
+    )
+    ap.add_argument(
+        "--worst-sizes",
+        type=int,
+        nargs="+",
+        default=[4000, 8000, 16000, 32000],
+        help="Tamanhos das entradas de pior caso (padrão: 4000 8000 16000 32000)",
+    )
+    ap.add_argument(
+        "--timeout", type=float, default=10.0, help="Limite por medição em segundos (padrão: 10)"
+    )
+    ap.add_argument("--json", type=pathlib.Path, help="Grava os resultados em JSON")
+    ap.add_argument("--baseline", type=pathlib.Path, help="JSON anterior para comparar")
+    ap.add_argument(
+        "--tolerance", type=float, default=0.2, help="Piora aceita vs. baseline (padrão: 0.2)"
+    )
+    args = ap.parse_args()
+
+    if args.record:
+        record(*args.record)
+        return
+
+    # A guarda do 3urls.py desligaria padrões no meio da medição
+    u.configure_guard(0)
+
+    results: dict = {"signature": u.patterns_signature(), "corpus": {}, "worst": {}}
+    results["corpus"]["sintético"] = bench_corpus(
+        "sintético", synthetic_js(args.size * 1_000_000), args.timeout
+    )
+    if args.corpus:
+        results["corpus"]["gravado"] = bench_corpus(
+            "gravado", recorded_corpus(args.corpus), args.timeout
+        )
+    results["worst"] = bench_worst(sorted(args.worst_sizes), args.timeout)
+
+    if args.json:
+        args.json.write_text(json.dumps(results, indent=2, ensure_ascii=False), encoding="utf-8")
+        print(f"\nResultados gravados em {args.json}")
+
+    if args.baseline:
+        baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+        if compare(results, baseline, args.tolerance):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+"""
+canon_urls.py ― Canonicaliza e agrupa URLs antes do gf/httpx/nuclei.
+
+Lê a saída do waybackurls/gau/katana em fluxo (arquivos ou stdin) e manda
+adiante uma URL por "padrão", ou seja, por host + caminho com os segmentos
+variáveis trocados por marcadores + nomes dos parâmetros:
+
+    https://Ex.com:443/item/123?b=2&a=1&utm_source=x
+    http://ex.com/item/456?a=9&b=3&_=1699999999
+        -> as duas viram o padrão ex.com/item/{n}?a&b e só a primeira sai,
+           já canonicalizada: https://ex.com/item/123?a=1&b=2
+
+A canonicalização põe esquema e host em minúsculas, tira a porta padrão, o
+fragmento, os parâmetros de rastreio/cache-buster (utm_*, fbclid, _=...), junta
+barras repetidas, normaliza o %XX e ordena os parâmetros. No caminho, números,
+UUIDs, hashes hexadecimais e datas viram {n}, {uuid}, {hex} e {data}.
+
+A deduplicação usa memória fixa (filtro de Bloom do dedup.py, dimensionado por
+--capacity/--fp-rate) ou, com --dedup memory, um conjunto exato.
+
+Uso:
+    cat wayback.txt gau.txt katana.txt | python canon_urls.py > urls_com_param.txt
+    python canon_urls.py wayback.txt gau.txt katana.txt -o urls_com_param.txt
+    python canon_urls.py all_urls.txt --all -o canon.txt       # inclui URLs sem parâmetros
+"""
+
+import argparse
+import hashlib
+import re
+import sys
+import time
+from typing import Iterable, Iterator, Optional, TextIO, Tuple
+
+import instrumentacao
+from dedup import BLOOM_CAPACITY, BLOOM_FP_RATE, BloomDedup, MemoryDedup
+from instrumentacao import INSTR, Cronometro, contar, medir
+
+# Parâmetros que não mudam o que o servidor faz com a requisição
+IGNORAR_PARAMS = frozenset((
+    "_", "cb", "cachebuster", "cache_buster", "nocache", "rnd", "random", "timestamp",
+    "fbclid", "gclid", "dclid", "msclkid", "yclid", "mc_cid", "mc_eid", "_ga", "_gl", "igshid",
+))
+IGNORAR_PREFIXOS = ("utm_",)
+ESTATICOS = frozenset((
+    "css", "js", "mjs", "map", "png", "jpg", "jpeg", "gif", "svg", "ico", "webp", "avif", "bmp",
+    "woff", "woff2", "ttf", "otf", "eot", "mp4", "webm", "mp3", "wav", "pdf",
+))
+DEFAULT_PORTS = {"http": ":80", "https": ":443"}
+
+URL_RE = re.compile(r"^(https?)://([^/?#]*)([^?#]*)(?:\?([^#]*))?", re.I)
+PERCENT = re.compile(r"%[0-9a-fA-F]{2}")
+UNRESERVED = frozenset("ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789-._~")
+BARRAS = re.compile(r"/{2,}")
+SEGMENTOS = (
+    (re.compile(r"\d+"), "{n}"),
+    (re.compile(r"[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}"), "{uuid}"),
+    (re.compile(r"(?=[a-fA-F]*\d)[0-9a-fA-F]{16,}"), "{hex}"),
+    (re.compile(r"\d{4}-\d{2}-\d{2}(?:[T ]\d{2}:\d{2}(?::\d{2})?)?"), "{data}"),
+)
+
+
+def _percent(m: "re.Match") -> str:
+    char = chr(int(m.group(0)[1:], 16))
+    return char if char in UNRESERVED else m.group(0).upper()
+
+
+def _segmento(seg: str) -> str:
+    for padrao, marcador in SEGMENTOS:
+        if padrao.fullmatch(seg):
+            return marcador
+    return seg
+
+
+def canonicalizar(url: str) -> Optional[Tuple[str, str, bool]]:
+    """
+    (URL canônica, chave do padrão, é estática) ou None se não for uma URL
+    http(s). A chave ignora o esquema: http e https do mesmo padrão são um só.
+    """
+    m = URL_RE.match(url)
+    if not m:
+        return None
+    esquema = m.group(1).lower()
+    host = m.group(2).lower().rsplit("@", 1)[-1]
+    if host.endswith(DEFAULT_PORTS[esquema]):
+        host = host[:-len(DEFAULT_PORTS[esquema])]
+    host = host.rstrip(".")
+    if not host:
+        return None
+    caminho = m.group(3) or "/"
+    if "%" in caminho:
+        caminho = PERCENT.sub(_percent, caminho)
+    if "//" in caminho:
+        caminho = BARRAS.sub("/", caminho)
+
+    params = []
+    if m.group(4):
+        for par in m.group(4).split("&"):
+            if not par:
+                continue
+            if "%" in par:
+                par = PERCENT.sub(_percent, par)
+            nome = par.split("=", 1)[0]
+            baixo = nome.lower()
+            if baixo in IGNORAR_PARAMS or baixo.startswith(IGNORAR_PREFIXOS):
+                continue
+            params.append((nome, par))
+    params.sort()
+
+    canonica = f"{esquema}://{host}{caminho}"
+    if params:
+        canonica += "?" + "&".join(par for _, par in params)
+    modelo = "/".join(_segmento(seg) for seg in caminho.split("/"))
+    nomes = "&".join(dict.fromkeys(nome for nome, _ in params))
+    ultimo = caminho.rsplit("/", 1)[-1]
+    estatica = "." in ultimo and ultimo.rsplit(".", 1)[-1].lower() in ESTATICOS
+    return canonica, f"{host}{modelo}?{nomes}", estatica
+
+
+class Canonicalizador:
+    """Estágio de fluxo: recebe linhas, devolve um representante por padrão."""
+
+    def __init__(self, dedup, com_param: bool = True, estaticos: bool = False) -> None:
+        self.dedup = dedup
+        self.com_param = com_param
+        self.estaticos = estaticos
+        self.lidas = 0
+        self.invalidas = 0
+        self.sem_param = 0
+        self.estaticas = 0
+        self.repetidas = 0
+        self.saida = 0
+
+    def processar(self, linhas: Iterable[str]) -> Iterator[str]:
+        for linha in linhas:
+            linha = linha.strip()
+            if not linha:
+                continue
+            self.lidas += 1
+            resultado = canonicalizar(linha)
+            if resultado is None:
+                self.invalidas += 1
+                continue
+            canonica, chave, estatica = resultado
+            if estatica and not self.estaticos:
+                self.estaticas += 1
+                continue
+            if self.com_param and "?" not in canonica:
+                self.sem_param += 1  # o antigo grep "=" (contando só parâmetros que sobraram)
+                continue
+            if not self.dedup.add(hashlib.blake2b(chave.encode("utf-8", "surrogatepass"), digest_size=16).digest()):
+                self.repetidas += 1
+                continue
+            self.saida += 1
+            yield canonica
+
+    def resumo(self, segundos: float) -> str:
+        reducao = 100.0 * (1 - self.saida / self.lidas) if self.lidas else 0.0
+        return (f"[+] {self.lidas} URLs lidas -> {self.saida} padrões únicos ({reducao:.1f}% a menos) em {segundos:.1f}s: "
+                f"{self.repetidas} repetiam um padrão, {self.sem_param} sem parâmetros, "
+                f"{self.estaticas} estáticas, {self.invalidas} inválidas")
+
+
+def ler_linhas(arquivos) -> Iterator[str]:
+    for nome in arquivos or ["-"]:
+        if nome == "-":
+            yield from sys.stdin
+            continue
+        with open(nome, encoding="utf-8", errors="surrogateescape") as f:
+            yield from f
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Canonicaliza URLs e mantém uma por padrão de caminho + parâmetros.")
+    ap.add_argument("inputs", nargs="*", help="Arquivos de URLs (padrão: stdin)")
+    ap.add_argument("-o", "--output", default="-", help="Arquivo de saída (padrão: stdout)")
+    ap.add_argument("--all", action="store_true", help="Mantém também URLs sem parâmetros")
+    ap.add_argument("--keep-static", action="store_true", help="Mantém imagens, fontes, CSS/JS e afins")
+    ap.add_argument("--dedup", choices=("bloom", "memory"), default="bloom",
+                    help="bloom: memória fixa, com falsos positivos raros (padrão); memory: exato, cresce com a entrada")
+    ap.add_argument("--capacity", type=int, default=BLOOM_CAPACITY,
+                    help="Padrões esperados, para dimensionar o Bloom (padrão: 10M, ~24 MB)")
+    ap.add_argument("--fp-rate", type=float, default=BLOOM_FP_RATE,
+                    help=f"Taxa de falso positivo do Bloom (padrão: {BLOOM_FP_RATE:g})")
+    instrumentacao.adicionar_argumentos(ap)
+    args = ap.parse_args()
+    instrumentacao.configurar(args)
+
+    dedup = BloomDedup(args.capacity, args.fp_rate) if args.dedup == "bloom" else MemoryDedup()
+    estagio = Canonicalizador(dedup, com_param=not args.all, estaticos=args.keep_static)
+
+    inicio = time.monotonic()
+    # Medir URL a URL custaria mais que canonicalizar; com --stats só a leitura
+    # é cronometrada e o resto do laço (canonicalização + escrita em buffer) é o parse
+    leitura = Cronometro()
+    linhas = ler_linhas(args.inputs)
+    if INSTR.ativo:
+        linhas = leitura.iterar(linhas)
+    out: TextIO = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8", errors="surrogateescape")
+    try:
+        for url in estagio.processar(linhas):
+            out.write(url + "\n")
+    except BrokenPipeError:
+        pass
+    finally:
+        if out is not sys.stdout:
+            out.close()
+        medir("leitura", leitura.segundos)
+        medir("parse", time.monotonic() - inicio - leitura.segundos)
+        for nome in ("lidas", "saida", "repetidas", "sem_param", "estaticas", "invalidas"):
+            contar(f"itens.{nome}", getattr(estagio, nome))
+    print(estagio.resumo(time.monotonic() - inicio), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
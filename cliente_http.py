@@ -0,0 +1,664 @@
+#!/usr/bin/env python3
+"""
+cliente_http.py ― Cliente HTTP comum das ferramentas (3urls.py, decompiler.py,
+index_of.py, robots_sitemap.py, takeover.py).
+
+Duas metades com a mesma configuração (TIMEOUT, CONNECT_TIMEOUT, RETRIES,
+PER_HOST...):
+
+* ``ClienteHTTP``: síncrono, para as ferramentas com threads. Uma Session do
+  requests com pool de conexões keep-alive, cache de DNS do cliente,
+  reenvio limitado (só erros de conexão e 429/502/503/504, com backoff e
+  respeitando Retry-After), limite de requisições simultâneas e de
+  requisições/s por host, e um disjuntor que desiste de um host depois de
+  várias falhas de conexão seguidas, em vez de gastar reenvios e timeouts em
+  cada URL dele. Os corpos são lidos em fluxo (``abrir``).
+
+* ``ConnectionPool``: assíncrono (asyncio, HTTP/1.1 mínimo), para sondar
+  milhares de hosts: keep-alive por host, DNS em cache, redirecionamentos,
+  limite por host e reenvio opcional de falhas de conexão.
+
+As duas alimentam as fases dns, conexao, ttfb e transferencia do
+instrumentacao.py (--stats).
+"""
+
+import asyncio
+import contextlib
+import copy
+import functools
+import socket
+import ssl
+import threading
+import time
+from urllib.parse import urljoin, urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.exceptions import ConnectTimeoutError, NameResolutionError
+from urllib3.util.retry import Retry
+
+from instrumentacao import contar, fase, medir
+
+TIMEOUT = 15.0          # leitura: espera máxima por dados da resposta
+CONNECT_TIMEOUT = 5.0   # conexão TCP/TLS
+RETRIES = 2             # reenvios por requisição (conexão, 429/502/503/504)
+BACKOFF = 0.5           # espera antes do reenvio n: BACKOFF * 2**(n-1), ou o Retry-After
+PER_HOST = 4            # requisições simultâneas por host
+POOL_SIZE = 32          # hosts com conexões ociosas guardadas
+DNS_TTL = 300.0         # validade das respostas no cache de DNS
+DNS_TTL_FALHA = 30.0    # e das falhas
+DNS_MAX = 10_000        # nomes guardados no cache de DNS
+FALHAS_HOST = 5         # falhas de conexão seguidas até desistir do host
+RETRY_STATUS = (429, 502, 503, 504)
+MAX_REDIRECTS = 5
+MAX_IDLE_PER_HOST = 2
+READ_SIZE = 1 << 16
+USER_AGENT = "Mozilla/5.0 (compatible; recon-tools)"
+
+
+def charset_de(headers, padrao="utf-8"):
+    """Charset do Content-Type (ou ``padrao``)."""
+    for parte in (headers.get("Content-Type") or "").split(";")[1:]:
+        nome, _, valor = parte.strip().partition("=")
+        if nome.lower() == "charset" and valor:
+            return valor.strip('"\' ') or padrao
+    return padrao
+
+
+# ---------------------------------------------------------------------------
+# Cache de DNS
+# ---------------------------------------------------------------------------
+class DNSCache:
+    """
+    getaddrinfo com cache (inclusive de falhas) e sem consultas repetidas em
+    paralelo: quem pede um nome que já está sendo resolvido espera a mesma
+    consulta. ``resolve`` atende o motor assíncrono (as sondas HTTPS e HTTP de
+    um host dividem a resposta); ``lookup``, as threads de um ClienteHTTP.
+    Guarda no máximo ``max_entries`` nomes (sai o mais antigo), e uma falha em
+    cache é levantada como uma exceção nova a cada pedido.
+    """
+
+    def __init__(self, ttl=DNS_TTL, failure_ttl=DNS_TTL_FALHA, max_entries=DNS_MAX):
+        self.ttl = ttl
+        self.failure_ttl = failure_ttl
+        self.max_entries = max_entries
+        self.lock = threading.Lock()
+        self.entries = {}   # host -> (expira, endereços | exceção)
+        self.pending = {}   # host -> Future (resolve)
+        self.waiting = {}   # host -> Event (lookup)
+        self.lookups = 0
+        self.hits = 0
+
+    def _cached(self, host):
+        """Endereços em cache (ou a falha, levantada de novo); None se não há."""
+        entry = self.entries.get(host)
+        if entry is None or entry[0] <= time.monotonic():
+            return None
+        self.hits += 1
+        contar("dns.cache")
+        if isinstance(entry[1], Exception):
+            raise copy.copy(entry[1])  # sem o traceback de quem a recebeu antes
+        return entry[1]
+
+    def _store(self, host, result):
+        if isinstance(result, Exception):
+            ttl, result = self.failure_ttl, copy.copy(result)
+        else:
+            ttl = self.ttl
+        self.entries.pop(host, None)
+        self.entries[host] = (time.monotonic() + ttl, result)
+        while len(self.entries) > self.max_entries:
+            del self.entries[next(iter(self.entries))]
+
+    @staticmethod
+    def _addresses(infos):
+        return list(dict.fromkeys(info[4][0] for info in infos))
+
+    async def resolve(self, host):
+        while True:
+            with self.lock:
+                result = self._cached(host)
+            if result is not None:
+                return result
+            if host not in self.pending:
+                break
+            await asyncio.shield(self.pending[host])  # e relê o cache
+
+        future = asyncio.get_running_loop().create_future()
+        self.pending[host] = future
+        self.lookups += 1
+        try:
+            with fase("dns"):
+                infos = await asyncio.get_running_loop().getaddrinfo(
+                    host, None, type=socket.SOCK_STREAM)
+            result = self._addresses(infos)
+        except (OSError, UnicodeError) as e:
+            with self.lock:
+                self._store(host, e)
+            raise
+        else:
+            with self.lock:
+                self._store(host, result)
+            return result
+        finally:
+            del self.pending[host]
+            future.set_result(None)
+
+    def lookup(self, host):
+        while True:
+            with self.lock:
+                result = self._cached(host)
+                if result is not None:
+                    return result
+                event = self.waiting.get(host)
+                if event is None:
+                    event = self.waiting[host] = threading.Event()
+                    self.lookups += 1
+                    break
+            event.wait()  # outra thread está resolvendo: espera e relê o cache
+        try:
+            with fase("dns"):
+                result = self._addresses(socket.getaddrinfo(host, None, type=socket.SOCK_STREAM))
+        except (OSError, UnicodeError) as e:
+            with self.lock:
+                self._store(host, e)
+            raise
+        else:
+            with self.lock:
+                self._store(host, result)
+            return result
+        finally:
+            with self.lock:
+                del self.waiting[host]
+            event.set()
+
+
+# ---------------------------------------------------------------------------
+# Cliente síncrono
+# ---------------------------------------------------------------------------
+class _Conexao:
+    """
+    Conexão do ClienteHTTP: mede TCP + TLS (fase conexao) e, com ``dns``,
+    resolve o nome pelo DNSCache do cliente e tenta cada endereço, em vez do
+    getaddrinfo do sistema a cada conexão nova.
+    """
+
+    dns = None
+
+    def connect(self):
+        with fase("conexao"):
+            super().connect()
+
+    def _new_conn(self):
+        if self.dns is None:
+            return super()._new_conn()
+        nome = self._dns_host
+        try:
+            enderecos = self.dns.lookup(nome)
+        except (OSError, UnicodeError) as e:
+            raise NameResolutionError(self.host, self, e) from e
+        erro = None
+        for endereco in enderecos:
+            self._dns_host = endereco  # o TLS (SNI e certificado) continua usando self.host
+            try:
+                return super()._new_conn()
+            except ConnectTimeoutError as e:
+                erro = e
+            finally:
+                self._dns_host = nome
+        raise erro
+
+
+class _ConexaoHTTP(_Conexao, HTTPConnection):
+    pass
+
+
+class _ConexaoHTTPS(_Conexao, HTTPSConnection):
+    pass
+
+
+class _Pool:
+    """Pool que entrega o DNSCache do cliente a cada conexão que abre."""
+
+    def __init__(self, *args, dns=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.dns = dns
+
+    def _new_conn(self):
+        conexao = super()._new_conn()
+        conexao.dns = self.dns
+        return conexao
+
+
+class _PoolHTTP(_Pool, HTTPConnectionPool):
+    ConnectionCls = _ConexaoHTTP
+
+
+class _PoolHTTPS(_Pool, HTTPSConnectionPool):
+    ConnectionCls = _ConexaoHTTPS
+
+
+class _Adaptador(HTTPAdapter):
+    """
+    HTTPAdapter cujas conexões medem o tempo de TCP + TLS (fase conexao) e
+    resolvem nomes pelo ``dns`` do cliente; o socket.getaddrinfo do processo
+    não é tocado.
+    """
+
+    def __init__(self, *args, dns=None, **kwargs):
+        self.dns = dns  # antes do super(): ele já chama init_poolmanager
+        super().__init__(*args, **kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": functools.partial(_PoolHTTP, dns=self.dns),
+            "https": functools.partial(_PoolHTTPS, dns=self.dns),
+        }
+
+
+class HostIndisponivel(requests.ConnectionError):
+    """O host já falhou FALHAS_HOST vezes seguidas: nem tenta de novo."""
+
+
+class _Host:
+    def __init__(self, per_host):
+        self.vagas = threading.BoundedSemaphore(per_host) if per_host else None
+        self.lock = threading.Lock()
+        self.proxima = 0.0  # instante da próxima requisição permitida (--rate)
+        self.falhas = 0
+
+
+class ClienteHTTP:
+    """
+    Session compartilhada entre threads. ``abrir`` ocupa uma vaga do host
+    (``per_host`` simultâneas, ``rate`` por segundo) do envio até o fim da
+    leitura do corpo; dentro de ``vaga(url)`` a mesma thread não ocupa outra,
+    então quem precisa segurar o host por mais tempo (métricas, várias
+    requisições) pode fazer isso sem travar.
+
+    Os reenvios ficam a cargo do urllib3 (Retry) e valem só para GET/HEAD:
+    erro de conexão, timeout antes da resposta e 429/502/503/504.
+    """
+
+    def __init__(self, timeout=TIMEOUT, connect_timeout=CONNECT_TIMEOUT, retries=RETRIES,
+                 backoff=BACKOFF, per_host=PER_HOST, rate=None, pool_size=POOL_SIZE,
+                 verify=True, headers=None, dns_ttl=DNS_TTL, falhas_host=FALHAS_HOST):
+        self.timeout = (connect_timeout, timeout)
+        self.per_host = per_host
+        self.intervalo = 1.0 / rate if rate else 0.0
+        self.falhas_host = falhas_host
+        self.dns = DNSCache(dns_ttl) if dns_ttl else None
+
+        self.session = requests.Session()
+        self.session.verify = verify
+        if headers:
+            self.session.headers.update(headers)
+        retry = Retry(total=retries, connect=retries, read=retries, status=retries, other=0,
+                      backoff_factor=backoff, status_forcelist=RETRY_STATUS,
+                      allowed_methods=frozenset(("GET", "HEAD")),
+                      respect_retry_after_header=True, raise_on_status=False)
+        adaptador = _Adaptador(pool_connections=pool_size, pool_maxsize=max(per_host or 0, pool_size // 4, 1),
+                                max_retries=retry, dns=self.dns)
+        self.session.mount("http://", adaptador)
+        self.session.mount("https://", adaptador)
+
+        self.lock = threading.Lock()
+        self.hosts = {}
+        self.local = threading.local()
+        self.requisicoes = 0
+        self.reenvios = 0
+        self.falhas = 0
+        self.desistidos = set()
+
+    def _host(self, host):
+        with self.lock:
+            estado = self.hosts.get(host)
+            if estado is None:
+                estado = self.hosts[host] = _Host(self.per_host)
+            return estado
+
+    @contextlib.contextmanager
+    def vaga(self, url):
+        """Ocupa uma vaga do host de ``url`` (reentrante na mesma thread)."""
+        host = (urlsplit(url).hostname or "").lower()
+        ocupados = self.local.__dict__.setdefault("ocupados", set())
+        if host in ocupados:
+            yield
+            return
+        estado = self._host(host)
+        if estado.falhas >= self.falhas_host:
+            raise HostIndisponivel(f"{host}: {estado.falhas} falhas de conexão seguidas, desisti do host")
+        if estado.vagas is not None:
+            estado.vagas.acquire()
+        try:
+            if self.intervalo:
+                with estado.lock:
+                    agora = time.monotonic()
+                    espera = estado.proxima - agora
+                    estado.proxima = max(agora, estado.proxima) + self.intervalo
+                if espera > 0:
+                    time.sleep(espera)
+            ocupados.add(host)
+            yield
+        finally:
+            ocupados.discard(host)
+            if estado.vagas is not None:
+                estado.vagas.release()
+
+    @contextlib.contextmanager
+    def abrir(self, url, metodo="GET", headers=None, stream=True, **kwargs):
+        """
+        Requisição com o corpo ainda não lido (``stream``); a vaga do host e a
+        conexão são liberadas ao sair do bloco.
+        """
+        with self.vaga(url):
+            estado = self._host((urlsplit(url).hostname or "").lower())
+            try:
+                with fase("ttfb"):
+                    resposta = self.session.request(metodo, url, headers=headers, stream=stream,
+                                                    timeout=self.timeout, **kwargs)
+            except requests.ConnectionError:
+                with self.lock:
+                    self.requisicoes += 1
+                    self.falhas += 1
+                    estado.falhas += 1
+                    if estado.falhas >= self.falhas_host:
+                        self.desistidos.add(urlsplit(url).hostname)
+                raise
+            historico = getattr(getattr(resposta.raw, "retries", None), "history", ())
+            with self.lock:
+                self.requisicoes += 1
+                self.reenvios += len(historico)
+                estado.falhas = 0
+            inicio = time.perf_counter()
+            try:
+                yield resposta
+            finally:
+                resposta.close()
+                medir("transferencia", time.perf_counter() - inicio)
+                contar("itens.requisicoes")
+                contar("bytes.rede", resposta.raw.tell() if resposta.raw is not None else 0)
+
+    def get(self, url, headers=None, **kwargs):
+        """GET com o corpo já lido (``resposta.content``/``.text``)."""
+        with self.abrir(url, headers=headers, **kwargs) as resposta:
+            resposta.content  # lê o corpo ainda dentro da fase de transferência
+            return resposta
+
+    def estatisticas(self):
+        """Contadores do cliente, para o resumo do --stats."""
+        dados = {"requisicoes": self.requisicoes, "reenvios": self.reenvios, "falhas": self.falhas,
+                 "hosts_abandonados": sorted(self.desistidos)}
+        if self.dns is not None:
+            dados["dns"] = {"consultas": self.dns.lookups, "cache": self.dns.hits}
+        return dados
+
+    def resumo(self):
+        texto = (f"{self.requisicoes} requisição(ões), {self.reenvios} reenvio(s), "
+                 f"{self.falhas} falha(s) de conexão")
+        if self.desistidos:
+            texto += f", {len(self.desistidos)} host(s) abandonado(s)"
+        if self.dns is not None:
+            texto += f" | DNS: {self.dns.lookups} consulta(s), {self.dns.hits} do cache"
+        return texto
+
+    def fechar(self):
+        self.session.close()
+
+
+# ---------------------------------------------------------------------------
+# Motor assíncrono: DNS em cache, pool de conexões keep-alive, HTTP/1.1 mínimo
+# ---------------------------------------------------------------------------
+class HTTPError(Exception):
+    pass
+
+
+class Response:
+    def __init__(self, url, status, headers, reader, conn, pool):
+        self.url = url
+        self.status = status
+        self.headers = headers
+        self._reader = reader
+        self._conn = conn
+        self._pool = pool
+        self._done = False
+
+    async def iter_body(self):
+        """Corpo em blocos (Content-Length, chunked ou até fechar); devolve a conexão ao pool."""
+        started = time.perf_counter()
+        total = 0
+        async for block in self._blocks():
+            total += len(block)
+            yield block
+        medir("transferencia", time.perf_counter() - started)
+        contar("bytes.rede", total)
+        contar("itens.requisicoes")
+
+    async def _blocks(self):
+        reader = self._reader
+        keep = self.headers.get("connection", "").lower() != "close"
+        if self.status in (204, 304) or self._conn.method == "HEAD":
+            pass
+        elif "chunked" in self.headers.get("transfer-encoding", "").lower():
+            while True:
+                size = int((await reader.readline()).split(b";")[0].strip() or b"0", 16)
+                if size == 0:
+                    while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                        pass
+                    break
+                while size:
+                    block = await reader.read(min(size, READ_SIZE))
+                    if not block:
+                        raise HTTPError("conexão fechada no meio do corpo")
+                    size -= len(block)
+                    yield block
+                await reader.readline()
+        elif "content-length" in self.headers:
+            size = int(self.headers["content-length"])
+            while size:
+                block = await reader.read(min(size, READ_SIZE))
+                if not block:
+                    raise HTTPError("conexão fechada no meio do corpo")
+                size -= len(block)
+                yield block
+        else:
+            keep = False
+            while True:
+                block = await reader.read(READ_SIZE)
+                if not block:
+                    break
+                yield block
+        self._done = True
+        self._pool.release(self._conn, keep)
+
+    async def read_size(self):
+        """Lê e descarta o corpo; devolve o tamanho em bytes."""
+        total = 0
+        async for block in self.iter_body():
+            total += len(block)
+        return total
+
+    def close(self):
+        if not self._done:
+            self._done = True
+            self._pool.release(self._conn, False)
+
+
+class Connection:
+    def __init__(self, key, reader, writer):
+        self.key = key
+        self.reader = reader
+        self.writer = writer
+        self.method = "GET"
+        self.slot = None
+
+
+class ConnectionPool:
+    """
+    Conexões keep-alive por (esquema, host, porta), abertas sob demanda e
+    reaproveitadas entre as requisições ao mesmo host (robots.txt, depois
+    sitemap.xml, redirecionamentos...). Com ``per_host``, no máximo tantas
+    conexões por host ficam em uso ao mesmo tempo (a vaga só é devolvida
+    quando o corpo é lido ou a resposta fechada); com ``retries``, conexões
+    recusadas, resetadas ou fechadas antes da resposta são reenviadas com
+    backoff. Timeouts não: um host que não responde custa um timeout só.
+    Erros de DNS e respostas inválidas também não são reenviados.
+    """
+
+    def __init__(self, dns, timeout=TIMEOUT, verify_ssl=True, user_agent=USER_AGENT,
+                 per_host=None, retries=0, backoff=BACKOFF):
+        self.dns = dns
+        self.timeout = timeout
+        self.user_agent = user_agent
+        self.per_host = per_host
+        self.retries = retries
+        self.backoff = backoff
+        self.slots = {}
+        self.idle = {}
+        self.ssl = ssl.create_default_context()
+        if not verify_ssl:
+            self.ssl.check_hostname = False
+            self.ssl.verify_mode = ssl.CERT_NONE
+        self.opened = 0
+        self.reused = 0
+        self.retried = 0
+
+    async def _open(self, key):
+        scheme, host, port = key
+        last = None
+        for address in await self.dns.resolve(host):
+            try:
+                with fase("conexao"):
+                    reader, writer = await asyncio.open_connection(
+                        address, port,
+                        ssl=self.ssl if scheme == "https" else None,
+                        server_hostname=host if scheme == "https" else None,
+                        limit=READ_SIZE)
+                self.opened += 1
+                return Connection(key, reader, writer)
+            except (OSError, ssl.SSLError) as e:
+                last = e
+        raise last or OSError(f"sem endereço para {host}")
+
+    def _acquire_idle(self, key):
+        idle = self.idle.get(key)
+        while idle:
+            conn = idle.pop()
+            if not conn.reader.at_eof() and not conn.writer.is_closing():
+                self.reused += 1
+                return conn
+            conn.writer.close()
+        return None
+
+    def release(self, conn, keep):
+        if conn.slot is not None:
+            conn.slot.release()
+            conn.slot = None
+        idle = self.idle.setdefault(conn.key, [])
+        if keep and len(idle) < MAX_IDLE_PER_HOST and not conn.writer.is_closing():
+            idle.append(conn)
+        else:
+            conn.writer.close()
+
+    async def _send(self, conn, method, target, host):
+        conn.method = method
+        conn.writer.write(
+            f"{method} {target} HTTP/1.1\r\nHost: {host}\r\nUser-Agent: {self.user_agent}\r\n"
+            f"Accept: */*\r\nAccept-Encoding: identity\r\nConnection: keep-alive\r\n\r\n"
+            .encode("latin-1"))
+        await conn.writer.drain()
+        line = await conn.reader.readline()
+        if not line:
+            raise HTTPError("conexão fechada sem resposta")
+        parts = line.decode("latin-1").split(None, 2)
+        if len(parts) < 2 or not parts[0].startswith("HTTP/"):
+            raise HTTPError(f"resposta inválida: {line[:60]!r}")
+        headers = {}
+        while True:
+            line = await conn.reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+        return int(parts[1]), headers
+
+    async def _request_once(self, url, method="GET"):
+        parts = urlsplit(url)
+        scheme = parts.scheme.lower()
+        host = parts.hostname or ""
+        port = parts.port or (443 if scheme == "https" else 80)
+        key = (scheme, host, port)
+        target = (parts.path or "/") + (f"?{parts.query}" if parts.query else "")
+        host_header = host if parts.port is None else f"{host}:{port}"
+
+        slot = None
+        if self.per_host:
+            slot = self.slots.get(host)
+            if slot is None:
+                slot = self.slots[host] = asyncio.Semaphore(self.per_host)
+            await slot.acquire()
+        try:
+            conn = self._acquire_idle(key)
+            if conn is not None:
+                try:
+                    with fase("ttfb"):
+                        status, headers = await self._send(conn, method, target, host_header)
+                    conn.slot = slot
+                    return Response(url, status, headers, conn.reader, conn, self)
+                except (OSError, HTTPError, asyncio.IncompleteReadError):
+                    conn.writer.close()  # keep-alive que o servidor já fechou: abre outra
+                except BaseException:
+                    conn.writer.close()
+                    raise
+            conn = await self._open(key)
+            try:
+                with fase("ttfb"):
+                    status, headers = await self._send(conn, method, target, host_header)
+            except BaseException:
+                conn.writer.close()
+                raise
+        except BaseException:
+            if slot is not None:
+                slot.release()
+            raise
+        conn.slot = slot
+        return Response(url, status, headers, conn.reader, conn, self)
+
+    async def _request_retry(self, url, method):
+        for attempt in range(self.retries + 1):
+            try:
+                return await asyncio.wait_for(self._request_once(url, method), self.timeout)
+            except (ConnectionError, asyncio.IncompleteReadError):
+                # TimeoutError também é OSError, mas não ConnectionError: não é reenviado
+                if attempt == self.retries:
+                    raise
+                self.retried += 1
+                await asyncio.sleep(self.backoff * 2 ** attempt)
+
+    async def request(self, url, method="GET"):
+        """
+        Requisição com redirecionamentos (como o requests.get) e timeout por
+        salto. O chamador precisa consumir o corpo (iter_body/read_size) ou
+        chamar close().
+        """
+        for _ in range(MAX_REDIRECTS + 1):
+            response = await self._request_retry(url, method)
+            location = response.headers.get("location")
+            if response.status not in (301, 302, 303, 307, 308) or not location:
+                return response
+            await asyncio.wait_for(response.read_size(), self.timeout)
+            url = urljoin(url, location)
+        raise HTTPError("redirecionamentos demais")
+
+    def close(self):
+        for conns in self.idle.values():
+            for conn in conns:
+                conn.writer.close()
+        self.idle.clear()
+
+
+PROBE_ERRORS = (OSError, ssl.SSLError, HTTPError, asyncio.TimeoutError,
+                asyncio.IncompleteReadError, ValueError, UnicodeError)
@@ -7,7 +7,8 @@ read -p "Digite o nome do arquivo de saída: " saida
 echo "Realizando busca no crt.sh"
 echo "Aguarde..."
 
-curl -s "https://crt.sh/?q=%25.${domain}&output=json" | jq -r '.[].name_value' | sort -u > $saida.txt
+# O JSON é lido em fluxo e os nomes saem sem repetir (antes: jq + sort -u)
+python3 "$(dirname "$0")/takeover.py" -d "$domain" --ct crt.sh --ct-only --ct-out "$saida.txt" 2>/dev/null
 
 echo "Busca realizada, o valor total de subdomínios encontrados foi: "
 wc -l $saida.txt
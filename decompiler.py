@@ -1,17 +1,45 @@
 #!/usr/bin/env python3
 import argparse
+import base64
+import contextlib
+import errno
+import hashlib
+import io
 import json
 import os
+import re
+import shutil
 import sys
-from urllib.parse import urlparse
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from urllib.parse import unquote, unquote_to_bytes, urljoin, urlparse
 
 import requests
 
+import instrumentacao
+from cliente_http import RETRIES, ClienteHTTP
+from instrumentacao import contar, fase, medir
 
-def fetch_remote_sourcemap(uri, verify_ssl=True):
+READ_SIZE = 1 << 16  # bytes lidos da resposta por vez
+PENDING_DIR = ".sourcemap-pending"  # conteúdos que chegam antes de 'sources'
+
+# Corpo de uma string JSON: tudo até a aspa final, respeitando escapes
+JSON_STRING_BODY = re.compile(rb'[^"\\]*(?:\\.[^"\\]*)*', re.S)
+JSON_SCALAR = re.compile(rb'[-+.0-9eEtruefalsn]*')
+
+# Referência ao mapa no fim de um bundle: //# sourceMappingURL=... ou /*# ... */
+SOURCEMAP_COMMENT = re.compile(r'(?://|/\*)[#@]\s*sourceMappingURL\s*=\s*([^\s\'"*]+)')
+DOWNLOAD_DIR = ".downloads"  # mapas baixados à espera de um processo com -j
+STORE_MODES = ("hardlink", "manifest")
+TIMEOUT = 30.0  # mapas grandes demoram entre um bloco e outro
+
+
+def fetch_remote_sourcemap(uri, verify_ssl=True, client=None):
     """Faz o download do conteúdo do sourcemap remoto a partir da URL."""
+    client = client or ClienteHTTP(timeout=TIMEOUT, verify=verify_ssl)
     try:
-        response = requests.get(uri, verify=verify_ssl)
+        response = client.get(uri)
         response.raise_for_status()
         return response.text
     except requests.RequestException as e:
@@ -19,13 +47,410 @@ def fetch_remote_sourcemap(uri, verify_ssl=True):
         return None
 
 
-def save_source_files(sourcemap_content, output_directory):
+@contextlib.contextmanager
+def open_remote_sourcemap(uri, verify_ssl=True, client=None):
+    """
+    Abre o sourcemap remoto sem ler o corpo; entrega um objeto com ``read(n)``
+    que devolve os bytes já descomprimidos (gzip/deflate), ou None em caso de erro.
+    """
+    client = client or ClienteHTTP(timeout=TIMEOUT, verify=verify_ssl)
+    with contextlib.ExitStack() as stack:
+        try:
+            response = stack.enter_context(client.abrir(uri))
+            response.raise_for_status()
+        except requests.RequestException as e:
+            print(f"[ERRO] Falha ao buscar sourcemap: {e}")
+            yield None
+            return
+        response.raw.decode_content = True
+        yield response.raw
+
+
+def source_file_path(source, output_directory):
+    """
+    Caminho de saída para uma entrada de 'sources', ou None se ele cairia fora
+    de ``output_directory`` (a mensagem de aviso já foi impressa).
+    """
+    # Sanitiza o caminho para remover prefixos indesejados, como "webpack:///"
+    if source.startswith("webpack:///"):
+        source = source.replace("webpack:///", "", 1)
+    elif source.startswith("webpack://"):
+        source = source.replace("webpack://", "", 1)
+
+    # Separa o caminho e o nome do arquivo
+    source = source.lstrip("/")  # Remove barras iniciais
+    # Depois do normpath só sobram '..' no começo (ex.: webpack:///../node_modules/...);
+    # viram '__' para ficar dentro do diretório deste mapa
+    parts = ["__" if part == ".." else part for part in os.path.normpath(source).split(os.sep)]
+    file_path = os.path.join(output_directory, *parts)
+    base = os.path.realpath(output_directory)
+    resolved = os.path.realpath(file_path)
+    if resolved == base or os.path.commonpath([base, resolved]) != base:
+        print(f"[AVISO] Fonte fora do diretório de saída, ignorada: {source}")
+        return None
+    return file_path
+
+
+class BlobStore:
+    """
+    Armazenamento endereçado por conteúdo para as fontes extraídas: cada
+    conteúdo distinto é gravado uma única vez em <raiz>/objects/ab/cdef...
+    (sha256), somente leitura. No modo "hardlink" o arquivo de saída vira um
+    hardlink para o blob (cópia, se o sistema de arquivos não permitir), e um
+    arquivo que já aponta para o mesmo blob não é tocado; no modo "manifest"
+    nada é materializado, só é registrada uma linha em <raiz>/manifest.jsonl,
+    e só quando o caminho é novo ou mudou de conteúdo (rodar de novo não
+    repete linhas).
+    """
+
+    def __init__(self, root, mode="hardlink"):
+        if mode not in STORE_MODES:
+            raise ValueError(f"modo de store inválido: {mode}")
+        self.root = root
+        self.mode = mode
+        self.lock = threading.Lock()
+        self.manifest = None  # caminho -> sha256, carregado na primeira gravação
+        self.counts = dict.fromkeys(
+            ("blobs_new", "bytes_new", "blobs_reused", "files_saved", "files_unchanged"), 0)
+        os.makedirs(os.path.join(root, "objects"), exist_ok=True)
+
+    def __getstate__(self):
+        # Vai para o pool de processos só como (raiz, modo); contadores voltam via merge
+        return {"root": self.root, "mode": self.mode}
+
+    def __setstate__(self, state):
+        self.__init__(state["root"], state["mode"])
+
+    def _count(self, key, n=1):
+        with self.lock:
+            self.counts[key] += n
+
+    def merge(self, counts):
+        with self.lock:
+            for key, n in counts.items():
+                self.counts[key] += n
+
+    def blob_path(self, digest):
+        return os.path.join(self.root, "objects", digest[:2], digest[2:])
+
+    def put(self, data):
+        """Guarda ``data`` (bytes) se ainda não existir; devolve o sha256."""
+        digest = hashlib.sha256(data).hexdigest()
+        path = self.blob_path(digest)
+        if os.path.exists(path):
+            self._count("blobs_reused")
+            return digest
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, 'wb') as f:
+            f.write(data)
+        os.chmod(tmp, 0o444)  # blobs são compartilhados: protege contra edição via link
+        os.replace(tmp, path)
+        self._count("blobs_new")
+        self._count("bytes_new", len(data))
+        return digest
+
+    def materialize(self, file_path, digest):
+        """Faz ``file_path`` apontar para o blob; devolve False se já apontava."""
+        blob = self.blob_path(digest)
+        if self.mode == "manifest":
+            line = json.dumps({"path": file_path, "sha256": digest,
+                               "size": os.path.getsize(blob)})
+            path = os.path.join(self.root, "manifest.jsonl")
+            with self.lock:
+                if self.manifest is None:
+                    self.manifest = self._load_manifest(path)
+                if self.manifest.get(file_path) == digest:
+                    self.counts["files_unchanged"] += 1
+                    return False
+                with open(path, 'a', encoding='utf-8') as f:
+                    f.write(line + "\n")
+                self.manifest[file_path] = digest
+                self.counts["files_saved"] += 1
+            return True
+
+        if os.path.exists(file_path) and os.path.samefile(file_path, blob):
+            self._count("files_unchanged")
+            return False
+        os.makedirs(os.path.dirname(file_path), exist_ok=True)
+        tmp = f"{file_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            os.link(blob, tmp)
+        except OSError as e:
+            if e.errno not in (errno.EXDEV, errno.EPERM, errno.EMLINK, errno.ENOTSUP):
+                raise
+            shutil.copyfile(blob, tmp)
+        os.replace(tmp, file_path)
+        self._count("files_saved")
+        return True
+
+    @staticmethod
+    def _load_manifest(path):
+        """Último sha256 registrado para cada caminho no manifest.jsonl."""
+        entries = {}
+        try:
+            with open(path, encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                        entries[entry["path"]] = entry["sha256"]
+                    except (ValueError, KeyError, TypeError):
+                        continue  # linha cortada por uma execução interrompida
+        except FileNotFoundError:
+            pass
+        return entries
+
+    def save(self, file_path, content):
+        """Guarda o conteúdo (str) e o materializa em ``file_path``."""
+        data = (content if content is not None else "").encode('utf-8', errors='ignore')
+        return self.materialize(file_path, self.put(data))
+
+    def summary(self):
+        c = self.counts
+        print(f"[INFO] Store: {c['blobs_new']} blob(s) novo(s) "
+              f"({c['bytes_new'] / (1 << 20):.1f} MB gravados), "
+              f"{c['blobs_reused']} reaproveitado(s); "
+              f"{c['files_saved']} arquivo(s) materializado(s), "
+              f"{c['files_unchanged']} inalterado(s)")
+
+
+def write_source_file(file_path, content, store=None):
+    """Grava um arquivo fonte, criando os diretórios necessários."""
+    if file_path is None:
+        return
+    if store is not None:
+        try:
+            if store.save(file_path, content):
+                print(f"[INFO] Arquivo salvo: {file_path}")
+            else:
+                print(f"[INFO] Arquivo inalterado: {file_path}")
+        except OSError as e:
+            print(f"[ERRO] Falha ao salvar o arquivo {file_path}: {e}")
+        return
+    os.makedirs(os.path.dirname(file_path), exist_ok=True)
+    try:
+        with open(file_path, 'w', encoding='utf-8', errors='ignore') as f:
+            f.write(content if content is not None else "")
+        print(f"[INFO] Arquivo salvo: {file_path}")
+    except Exception as e:
+        print(f"[ERRO] Falha ao salvar o arquivo {file_path}: {e}")
+
+
+class JsonStream:
+    """
+    Leitor JSON incremental e mínimo sobre um fluxo de bytes. Só sabe o
+    suficiente para percorrer as chaves de um objeto, ler strings e pular
+    valores sem guardá-los; nunca mantém em memória mais que o valor atual.
+    """
+
+    def __init__(self, reader, read_size=READ_SIZE):
+        self.reader = reader
+        self.read_size = read_size
+        self.buf = b""
+        self.pos = 0
+        self.read_seconds = 0.0  # tempo esperando o leitor (rede/disco)
+
+    def _fill(self):
+        """Lê mais um bloco; devolve False no fim do fluxo."""
+        started = time.perf_counter()
+        data = self.reader.read(self.read_size)
+        self.read_seconds += time.perf_counter() - started
+        if not data:
+            return False
+        self.buf = self.buf[self.pos:] + data
+        self.pos = 0
+        return True
+
+    def peek(self):
+        """Próximo caractere significativo (pulando espaços), sem consumir."""
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in b" \t\r\n":
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return chr(self.buf[self.pos])
+            if not self._fill():
+                raise ValueError("fim inesperado do JSON")
+
+    def expect(self, char):
+        found = self.peek()
+        if found != char:
+            raise ValueError(f"esperado '{char}', encontrado '{found}' no JSON")
+        self.pos += 1
+
+    def string_bytes(self, keep=True):
+        """
+        Lê uma string JSON e devolve seu corpo cru (escapes intactos); com
+        ``keep=False`` só a consome, sem guardar nada (ex.: 'mappings').
+        """
+        self.expect('"')
+        pieces = []
+        while True:
+            end = JSON_STRING_BODY.match(self.buf, self.pos).end()
+            if keep:
+                pieces.append(self.buf[self.pos:end])
+            self.pos = end
+            if end < len(self.buf) and self.buf[end] == ord('"'):
+                self.pos += 1
+                return b"".join(pieces)
+            # Bloco acabou no meio da string; um escape partido ao meio fica
+            # no buffer (a regex não o consome) e é completado pela leitura
+            if not self._fill():
+                raise ValueError("string JSON não terminada")
+
+    def string(self):
+        return json.loads(b'"' + self.string_bytes() + b'"')
+
+    def skip_value(self):
+        """Consome um valor qualquer sem construí-lo."""
+        char = self.peek()
+        if char == '"':
+            self.string_bytes(keep=False)
+        elif char in "[{":
+            close = "]" if char == "[" else "}"
+            self.pos += 1
+            if self.peek() == close:
+                self.pos += 1
+                return
+            while True:
+                if close == "}":
+                    self.string_bytes(keep=False)
+                    self.expect(":")
+                self.skip_value()
+                if self.peek() == ",":
+                    self.pos += 1
+                    continue
+                self.expect(close)
+                return
+        else:
+            while True:
+                end = JSON_SCALAR.match(self.buf, self.pos).end()
+                self.pos = end
+                if end < len(self.buf) or not self._fill():
+                    return
+
+    def scalar_or_string(self):
+        """Valor de um elemento de array: str, ou None para null e afins."""
+        if self.peek() == '"':
+            return self.string()
+        self.skip_value()
+        return None
+
+    def items(self):
+        """Itera sobre os elementos do array corrente; o chamador consome cada um."""
+        self.expect("[")
+        if self.peek() == "]":
+            self.pos += 1
+            return
+        while True:
+            yield
+            if self.peek() == ",":
+                self.pos += 1
+                continue
+            self.expect("]")
+            return
+
+    def keys(self):
+        """Itera sobre as chaves do objeto corrente; o chamador consome cada valor."""
+        self.expect("{")
+        if self.peek() == "}":
+            self.pos += 1
+            return
+        while True:
+            key = self.string()
+            self.expect(":")
+            yield key
+            if self.peek() == ",":
+                self.pos += 1
+                continue
+            self.expect("}")
+            return
+
+
+def stream_source_files(reader, output_directory, store=None):
+    """
+    Versão incremental de ``save_source_files``: percorre o sourcemap direto
+    do fluxo e grava cada fonte assim que seu conteúdo é decodificado. 'mappings'
+    e 'names' são pulados sem serem montados, então o pico de memória fica
+    perto do tamanho da maior fonte, e não do mapa inteiro. Se 'sourcesContent'
+    vier antes de 'sources', os conteúdos vão para arquivos temporários e são
+    movidos para o lugar certo quando os nomes chegam.
+    """
+    stream = JsonStream(reader)
+    sources = None
+    has_content = False
+    written = 0  # quantos conteúdos foram lidos
+    pending_dir = os.path.join(output_directory, PENDING_DIR)
+    pending_digests = []
+    started = time.perf_counter()
+    writing = 0.0  # parse = total - leitura - gravação
+    try:
+        for key in stream.keys():
+            if key == "sources" and sources is None:
+                sources = [stream.scalar_or_string() or "" for _ in stream.items()]
+                # Conteúdos que já estavam esperando os nomes
+                with fase("escrita") as w:
+                    for i in range(min(written, len(sources))):
+                        file_path = source_file_path(sources[i], output_directory)
+                        if file_path is None:
+                            continue
+                        if store is not None:
+                            if store.materialize(file_path, pending_digests[i]):
+                                print(f"[INFO] Arquivo salvo: {file_path}")
+                            else:
+                                print(f"[INFO] Arquivo inalterado: {file_path}")
+                            continue
+                        os.makedirs(os.path.dirname(file_path), exist_ok=True)
+                        os.replace(os.path.join(pending_dir, str(i)), file_path)
+                        print(f"[INFO] Arquivo salvo: {file_path}")
+                writing += w.segundos
+            elif key == "sourcesContent" and not has_content:
+                has_content = True
+                for _ in stream.items():
+                    content = stream.scalar_or_string()
+                    with fase("escrita") as w:
+                        if sources is not None:
+                            if written < len(sources):
+                                write_source_file(
+                                    source_file_path(sources[written], output_directory),
+                                    content, store)
+                        elif store is not None:
+                            pending_digests.append(store.put(
+                                (content or "").encode('utf-8', errors='ignore')))
+                        else:
+                            os.makedirs(pending_dir, exist_ok=True)
+                            with open(os.path.join(pending_dir, str(written)), 'w',
+                                      encoding='utf-8', errors='ignore') as f:
+                                f.write(content if content is not None else "")
+                    writing += w.segundos
+                    written += 1
+                    del content
+            else:
+                stream.skip_value()
+    except (ValueError, OSError, requests.RequestException) as e:
+        print(f"[ERRO] Falha ao decodificar JSON: {e}")
+        return None
+    finally:
+        shutil.rmtree(pending_dir, ignore_errors=True)
+        medir("parse", time.perf_counter() - started - stream.read_seconds - writing)
+        contar("itens.fontes", written)
+
+    # Verifica se contém as chaves necessárias
+    if sources is None or not has_content:
+        print("[ERRO] Sourcemap não contém 'sources' ou 'sourcesContent'.")
+        return None
+    if len(sources) != written:
+        print("[AVISO] O número de 'sources' não corresponde ao número de 'sourcesContent'. Alguns arquivos podem não ser salvos corretamente.")
+    return min(len(sources), written)
+
+
+def save_source_files(sourcemap_content, output_directory, store=None):
     """
     Decodifica o sourcemap JSON, e salva cada fonte em sua respectiva pasta
     dentro do diretório de saída fornecido.
     """
     try:
-        map_object = json.loads(sourcemap_content)
+        with fase("parse"):
+            map_object = json.loads(sourcemap_content)
     except json.JSONDecodeError as e:
         print(f"[ERRO] Falha ao decodificar JSON: {e}")
         return
@@ -42,34 +467,271 @@ def save_source_files(sourcemap_content, output_directory):
         print("[AVISO] O número de 'sources' não corresponde ao número de 'sourcesContent'. Alguns arquivos podem não ser salvos corretamente.")
 
     for source, content in zip(sources, sources_content):
-        # Sanitiza o caminho para remover prefixos indesejados, como "webpack:///"
-        if source.startswith("webpack:///"):
-            source = source.replace("webpack:///", "", 1)
-        elif source.startswith("webpack://"):
-            source = source.replace("webpack://", "", 1)
+        with fase("escrita"):
+            write_source_file(source_file_path(source, output_directory), content, store)
+    contar("itens.fontes", min(len(sources), len(sources_content)))
 
-        # Separa o caminho e o nome do arquivo
-        source = source.lstrip("/")  # Remove barras iniciais
-        file_path = os.path.join(output_directory, source)
 
-        # Cria diretórios necessários
-        os.makedirs(os.path.dirname(file_path), exist_ok=True)
+# ---------------------------------------------------------------------------
+# Modo em lote: descoberta de mapas e extração concorrente
+# ---------------------------------------------------------------------------
+def decode_data_uri(uri):
+    """Bytes de um mapa embutido (data:application/json[;base64],...)."""
+    header, _, payload = uri[len("data:"):].partition(",")
+    if header.endswith(";base64"):
+        return base64.b64decode(unquote(payload))
+    return unquote_to_bytes(payload)
+
+
+def find_sourcemap_reference(js_text):
+    """A última referência sourceMappingURL do bundle (a que vale), ou None."""
+    found = None
+    for m in SOURCEMAP_COMMENT.finditer(js_text):
+        found = m.group(1)
+    return found
+
+
+def map_output_dir(output_directory, url, suffix=""):
+    """Diretório de saída de um mapa: <saída>/<host>/<caminho do mapa, sem .map>."""
+    parts = urlparse(url)
+    path = parts.path
+    if path.endswith(".map"):
+        path = path[:-len(".map")]
+    segments = [parts.netloc or "local"] + [seg for seg in path.split("/") if seg]
+    safe = [re.sub(r'[^\w.-]', "_", seg).strip(".") or "_" for seg in segments]
+    safe[-1] += suffix
+    return os.path.join(output_directory, *safe)
+
+
+def extract_map_file(path, output_directory, store=None):
+    """
+    Extrai um mapa já baixado; função de módulo para rodar no pool de processos.
+    Devolve (arquivos salvos, contadores do store deste processo).
+    """
+    try:
+        with open(path, 'rb') as f:
+            files = stream_source_files(f, output_directory, store)
+        return files, (store.counts if store is not None else None)
+    finally:
+        os.remove(path)
+
+
+class CountingReader:
+    """Repassa ``read(n)`` contando os bytes lidos."""
+
+    def __init__(self, reader):
+        self.reader = reader
+        self.bytes = 0
+
+    def read(self, n=-1):
+        data = self.reader.read(n)
+        self.bytes += len(data)
+        return data
 
+
+class BatchExtractor:
+    """
+    Processa uma lista de URLs de bundles JS ou de mapas. Para cada JS, o mapa
+    é descoberto pelo cabeçalho SourceMap/X-SourceMap ou pelo comentário
+    sourceMappingURL (inclusive mapas embutidos em data:). Os downloads usam
+    um único ClienteHTTP (pool de conexões, reenvios limitados) com no máximo
+    ``per_host`` requisições simultâneas por host; cada mapa vai para um
+    diretório próprio.
+    Com ``jobs > 1`` o mapa é baixado para um arquivo temporário e extraído
+    num processo separado, já que a decodificação do JSON segura o GIL.
+    """
+
+    def __init__(self, output_directory, verify_ssl=True, workers=8, per_host=4,
+                 jobs=1, timeout=TIMEOUT, guess_map=False, store=None, retries=RETRIES,
+                 client=None):
+        self.output_directory = output_directory
+        self.store = store
+        self.workers = workers
+        self.jobs = jobs
+        self.guess_map = guess_map
+
+        self.client = client or ClienteHTTP(timeout=timeout, retries=retries, per_host=per_host,
+                                            pool_size=max(workers, per_host), verify=verify_ssl)
+        self.procs = ProcessPoolExecutor(jobs) if jobs > 1 else None
+
+        self.lock = threading.Lock()
+        self.seen_maps = set()
+        self.maps = 0
+        self.files = 0
+        self.bytes = 0
+        self.failures = []
+
+    @contextlib.contextmanager
+    def _get(self, url, stream=False):
+        """
+        GET pelo cliente compartilhado, ocupando uma vaga do host até o fim do
+        corpo. Depois de uma leitura completa, o pouco que sobra (espaços
+        depois do JSON) é lido para a conexão voltar ao pool; se a leitura
+        parou no meio (erro, mapa inválido), a conexão é fechada em vez de
+        baixar o resto de um mapa possivelmente enorme.
+        """
+        with self.client.abrir(url, stream=stream) as response:
+            response.raise_for_status()
+            try:
+                yield response
+            except BaseException:
+                if stream:
+                    response.raw.close()
+                raise
+            if stream:
+                response.raw.drain_conn()
+
+    def discover(self, url):
+        """Referência ao mapa (URL absoluta ou data:) de um JS ou mapa."""
+        if urlparse(url).path.endswith(".map"):
+            return url
+        with self._get(url) as response:
+            header = (response.headers.get("SourceMap")
+                      or response.headers.get("X-SourceMap"))
+            ref = header or find_sourcemap_reference(response.text)
+        if ref is None:
+            if self.guess_map:
+                return url + ".map"
+            raise ValueError("nenhum sourceMappingURL encontrado")
+        if ref.startswith("data:"):
+            return ref
+        return urljoin(url, ref)
+
+    def _extract(self, reader, out_dir):
+        """Extrai a partir de ``reader``; devolve (arquivos, bytes lidos)."""
+        if self.procs is None:
+            counting = CountingReader(reader)
+            return stream_source_files(counting, out_dir, self.store), counting.bytes
+
+        os.makedirs(os.path.join(self.output_directory, DOWNLOAD_DIR), exist_ok=True)
+        tmp = os.path.join(self.output_directory, DOWNLOAD_DIR,
+                           f"{threading.get_ident()}-{time.monotonic_ns()}.map")
+        with open(tmp, 'wb') as f:
+            shutil.copyfileobj(reader, f, READ_SIZE)
+            size = f.tell()
+        files, counts = self.procs.submit(extract_map_file, tmp, out_dir, self.store).result()
+        if counts is not None:
+            self.store.merge(counts)
+        return files, size
+
+    def process(self, url):
+        return self.extract(url, self.discover(url))
+
+    def extract(self, url, ref):
+        """
+        Extrai o mapa ``ref`` (URL absoluta ou data:) do JS ``url``; devolve
+        (diretório, arquivos salvos), ou None se o mapa já foi extraído.
+        """
+        key = url if ref.startswith("data:") else ref
+        with self.lock:
+            if key in self.seen_maps:
+                return None
+            self.seen_maps.add(key)
+
+        if ref.startswith("data:"):
+            out_dir = map_output_dir(self.output_directory, url, ".inline")
+            files, size = self._extract(io.BytesIO(decode_data_uri(ref)), out_dir)
+        else:
+            out_dir = map_output_dir(self.output_directory, ref)
+            with self._get(ref, stream=True) as response:
+                response.raw.decode_content = True
+                files, size = self._extract(response.raw, out_dir)
+                if files is None:
+                    # Dentro do bloco: a conexão é fechada sem ler o resto do mapa
+                    raise ValueError(f"sourcemap inválido: {ref[:80]}")
+        if files is None:
+            raise ValueError(f"sourcemap inválido: {ref[:80]}")
+
+        with self.lock:
+            self.maps += 1
+            self.files += files
+            self.bytes += size
+        contar("itens.mapas")
+        return out_dir, files
+
+    def _run_one(self, url):
         try:
-            with open(file_path, 'w', encoding='utf-8', errors='ignore') as f:
-                f.write(content if content is not None else "")
-            print(f"[INFO] Arquivo salvo: {file_path}")
+            self.process(url)
         except Exception as e:
-            print(f"[ERRO] Falha ao salvar o arquivo {file_path}: {e}")
+            print(f"[ERRO] {url}: {e}")
+            with self.lock:
+                self.failures.append((url, str(e)))
+
+    def run(self, urls):
+        started = time.monotonic()
+        try:
+            with ThreadPoolExecutor(self.workers) as pool:
+                list(pool.map(self._run_one, dict.fromkeys(urls)))
+        finally:
+            self.close()
+        elapsed = time.monotonic() - started
+        self.summary(elapsed)
+
+    def close(self):
+        if self.procs is not None:
+            self.procs.shutdown()
+        shutil.rmtree(os.path.join(self.output_directory, DOWNLOAD_DIR), ignore_errors=True)
+        self.client.fechar()
+
+    def summary(self, elapsed):
+        mb = self.bytes / (1 << 20)
+        rate = mb / elapsed if elapsed > 0 else 0.0
+        print("\n=== Resumo ===")
+        print(f"Mapas extraídos: {self.maps}  |  arquivos salvos: {self.files}")
+        print(f"{mb:.1f} MB em {elapsed:.1f}s ({rate:.1f} MB/s)")
+        print(f"Falhas: {len(self.failures)}")
+        for url, err in self.failures:
+            print(f"  {url}: {err}")
+        if self.store is not None:
+            self.store.summary()
+
+
+def load_url_list(path):
+    """URLs de um arquivo (uma por linha, # comenta); '-' lê da entrada padrão."""
+    f = sys.stdin if path == "-" else open(path, encoding="utf-8")
+    with f:
+        return [line.strip() for line in f if line.strip() and not line.lstrip().startswith("#")]
 
 
 def main():
     parser = argparse.ArgumentParser(description="Extrai arquivos fonte de um sourcemap remoto.")
-    parser.add_argument("uri", help="URL do arquivo .js.map")
+    parser.add_argument("uri", help="URL do arquivo .js.map (com --batch: arquivo com a "
+                                    "lista de URLs de JS ou de mapas, '-' para stdin)")
     parser.add_argument("output_directory", help="Diretório de saída para os arquivos extraídos")
     parser.add_argument("--disable-ssl-verification", action="store_true",
                         help="Desabilita a verificação SSL ao fazer requisições HTTP")
+    parser.add_argument("--no-stream", action="store_true",
+                        help="Carrega o sourcemap inteiro na memória antes de extrair "
+                             "(comportamento antigo; por padrão o JSON é lido em fluxo)")
+    parser.add_argument("--batch", action="store_true",
+                        help="Trata 'uri' como lista de URLs; descobre o mapa de cada JS "
+                             "e extrai cada um em <saída>/<host>/<caminho>")
+    parser.add_argument("-w", "--workers", type=int, default=8,
+                        help="Downloads simultâneos no modo --batch (padrão: 8)")
+    parser.add_argument("--per-host", type=int, default=4,
+                        help="Máximo de requisições simultâneas por host (padrão: 4)")
+    parser.add_argument("-j", "--jobs", type=int, default=1,
+                        help="Processos para extrair mapas em paralelo no modo --batch (padrão: 1)")
+    parser.add_argument("--timeout", type=float, default=TIMEOUT,
+                        help=f"Timeout de leitura de cada requisição, em segundos (padrão: {TIMEOUT:g})")
+    parser.add_argument("--retries", type=int, default=RETRIES,
+                        help=f"Reenvios em falha de conexão ou 429/5xx transitório (padrão: {RETRIES})")
+    parser.add_argument("--guess-map", action="store_true",
+                        help="Sem sourceMappingURL, tenta <url do JS>.map")
+    parser.add_argument("--store", metavar="DIR",
+                        help="Guarda cada conteúdo distinto uma única vez em DIR (sha256) e "
+                             "materializa as fontes a partir dele; arquivos já idênticos "
+                             "não são regravados")
+    parser.add_argument("--store-mode", choices=STORE_MODES, default="hardlink",
+                        help="hardlink: fontes viram hardlinks somente leitura para o blob; "
+                             "manifest: só registra caminho -> sha256 em DIR/manifest.jsonl "
+                             "(padrão: hardlink)")
+    instrumentacao.adicionar_argumentos(parser)
     args = parser.parse_args()
+    if args.workers < 1 or args.per_host < 1 or args.jobs < 1:
+        parser.error("--workers, --per-host e --jobs precisam ser >= 1")
+    if args.timeout <= 0 or args.retries < 0:
+        parser.error("--timeout precisa ser positivo e --retries >= 0")
 
     # Verifica se o diretório de saída existe; se não, cria
     output_dir = os.path.abspath(args.output_directory)
@@ -80,13 +742,41 @@ def main():
             print(f"[ERRO] Não foi possível criar o diretório {output_dir}: {e}")
             sys.exit(1)
 
+    verify_ssl = not args.disable_ssl_verification
+    client = ClienteHTTP(timeout=args.timeout, retries=args.retries, per_host=args.per_host,
+                         pool_size=max(args.workers, args.per_host), verify=verify_ssl)
+    instrumentacao.configurar(args, lambda: {"http": client.estatisticas()})
+    store = BlobStore(os.path.abspath(args.store), args.store_mode) if args.store else None
+    if args.batch:
+        try:
+            urls = load_url_list(args.uri)
+        except OSError as e:
+            print(f"[ERRO] Não foi possível ler a lista {args.uri}: {e}")
+            sys.exit(1)
+        extractor = BatchExtractor(output_dir, workers=args.workers, jobs=args.jobs,
+                                   guess_map=args.guess_map, store=store, client=client)
+        extractor.run(urls)
+        sys.exit(1 if extractor.failures and not extractor.maps else 0)
+
+    if not args.no_stream:
+        # Lê e extrai em fluxo, sem montar o mapa inteiro
+        with open_remote_sourcemap(args.uri, client=client) as reader:
+            if reader is None:
+                sys.exit(1)
+            stream_source_files(reader, output_dir, store)
+        if store is not None:
+            store.summary()
+        return
+
     # Busca o sourcemap remoto
-    sourcemap_content = fetch_remote_sourcemap(args.uri, verify_ssl=not args.disable_ssl_verification)
+    sourcemap_content = fetch_remote_sourcemap(args.uri, client=client)
     if sourcemap_content is None:
         sys.exit(1)
 
     # Salva os arquivos fonte extraídos do sourcemap
-    save_source_files(sourcemap_content, output_dir)
+    save_source_files(sourcemap_content, output_dir, store)
+    if store is not None:
+        store.summary()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+dedup.py ― Conjuntos de "já visto" para fluxos grandes, compartilhados pelo
+3urls.py (--incremental --dedup) e pelo canon_urls.py.
+
+Todos recebem chaves de 128 bits (ex.: blake2b com digest_size=16) em
+``add(chave)``, que devolve True se a chave é nova, e gravam o que falta em
+``save()``:
+
+* ``MemoryDedup``: set em memória; exato, cresce com as chaves únicas.
+* ``DiskDedup``: tabela SQLite; exato, em disco.
+* ``BloomDedup``: filtro de Bloom de memória fixa, com falsos positivos
+  raros (uma chave nova tratada como repetida).
+"""
+
+import math
+import sqlite3
+from typing import Optional, Set
+
+BLOOM_CAPACITY = 10_000_000
+BLOOM_FP_RATE = 1e-4
+
+
+class MemoryDedup:
+    """Conjunto em memória: exato, mas cresce com o número de achados únicos."""
+
+    def __init__(self) -> None:
+        self.seen: Set[bytes] = set()
+
+    def add(self, key: bytes) -> bool:
+        if key in self.seen:
+            return False
+        self.seen.add(key)
+        return True
+
+    def save(self) -> None:
+        pass
+
+
+class DiskDedup:
+    """Conjunto exato em disco: hashes de 128 bits na tabela "seen" de ``db`` (o RunState do 3urls)."""
+
+    def __init__(self, db: sqlite3.Connection) -> None:
+        self.db = db
+        self.db.execute("CREATE TABLE IF NOT EXISTS seen (h BLOB PRIMARY KEY) WITHOUT ROWID")
+
+    def add(self, key: bytes) -> bool:
+        return self.db.execute("INSERT OR IGNORE INTO seen VALUES (?)", (key,)).rowcount == 1
+
+    def save(self) -> None:
+        pass  # as inserções entram no commit de quem é dono do banco
+
+
+class BloomDedup:
+    """
+    Filtro de Bloom com memória fixa, dimensionado para ``capacity`` achados
+    com taxa de falso positivo ``fp_rate``. Um falso positivo faz um achado
+    novo ser tratado como repetido, ou seja, omitido da saída. Até a
+    capacidade, isso acontece com probabilidade <= ``fp_rate`` por achado.
+    Com ``db``, os bits são lidos e gravados na tabela "meta" (chave 'bloom').
+    """
+
+    def __init__(
+        self,
+        capacity: int = BLOOM_CAPACITY,
+        fp_rate: float = BLOOM_FP_RATE,
+        db: Optional[sqlite3.Connection] = None,
+    ) -> None:
+        self.nbits = max(64, int(-capacity * math.log(fp_rate) / (math.log(2) ** 2)))
+        self.k = max(1, round(self.nbits / capacity * math.log(2)))
+        self.db = db
+        self.bits = bytearray((self.nbits + 7) // 8)
+        self.dirty = False
+        if db is not None:
+            row = db.execute("SELECT value FROM meta WHERE key = 'bloom'").fetchone()
+            if row is not None and len(row[0]) == len(self.bits):
+                self.bits[:] = row[0]
+
+    def add(self, key: bytes) -> bool:
+        h1 = int.from_bytes(key[:8], "little")
+        h2 = int.from_bytes(key[8:], "little") | 1
+        bits, nbits = self.bits, self.nbits
+        new = False
+        for i in range(self.k):
+            pos = (h1 + i * h2) % nbits
+            byte, mask = pos >> 3, 1 << (pos & 7)
+            if not bits[byte] & mask:
+                bits[byte] |= mask
+                new = True
+        self.dirty = self.dirty or new
+        return new
+
+    def save(self) -> None:
+        if self.db is not None and self.dirty:
+            self.db.execute(
+                "INSERT OR REPLACE INTO meta VALUES ('bloom', ?)", (bytes(self.bits),)
+            )
+            self.dirty = False
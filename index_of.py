@@ -1,70 +1,718 @@
 import os
+import re
 import argparse
-import requests
-from bs4 import BeautifulSoup
-from urllib.parse import urljoin
+import calendar
+import heapq
+import html
+import itertools
+import sys
+import posixpath
+import sqlite3
+import threading
+import time
+from collections import namedtuple
+from urllib.parse import urljoin, urldefrag, urlsplit, urlunsplit, quote, unquote
 from concurrent.futures import ThreadPoolExecutor
+from cliente_http import RETRIES, TIMEOUT, ClienteHTTP, HostIndisponivel
+import instrumentacao
+from instrumentacao import Cronometro, contar, medir
 
 MAX_WORKERS = 10
+MAX_DEPTH = 32  # limite de profundidade contra loops de symlink no servidor
+MANIFESTO = '.index_of.sqlite'  # manifesto padrão, dentro do diretório de saída
+CHUNK_MIN = 8 << 10   # bloco de leitura dos downloads: entre 8 KiB...
+CHUNK_MAX = 1 << 20   # ...e 1 MiB, conforme o tamanho do arquivo
+ORDENS = ('small', 'large', 'fifo')
 
-def baixar_arquivo(base_url, destino, caminho_relativo):
+try:  # opcional: só para --parser bs4
+    from bs4 import BeautifulSoup
+except ImportError:
+    BeautifulSoup = None
+
+def normalizar_url(url):
+    """
+    Forma canônica usada para detectar caminhos repetidos: sem fragmento, sem
+    ./.., com o percent-encoding do caminho refeito de um jeito só.
+    """
+    url, _ = urldefrag(url)
+    partes = urlsplit(url)
+    caminho = posixpath.normpath(unquote(partes.path) or '/')
+    if partes.path.endswith('/') and not caminho.endswith('/'):
+        caminho += '/'
+    caminho = quote(caminho, safe="/:@!$&'()*+,;=~")
+    return urlunsplit((partes.scheme.lower(), partes.netloc.lower(), caminho, partes.query, ''))
+
+# ---------------------------------------------------------------------------
+# Leitura das páginas de listagem (Apache, nginx, IIS, lighttpd...)
+# ---------------------------------------------------------------------------
+Entrada = namedtuple('Entrada', 'href tamanho mtime')  # tamanho em bytes, mtime epoch (UTC)
+
+LEITURA_LISTAGEM = 1 << 16
+MAX_LINHA = 1 << 20  # sem quebra de linha por tanto tempo, corta no último </a>
+
+ANCORA = re.compile(r'<a\s[^>]*?href\s*=\s*(?:"([^"]*)"|\'([^\']*)\'|([^\s>]+))[^>]*>.*?</a\s*>',
+                    re.I | re.S)
+SEPARADOR = re.compile(r'\n|<br\s*/?>|</tr\s*>', re.I)
+TAG = re.compile(r'<[^>]*>')
+MESES = {m: i for i, m in enumerate(
+    ('jan', 'feb', 'mar', 'apr', 'may', 'jun', 'jul', 'aug', 'sep', 'oct', 'nov', 'dec'), 1)}
+DATAS = (
+    # nginx / Apache antigo: 05-Jan-2023 12:34
+    re.compile(r'(?P<d>\d{1,2})-(?P<mes>[A-Za-z]{3})-(?P<a>\d{4})\s+(?P<h>\d{1,2}):(?P<m>\d{2})(?::(?P<s>\d{2}))?'),
+    # Apache 2.4: 2023-01-05 12:34 / lighttpd: 2023-Jan-05 12:34:56
+    re.compile(r'(?P<a>\d{4})-(?P<mes>\d{2}|[A-Za-z]{3})-(?P<d>\d{2})\s+(?P<h>\d{1,2}):(?P<m>\d{2})(?::(?P<s>\d{2}))?'),
+    # IIS: 1/5/2023  12:34 PM  ou  Thursday, January 5, 2023 12:34 PM
+    re.compile(r'(?P<mes>\d{1,2})/(?P<d>\d{1,2})/(?P<a>\d{4})\s+(?P<h>\d{1,2}):(?P<m>\d{2})(?::(?P<s>\d{2}))?\s*(?P<ap>[AP]M)?', re.I),
+    re.compile(r'(?P<mes>[A-Za-z]{3})[a-z]*\s+(?P<d>\d{1,2}),\s+(?P<a>\d{4})\s+(?P<h>\d{1,2}):(?P<m>\d{2})(?::(?P<s>\d{2}))?\s*(?P<ap>[AP]M)?', re.I),
+)
+TAMANHO = re.compile(r'^\s*(?:(?P<n>\d+(?:\.\d+)?)\s*(?P<u>[KMGTP]?)i?B?|(?P<dir>-|&lt;dir&gt;|<dir>))(?:\s|$)', re.I)
+UNIDADES = {'': 1, 'K': 1 << 10, 'M': 1 << 20, 'G': 1 << 30, 'T': 1 << 40, 'P': 1 << 50}
+
+def _data(texto):
+    """(epoch, fim do casamento) da primeira data reconhecida em ``texto``."""
+    for regex in DATAS:
+        m = regex.search(texto)
+        if not m:
+            continue
+        mes = m.group('mes')
+        mes = int(mes) if mes.isdigit() else MESES.get(mes[:3].lower())
+        hora = int(m.group('h'))
+        ap = (m.groupdict().get('ap') or '').upper()
+        if ap == 'PM' and hora < 12:
+            hora += 12
+        elif ap == 'AM' and hora == 12:
+            hora = 0
+        try:
+            epoch = calendar.timegm((int(m.group('a')), mes, int(m.group('d')), hora,
+                                     int(m.group('m')), int(m.group('s') or 0)))
+        except (TypeError, ValueError, OverflowError):
+            continue
+        return epoch, m.start(), m.end()
+    return None
+
+def _metadados(texto):
+    """(tamanho, mtime) do texto em volta de um link; None no que faltar."""
+    texto = html.unescape(TAG.sub(' ', texto)).replace('\xa0', ' ')
+    achado = _data(texto)
+    if achado is None:
+        return None, None
+    mtime, inicio, fim = achado
+    # Apache/nginx: tamanho depois da data; IIS: tamanho entre a data e o link
+    m = TAMANHO.match(texto[fim:])
+    if m is None or m.group('dir'):
+        return None, mtime
+    return int(float(m.group('n')) * UNIDADES[m.group('u').upper()]), mtime
+
+def _entradas_da_linha(linha):
+    ancoras = list(ANCORA.finditer(linha))
+    for i, a in enumerate(ancoras):
+        href = html.unescape(a.group(1) or a.group(2) or a.group(3) or '')
+        # Metadados depois do link (Apache, nginx) ou antes dele (IIS)
+        fim = ancoras[i + 1].start() if i + 1 < len(ancoras) else len(linha)
+        tamanho, mtime = _metadados(linha[a.end():fim])
+        if mtime is None:
+            inicio = ancoras[i - 1].end() if i else 0
+            tamanho, mtime = _metadados(linha[inicio:a.start()])
+        yield Entrada(href, tamanho, mtime)
+
+def extrair_entradas(partes):
+    """
+    Extrai os links de uma listagem a partir de pedaços de texto, sem montar
+    a página inteira: cada linha (\\n, <br> ou </tr>) é processada assim que
+    chega, e só a linha incompleta fica em memória. Reconhece a data e o
+    tamanho das listagens automáticas de Apache, nginx, IIS e lighttpd.
+    """
+    resto = ''
+    for parte in partes:
+        resto += parte
+        ultimo = None
+        for ultimo in SEPARADOR.finditer(resto):
+            pass
+        if ultimo is None:
+            if len(resto) < MAX_LINHA:
+                continue
+            corte = resto.lower().rfind('</a>')
+            if corte < 0:
+                continue
+            corte += len('</a>')
+        else:
+            corte = ultimo.end()
+        for linha in SEPARADOR.split(resto[:corte]):
+            yield from _entradas_da_linha(linha)
+        resto = resto[corte:]
+    for linha in SEPARADOR.split(resto):
+        yield from _entradas_da_linha(linha)
+
+def extrair_links_bs4(html_texto):
+    """Caminho antigo: árvore completa do BeautifulSoup só para ler os href."""
+    soup = BeautifulSoup(html_texto, 'html.parser')
+    return [link.get('href') for link in soup.find_all('a')]
+
+def extrair_links(html_texto):
+    """Todos os href de uma página de listagem."""
+    return [e.href for e in extrair_entradas([html_texto])]
+
+class Manifesto:
+    """
+    Estado do espelho em SQLite: para cada URL, caminho local, tamanho, ETag,
+    Last-Modified e se o download terminou. Permite retomar arquivos
+    parciais com Range e revalidar os completos com requisições condicionais.
+    Uma conexão só, protegida por lock, compartilhada pelas threads.
+    """
+
+    def __init__(self, caminho):
+        self.lock = threading.Lock()
+        self.db = sqlite3.connect(caminho, check_same_thread=False)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.execute(
+            """
+            CREATE TABLE IF NOT EXISTS arquivos (
+                url TEXT PRIMARY KEY,
+                caminho TEXT,
+                tamanho INTEGER,
+                etag TEXT,
+                last_modified TEXT,
+                completo INTEGER NOT NULL DEFAULT 0,
+                visto REAL
+            )
+            """
+        )
+
+    def obter(self, url):
+        with self.lock:
+            linha = self.db.execute(
+                "SELECT tamanho, etag, last_modified, completo FROM arquivos WHERE url = ?",
+                (url,)).fetchone()
+        if linha is None:
+            return None
+        return dict(zip(('tamanho', 'etag', 'last_modified', 'completo'), linha))
+
+    def iniciar(self, url, caminho, tamanho, etag, last_modified):
+        """Registra um download em andamento (antes do primeiro byte gravado)."""
+        with self.lock, self.db:
+            self.db.execute(
+                "INSERT OR REPLACE INTO arquivos VALUES (?, ?, ?, ?, ?, 0, ?)",
+                (url, caminho, tamanho, etag, last_modified, time.time()))
+
+    def concluir(self, url, tamanho):
+        with self.lock, self.db:
+            self.db.execute(
+                "UPDATE arquivos SET completo = 1, tamanho = ?, visto = ? WHERE url = ?",
+                (tamanho, time.time(), url))
+
+    def tocar(self, url):
+        with self.lock, self.db:
+            self.db.execute("UPDATE arquivos SET visto = ? WHERE url = ?", (time.time(), url))
+
+    def fechar(self):
+        with self.lock:
+            self.db.close()
+
+def _validador(registro):
+    return registro.get('etag') or registro.get('last_modified')
+
+def _inicio_do_range(resposta):
+    """Primeiro byte de um Content-Range ("bytes 100-999/1000"), ou None."""
+    valor = resposta.headers.get('Content-Range', '')
+    try:
+        return int(valor.split()[1].split('-')[0])
+    except (IndexError, ValueError):
+        return None
+
+def baixar_arquivo(base_url, destino, caminho_relativo, cliente=None, manifesto=None, confiar=False,
+                   tamanho_chunk=8192, ao_receber=None):
+    """
+    Baixa um arquivo para ``destino``. Com ``manifesto``, o download vai para
+    "<arquivo>.part" e só troca de nome ao terminar; um parcial com ETag ou
+    Last-Modified conhecido é retomado com Range/If-Range, e um arquivo
+    completo é revalidado com If-None-Match/If-Modified-Since (ou nem é
+    consultado, com ``confiar``). ``ao_receber(n)`` é chamado a cada bloco
+    lido (limite de banda, métricas).
+
+    Devolve 'baixado', 'retomado', 'inalterado' ou 'erro'.
+    """
+    cliente = cliente or ClienteHTTP()
     url_completo = urljoin(base_url, caminho_relativo)
-    destino_arquivo = os.path.join(destino, caminho_relativo)
+    destino_arquivo = os.path.join(destino, unquote(caminho_relativo))
+    parcial = destino_arquivo + '.part' if manifesto else destino_arquivo
 
     os.makedirs(os.path.dirname(destino_arquivo), exist_ok=True)
 
+    # Sem compressão de transporte: Range precisa contar os bytes do arquivo
+    cabecalhos = {'Accept-Encoding': 'identity'}
+    inicio = 0
+    registro = manifesto.obter(url_completo) if manifesto else None
+    if registro and registro['completo'] and os.path.exists(destino_arquivo):
+        if confiar:
+            print(f"[=] Já baixado: {url_completo}")
+            return 'inalterado'
+        if registro['etag']:
+            cabecalhos['If-None-Match'] = registro['etag']
+        if registro['last_modified']:
+            cabecalhos['If-Modified-Since'] = registro['last_modified']
+    elif registro and _validador(registro) and os.path.exists(parcial):
+        inicio = os.path.getsize(parcial)
+        if inicio:
+            cabecalhos['Range'] = f'bytes={inicio}-'
+            cabecalhos['If-Range'] = _validador(registro)
+
     try:
-        with requests.get(url_completo, stream=True, timeout=15) as r:
+        with cliente.abrir(url_completo, headers=cabecalhos) as r:
+            if r.status_code == 304:
+                manifesto.tocar(url_completo)
+                print(f"[=] Inalterado: {url_completo}")
+                return 'inalterado'
+            if r.status_code == 416 and inicio:
+                # Parcial inválido (arquivo encolheu?): recomeça do zero
+                os.remove(parcial)
+                return baixar_arquivo(base_url, destino, caminho_relativo, cliente, manifesto, confiar,
+                                      tamanho_chunk, ao_receber)
             r.raise_for_status()
-            with open(destino_arquivo, 'wb') as f:
-                for chunk in r.iter_content(chunk_size=8192):
+
+            retomando = inicio and r.status_code == 206 and _inicio_do_range(r) == inicio
+            if not retomando:
+                inicio = 0
+            if manifesto:
+                tamanho = r.headers.get('Content-Length')
+                tamanho = int(tamanho) + inicio if tamanho and tamanho.isdigit() else None
+                manifesto.iniciar(url_completo, destino_arquivo, tamanho,
+                                  r.headers.get('ETag'), r.headers.get('Last-Modified'))
+            with open(parcial, 'ab' if retomando else 'wb') as f:
+                for chunk in r.iter_content(chunk_size=tamanho_chunk):
+                    t = time.perf_counter()
                     f.write(chunk)
+                    medir('escrita', time.perf_counter() - t)
+                    if ao_receber:
+                        ao_receber(len(chunk))
+                tamanho_final = f.tell()
+            contar('bytes.disco', tamanho_final - (inicio if retomando else 0))
+        if manifesto:
+            os.replace(parcial, destino_arquivo)
+            manifesto.concluir(url_completo, tamanho_final)
+        if retomando:
+            print(f"[✓] Retomado: {url_completo} (a partir de {inicio} bytes)")
+            return 'retomado'
         print(f"[✓] Baixado: {url_completo}")
+        return 'baixado'
     except Exception as e:
         print(f"[ERRO] {url_completo}: {e}")
+        return 'erro'
 
-def explorar_e_baixar(base_url, destino_base, caminho_relativo="", executor=None):
-    url_atual = urljoin(base_url, caminho_relativo)
-    print(f"[LISTANDO] {url_atual}")
+# ---------------------------------------------------------------------------
+# Agendamento: banda, métricas e tamanho de bloco
+# ---------------------------------------------------------------------------
+def ler_bytes(texto):
+    """'500K', '10M', '1.5G' ou bytes puros -> inteiro."""
+    texto = texto.strip().upper().rstrip('B').rstrip('I')
+    unidade = UNIDADES.get(texto[-1:], None) if texto[-1:].isalpha() else 1
+    if unidade is None:
+        raise ValueError(f"tamanho inválido: {texto}")
+    return int(float(texto.rstrip('KMGTP')) * unidade)
 
-    destino_dir = os.path.join(destino_base, caminho_relativo)
-    os.makedirs(destino_dir, exist_ok=True)
+def formatar_bytes(n):
+    for unidade in ('B', 'KB', 'MB', 'GB', 'TB'):
+        if abs(n) < 1024 or unidade == 'TB':
+            return f"{n:.1f} {unidade}" if unidade != 'B' else f"{int(n)} B"
+        n /= 1024
 
-    try:
-        resposta = requests.get(url_atual, timeout=10)
-        resposta.raise_for_status()
-    except Exception as e:
-        print(f"[ERRO] {url_atual}: {e}")
-        return
+def escolher_chunk(tamanho, limite=None):
+    """
+    Bloco de leitura para um arquivo: ~1/64 do tamanho, entre CHUNK_MIN e
+    CHUNK_MAX (64 KiB se o tamanho for desconhecido); com limite de banda, no
+    máximo 1/10 do limite por segundo, para a taxa não andar aos saltos.
+    """
+    chunk = 64 << 10 if tamanho is None else max(CHUNK_MIN, min(CHUNK_MAX, tamanho // 64))
+    if limite:
+        chunk = max(1024, min(chunk, limite // 10))
+    return chunk
 
-    soup = BeautifulSoup(resposta.text, 'html.parser')
-    links = soup.find_all('a')
+class LimiteDeBanda:
+    """
+    Balde de fichas compartilhado: no máximo ``taxa`` bytes/s somando todas
+    as threads, com rajada de no máximo 1/10 de segundo.
+    """
 
-    for link in links:
-        href = link.get('href')
-        if not href or href.startswith('?') or href.startswith('/') or href in ('../', '/'):
-            continue
+    def __init__(self, taxa):
+        self.taxa = taxa
+        self.rajada = taxa / 10
+        self.fichas = 0.0
+        self.ultimo = time.monotonic()
+        self.lock = threading.Lock()
 
-        novo_caminho = os.path.join(caminho_relativo, href)
-        if href.endswith('/'):
-            # Diretório: entrar recursivamente
-            explorar_e_baixar(base_url, destino_base, novo_caminho, executor)
-        else:
-            # Arquivo: baixar já
-            if executor:
-                executor.submit(baixar_arquivo, base_url, destino_base, novo_caminho)
+    def consumir(self, n):
+        with self.lock:
+            agora = time.monotonic()
+            self.fichas = min(self.rajada, self.fichas + (agora - self.ultimo) * self.taxa)
+            self.ultimo = agora
+            self.fichas -= n
+            espera = -self.fichas / self.taxa if self.fichas < 0 else 0
+        if espera:
+            time.sleep(espera)
+
+class Metricas:
+    """
+    Contadores do espelho e o relatório periódico em stderr: bytes/s e
+    arquivos/s (média móvel), fila, downloads ativos e ETA pelo tamanho
+    listado do que ainda falta.
+    """
+
+    def __init__(self, intervalo=2.0, saida=sys.stderr):
+        self.intervalo = intervalo
+        self.saida = saida
+        self.lock = threading.Lock()
+        self.inicio = time.monotonic()
+        self.bytes = 0
+        self.arquivos = 0
+        self.na_fila = 0
+        self.ativos = 0
+        self.previsto = 0  # bytes listados ainda não recebidos (estimativa)
+        self.taxa_bytes = None
+        self.taxa_arquivos = None
+        self.parar = threading.Event()
+        self.thread = None
+
+    def enfileirado(self, tamanho):
+        with self.lock:
+            self.na_fila += 1
+            self.previsto += tamanho or 0
+
+    def iniciado(self):
+        with self.lock:
+            self.na_fila -= 1
+            self.ativos += 1
+
+    def recebido(self, n):
+        with self.lock:
+            self.bytes += n
+            self.previsto -= n
+
+    def concluido(self, tamanho, recebidos):
+        """Fim de um download; acerta a previsão com o que de fato veio."""
+        with self.lock:
+            self.ativos -= 1
+            self.arquivos += 1
+            self.previsto -= (tamanho or 0) - recebidos
+
+    def linha(self):
+        with self.lock:
+            taxa = self.taxa_bytes or 0
+            eta = '--:--:--'
+            if taxa > 0 and self.previsto > 0:
+                eta = time.strftime('%H:%M:%S', time.gmtime(self.previsto / taxa))
+            return (f"[PROGRESSO] {formatar_bytes(taxa)}/s | {self.taxa_arquivos or 0:.1f} arq/s | "
+                    f"{formatar_bytes(self.bytes)} em {self.arquivos} arq | fila {self.na_fila} | "
+                    f"ativos {self.ativos} | ETA {eta}")
+
+    def _amostrar(self, anterior):
+        """Atualiza as médias móveis a partir da amostra ``anterior``."""
+        agora = time.monotonic()
+        with self.lock:
+            dt = max(agora - anterior[0], 1e-6)
+            b = (self.bytes - anterior[1]) / dt
+            a = (self.arquivos - anterior[2]) / dt
+            self.taxa_bytes = b if self.taxa_bytes is None else 0.3 * b + 0.7 * self.taxa_bytes
+            self.taxa_arquivos = a if self.taxa_arquivos is None else 0.3 * a + 0.7 * self.taxa_arquivos
+            return agora, self.bytes, self.arquivos
+
+    def _relatar(self):
+        amostra = (self.inicio, 0, 0)
+        while not self.parar.wait(self.intervalo):
+            amostra = self._amostrar(amostra)
+            print(self.linha(), file=self.saida, flush=True)
+
+    def comecar(self):
+        if self.intervalo > 0:
+            self.thread = threading.Thread(target=self._relatar, daemon=True)
+            self.thread.start()
+
+    def terminar(self):
+        self.parar.set()
+        if self.thread:
+            self.thread.join()
+        total = time.monotonic() - self.inicio
+        print(f"[MÉTRICAS] {formatar_bytes(self.bytes)} em {self.arquivos} arquivo(s), "
+              f"{total:.1f}s ({formatar_bytes(self.bytes / total if total else 0)}/s, "
+              f"{self.arquivos / total if total else 0:.1f} arq/s)", file=self.saida, flush=True)
+
+class Rastreador:
+    """
+    Espelha uma listagem "Index of" usando uma fila de trabalho única: a
+    leitura de cada diretório e o download de cada arquivo são tarefas no
+    mesmo ThreadPoolExecutor, com o mesmo ClienteHTTP. Cada URL (normalizada) é
+    visitada uma vez só, links que saem da URL base são ignorados e a
+    profundidade é limitada, o que protege contra ciclos. As listagens são
+    lidas em fluxo por ``extrair_entradas`` (ou pelo BeautifulSoup, com
+    ``parser='bs4'``); com ``apenas_listar`` nada é baixado e os arquivos
+    encontrados, com tamanho e data, são impressos no fim.
+
+    Os downloads passam por uma fila de prioridade: cada tarefa de download
+    no pool retira, na hora em que roda, o melhor arquivo segundo ``ordem``
+    ('small': menores primeiro pelo tamanho listado; 'large': maiores
+    primeiro; 'fifo': ordem de descoberta). ``por_host`` limita as conexões
+    simultâneas a cada host (listagens inclusive), ``taxa`` as requisições/s a
+    cada host e ``limite_banda`` a soma de bytes/s de todos os downloads.
+    """
+
+    def __init__(self, base_url, destino, threads=MAX_WORKERS, max_depth=MAX_DEPTH, cliente=None,
+                 manifesto=None, confiar=False, parser='rapido', apenas_listar=False,
+                 ordem='small', por_host=None, limite_banda=None, metricas=None,
+                 timeout=TIMEOUT, retries=RETRIES, taxa=None):
+        if parser == 'bs4' and BeautifulSoup is None:
+            raise RuntimeError("--parser bs4 exige o pacote beautifulsoup4")
+        if not base_url.endswith('/'):
+            base_url += '/'
+        self.base_url = base_url
+        self.base_norm = normalizar_url(base_url)
+        self.destino = destino
+        self.max_depth = max_depth
+        self.manifesto = manifesto
+        self.confiar = confiar
+        self.parser = parser
+        self.apenas_listar = apenas_listar
+        self.listados = []
+        self.cliente = cliente or ClienteHTTP(timeout=timeout, retries=retries, per_host=por_host or threads,
+                                              rate=taxa, pool_size=threads)
+        self.executor = ThreadPoolExecutor(max_workers=threads)
+        self.ordem = ordem
+        self.limite_banda = limite_banda
+        self.banda = LimiteDeBanda(limite_banda) if limite_banda else None
+        self.metricas = metricas or Metricas(intervalo=0)
+
+        self.lock = threading.Lock()
+        self.fila = []  # heap de (chave de prioridade, seq, caminho, Entrada)
+        self.seq = itertools.count()
+        self.ocioso = threading.Condition(self.lock)
+        self.pendentes = 0
+        self.vistos = set()
+        self.diretorios = 0
+        self.arquivos = 0
+
+    def _novo(self, url):
+        """Marca a URL como vista; False se ela já tinha sido enfileirada."""
+        chave = normalizar_url(url)
+        with self.lock:
+            if chave in self.vistos:
+                return False
+            self.vistos.add(chave)
+            return True
+
+    def _enfileirar(self, funcao, *args):
+        with self.lock:
+            self.pendentes += 1
+        self.executor.submit(self._executar, funcao, *args)
+
+    def _executar(self, funcao, *args):
+        try:
+            funcao(*args)
+        except Exception as e:
+            print(f"[ERRO] {args[0] if args else ''}: {e}")
+        finally:
+            with self.lock:
+                self.pendentes -= 1
+                if self.pendentes == 0:
+                    self.ocioso.notify_all()
+
+    def _prioridade(self, entrada):
+        if self.ordem == 'fifo':
+            return 0
+        if entrada.tamanho is None:
+            return float('inf')  # tamanho desconhecido: por último
+        return entrada.tamanho if self.ordem == 'small' else -entrada.tamanho
+
+    def _agendar(self, caminho_relativo, entrada):
+        with self.lock:
+            heapq.heappush(self.fila, (self._prioridade(entrada), next(self.seq), caminho_relativo, entrada))
+        self.metricas.enfileirado(entrada.tamanho)
+        self._enfileirar(self._despachar)
+
+    def _despachar(self):
+        """Tarefa de download: pega o melhor arquivo da fila no momento em que roda."""
+        with self.lock:
+            _, _, caminho_relativo, entrada = heapq.heappop(self.fila)
+        self.baixar(caminho_relativo, entrada)
+
+    def _relativo(self, url):
+        """Caminho de ``url`` relativo à base, ou None se estiver fora dela."""
+        norm = normalizar_url(url)
+        if not norm.startswith(self.base_norm):
+            return None
+        return norm[len(self.base_norm):]
+
+    def listar(self, caminho_relativo, profundidade):
+        url_atual = urljoin(self.base_url, caminho_relativo)
+        print(f"[LISTANDO] {url_atual}")
+        if not self.apenas_listar:
+            os.makedirs(os.path.join(self.destino, unquote(caminho_relativo)), exist_ok=True)
+
+        try:
+            with self.cliente.abrir(url_atual, stream=self.parser != 'bs4') as resposta:
+                resposta.raise_for_status()
+                if self.parser == 'bs4':
+                    texto = resposta.text
+                    inicio = time.perf_counter()
+                    entradas = [Entrada(h, None, None) for h in extrair_links_bs4(texto)]
+                    medir('parse', time.perf_counter() - inicio)
+                else:
+                    if resposta.encoding is None:
+                        resposta.encoding = 'utf-8'
+                    rede = Cronometro()
+                    partes = rede.iterar(resposta.iter_content(LEITURA_LISTAGEM, decode_unicode=True))
+                    inicio = time.perf_counter()
+                    entradas = list(extrair_entradas(partes))
+                    medir('parse', time.perf_counter() - inicio - rede.segundos)
+        except Exception as e:
+            print(f"[ERRO] {url_atual}: {e}")
+            return
+        with self.lock:
+            self.diretorios += 1
+        contar('itens.diretorios')
+        contar('itens.entradas', len(entradas))
+
+        for url, entrada in self._filhos(url_atual, entradas):
+            novo_caminho = self._relativo(url)
+            if novo_caminho.endswith('/'):
+                if profundidade < self.max_depth:
+                    self._enfileirar(self.listar, novo_caminho, profundidade + 1)
+            elif self.apenas_listar:
+                self.listados.append((url, entrada))
             else:
-                baixar_arquivo(base_url, destino_base, novo_caminho)
+                self._agendar(novo_caminho, entrada)
+
+    def _filhos(self, url_atual, entradas):
+        """(URL, Entrada) dos links novos que ficam dentro da base."""
+        for entrada in entradas:
+            href = entrada.href
+            if not href or href.startswith('?') or href.startswith('#'):
+                continue
+            url = urljoin(url_atual, href)
+            if not self._relativo(url) or not self._novo(url):
+                # Fora da base, a própria base, "../" ou já enfileirado
+                continue
+            yield url, entrada
+
+    def baixar(self, caminho_relativo, entrada=None):
+        tamanho = entrada.tamanho if entrada else None
+        recebidos = 0
+
+        def ao_receber(n):
+            nonlocal recebidos
+            recebidos += n
+            self.metricas.recebido(n)
+            if self.banda:
+                self.banda.consumir(n)
+
+        url = urljoin(self.base_url, caminho_relativo)
+        try:
+            with self.cliente.vaga(url):
+                self.metricas.iniciado()
+                try:
+                    resultado = baixar_arquivo(self.base_url, self.destino, caminho_relativo, self.cliente,
+                                               self.manifesto, self.confiar,
+                                               escolher_chunk(tamanho, self.limite_banda), ao_receber)
+                finally:
+                    self.metricas.concluido(tamanho, recebidos)
+        except HostIndisponivel as e:
+            # Disjuntor aberto: o arquivo sai da fila (e da ETA) como erro, sem baixar
+            self.metricas.iniciado()
+            self.metricas.concluido(tamanho, 0)
+            print(f"[ERRO] {url}: {e}")
+            resultado = 'erro'
+        with self.lock:
+            self.arquivos += 1
+        contar(f'itens.{resultado}')
+
+    def rodar(self, caminho_relativo=""):
+        """Enfileira a listagem inicial e espera a fila esvaziar."""
+        self._novo(urljoin(self.base_url, caminho_relativo))
+        self._enfileirar(self.listar, caminho_relativo, 0)
+        self.metricas.comecar()
+        try:
+            with self.lock:
+                while self.pendentes:
+                    self.ocioso.wait()
+        finally:
+            self.metricas.terminar()
+        self.executor.shutdown()
+        for url, entrada in sorted(self.listados):
+            tamanho = '-' if entrada.tamanho is None else entrada.tamanho
+            data = '-' if entrada.mtime is None else time.strftime('%Y-%m-%d %H:%M:%S', time.gmtime(entrada.mtime))
+            print(f"{url}\t{tamanho}\t{data}")
+        print(f"[FIM] {self.diretorios} diretório(s) listado(s), {self.arquivos} arquivo(s) processado(s)")
+        print(f"[HTTP] {self.cliente.resumo()}", file=sys.stderr)
+        self.cliente.fechar()
+
+def explorar_e_baixar(base_url, destino_base, caminho_relativo="", executor=None, threads=MAX_WORKERS):
+    """
+    Compatibilidade: espelha a partir de ``caminho_relativo``. O ``executor``
+    externo não é mais usado; o Rastreador tem o seu próprio pool, com
+    ``threads`` workers.
+    """
+    Rastreador(base_url, destino_base, threads=threads).rodar(caminho_relativo)
 
 def main():
     parser = argparse.ArgumentParser(description='Download recursivo direto com progresso.')
     parser.add_argument('url', help='URL da página "Index of"')
     parser.add_argument('-o', '--output', default='downloads', help='Diretório de saída')
     parser.add_argument('-t', '--threads', type=int, default=MAX_WORKERS, help='Número de threads simultâneas')
+    parser.add_argument('--max-depth', type=int, default=MAX_DEPTH,
+                        help=f'Profundidade máxima de subdiretórios (padrão: {MAX_DEPTH})')
+    parser.add_argument('--manifest', metavar='ARQ',
+                        help=f'Manifesto SQLite do espelho (padrão: <saída>/{MANIFESTO})')
+    parser.add_argument('--no-manifest', action='store_true',
+                        help='Sem manifesto: baixa tudo de novo a cada execução (comportamento antigo)')
+    parser.add_argument('--trust-manifest', action='store_true',
+                        help='Não revalida arquivos já completos no manifesto; '
+                             'uma nova execução custa só as listagens')
+    parser.add_argument('--parser', choices=('rapido', 'bs4'), default='rapido',
+                        help='Leitura das listagens: extrator em fluxo (padrão) ou BeautifulSoup')
+    parser.add_argument('--list-only', action='store_true',
+                        help='Só percorre as listagens e imprime URL, tamanho e data de cada arquivo')
+    parser.add_argument('--order', choices=ORDENS, default='small',
+                        help='Ordem dos downloads pelo tamanho listado: small (menores primeiro, '
+                             'padrão), large ou fifo (ordem de descoberta)')
+    parser.add_argument('--per-host', type=int,
+                        help='Máximo de conexões simultâneas por host (padrão: igual a --threads)')
+    parser.add_argument('--rate', type=float, metavar='REQ/S',
+                        help='Máximo de requisições por segundo a cada host (padrão: sem limite)')
+    parser.add_argument('--timeout', type=float, default=TIMEOUT,
+                        help=f'Timeout de leitura de cada requisição, em segundos (padrão: {TIMEOUT:g})')
+    parser.add_argument('--retries', type=int, default=RETRIES,
+                        help=f'Reenvios em falha de conexão ou 429/5xx transitório (padrão: {RETRIES})')
+    parser.add_argument('--limit-rate', metavar='TAXA',
+                        help='Limite global de banda, em bytes/s (ex.: 500K, 10M)')
+    parser.add_argument('--progress', type=float, default=2.0, metavar='SEG',
+                        help='Intervalo do relatório de progresso em stderr; 0 desliga (padrão: 2)')
+    instrumentacao.adicionar_argumentos(parser)
     args = parser.parse_args()
+    try:
+        limite_banda = ler_bytes(args.limit_rate) if args.limit_rate else None
+    except ValueError as e:
+        parser.error(str(e))
+    if (args.per_host is not None and args.per_host < 1) or (limite_banda is not None and limite_banda < 1):
+        parser.error('--per-host e --limit-rate precisam ser positivos')
+    if args.timeout <= 0 or args.retries < 0 or (args.rate is not None and args.rate <= 0):
+        parser.error('--timeout e --rate precisam ser positivos e --retries >= 0')
+    if args.no_manifest and (args.manifest or args.trust_manifest):
+        parser.error('--no-manifest não combina com --manifest/--trust-manifest')
 
-    with ThreadPoolExecutor(max_workers=args.threads) as executor:
-        explorar_e_baixar(args.url, args.output, executor=executor)
+    rastreador = None
+    instrumentacao.configurar(args, lambda: {'http': rastreador.cliente.estatisticas()} if rastreador else {})
+
+    manifesto = None
+    if not args.no_manifest and not args.list_only:
+        os.makedirs(args.output, exist_ok=True)
+        manifesto = Manifesto(args.manifest or os.path.join(args.output, MANIFESTO))
+    try:
+        rastreador = Rastreador(args.url, args.output, threads=args.threads, max_depth=args.max_depth,
+                                manifesto=manifesto, confiar=args.trust_manifest, parser=args.parser,
+                                apenas_listar=args.list_only, ordem=args.order, por_host=args.per_host,
+                                limite_banda=limite_banda, timeout=args.timeout, retries=args.retries,
+                                taxa=args.rate, metricas=Metricas(0 if args.list_only else args.progress))
+        rastreador.rodar()
+    finally:
+        if manifesto:
+            manifesto.fechar()
 
 if __name__ == '__main__':
     main()
@@ -0,0 +1,369 @@
+#!/usr/bin/env python3
+"""
+instrumentacao.py ― Medições comuns das ferramentas (--stats / --profile).
+
+Cada script chama ``adicionar_argumentos(parser)`` e, depois do parse,
+``configurar(args)``. Sem as opções, tudo aqui vira no-op barato (``fase``
+devolve um contexto vazio e ``contar``/``medir`` retornam na primeira linha).
+
+--stats ARQ
+    Liga as medições e, na saída do processo, grava um resumo JSON em ARQ
+    ('-' = stderr) com:
+
+    * ``fases``: tempo por fase (dns, conexao, ttfb, transferencia, parse,
+      regex, escrita...), com contagem, total, média, p50/p90/p99, máximo e
+      histograma de latência em baldes 1-2-5 (ms);
+    * ``contadores``: bytes e itens processados (``bytes.rede``, ``itens.*``);
+    * ``memoria``: pico de RSS do processo e dos filhos (pools de processos);
+    * ``cpu``: tempo de usuário/sistema, e a duração total (parede).
+
+    As fases de rede vêm do cliente_http: ``dns`` é a consulta real (acertos de
+    cache só contam em ``dns.cache``), ``conexao`` é TCP + TLS, ``ttfb`` vai do
+    envio aos cabeçalhos (inclui reenvios) e ``transferencia`` dos cabeçalhos
+    ao fim do corpo. Quem processa o corpo em fluxo faz isso durante a
+    transferência; o processamento aparece também na própria fase (parse,
+    regex), então a rede pura é a diferença entre as duas.
+
+--profile ARQ [--profile-mode cprofile|sample]
+    cprofile: perfil determinístico (pstats em ARQ; abra com ``python -m
+    pstats ARQ`` ou snakeviz) da thread principal, onde rodam o laço do
+    asyncio e os estágios em fluxo. sample: amostra as pilhas de todas as
+    threads a cada --profile-interval ms e grava ARQ no formato "collapsed"
+    (flamegraph.pl, speedscope). Nos dois casos as funções mais pesadas vão
+    para stderr no fim.
+
+Fases em processos filhos (3urls -j, nmap_excel) não entram no resumo; só a
+memória deles.
+"""
+
+import atexit
+import bisect
+import collections
+import cProfile
+import io
+import json
+import os
+import pstats
+import sys
+import threading
+import time
+
+try:  # não existe no Windows
+    import resource
+except ImportError:
+    resource = None
+
+# Limites superiores dos baldes do histograma, em ms (série 1-2-5)
+BALDES_MS = tuple(m * 10 ** e for e in range(-2, 6) for m in (1, 2, 5))
+INTERVALO_AMOSTRA_MS = 5.0
+TOP_FUNCOES = 25
+
+
+class Histograma:
+    """Latências em baldes fixos; percentis estimados pelo limite do balde."""
+
+    __slots__ = ("n", "total", "minimo", "maximo", "baldes")
+
+    def __init__(self):
+        self.n = 0
+        self.total = 0.0
+        self.minimo = float("inf")
+        self.maximo = 0.0
+        self.baldes = [0] * (len(BALDES_MS) + 1)
+
+    def adicionar(self, segundos):
+        self.n += 1
+        self.total += segundos
+        if segundos < self.minimo:
+            self.minimo = segundos
+        if segundos > self.maximo:
+            self.maximo = segundos
+        self.baldes[bisect.bisect_left(BALDES_MS, segundos * 1000.0)] += 1
+
+    def percentil(self, p):
+        alvo = p / 100.0 * self.n
+        acumulado = 0
+        for limite, quantos in zip(BALDES_MS + (None,), self.baldes):
+            acumulado += quantos
+            if acumulado >= alvo and quantos:
+                # Nunca além do máximo observado
+                return self.maximo * 1000.0 if limite is None else min(limite, self.maximo * 1000.0)
+        return self.maximo * 1000.0
+
+    def resumo(self):
+        if not self.n:
+            return {"n": 0}
+        return {
+            "n": self.n,
+            "total_s": round(self.total, 6),
+            "media_ms": round(self.total / self.n * 1000.0, 3),
+            "min_ms": round(self.minimo * 1000.0, 3),
+            "p50_ms": round(self.percentil(50), 3),
+            "p90_ms": round(self.percentil(90), 3),
+            "p99_ms": round(self.percentil(99), 3),
+            "max_ms": round(self.maximo * 1000.0, 3),
+            "histograma_ms": {(f"<={limite:g}" if limite is not None else f">{BALDES_MS[-1]:g}"): quantos
+                              for limite, quantos in zip(BALDES_MS + (None,), self.baldes) if quantos},
+        }
+
+
+class _Fase:
+    __slots__ = ("instr", "nome", "inicio", "segundos")
+
+    def __init__(self, instr, nome):
+        self.instr = instr
+        self.nome = nome
+
+    def __enter__(self):
+        self.inicio = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.segundos = time.perf_counter() - self.inicio
+        self.instr.medir(self.nome, self.segundos)
+        return False
+
+
+class _Nulo:
+    __slots__ = ()
+    segundos = 0.0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+NULO = _Nulo()
+
+
+class Instrumentos:
+    """Registro do processo: fases (histogramas) e contadores, seguro entre threads."""
+
+    def __init__(self):
+        self.ativo = False
+        self.lock = threading.Lock()
+        self.fases = {}
+        self.contadores = collections.Counter()
+        self.inicio = time.time()
+        self.t0 = time.perf_counter()
+
+    def fase(self, nome):
+        """
+        ``with fase("parse") as f: ...`` soma o tempo do bloco à fase ``nome``;
+        ``f.segundos`` fica com a duração (0 com as medições desligadas).
+        """
+        return _Fase(self, nome) if self.ativo else NULO
+
+    def medir(self, nome, segundos):
+        if not self.ativo:
+            return
+        with self.lock:
+            hist = self.fases.get(nome)
+            if hist is None:
+                hist = self.fases[nome] = Histograma()
+            hist.adicionar(segundos)
+
+    def contar(self, nome, n=1):
+        if not self.ativo:
+            return
+        with self.lock:
+            self.contadores[nome] += n
+
+    def resumo(self, extra=None):
+        duracao = time.perf_counter() - self.t0
+        with self.lock:
+            fases = {nome: hist.resumo() for nome, hist in sorted(self.fases.items())}
+            contadores = dict(sorted(self.contadores.items()))
+        resumo = {
+            "script": os.path.basename(sys.argv[0]),
+            "argv": sys.argv[1:],
+            "inicio": time.strftime("%Y-%m-%dT%H:%M:%S%z", time.localtime(self.inicio)),
+            "duracao_s": round(duracao, 3),
+            "fases": fases,
+            "contadores": contadores,
+            "taxas_por_s": {nome: round(valor / duracao, 1) for nome, valor in contadores.items()
+                            if duracao > 0 and (nome.startswith("bytes.") or nome.startswith("itens."))},
+            "memoria": memoria(),
+            "cpu": cpu(),
+        }
+        if extra:
+            resumo.update(extra)
+        return resumo
+
+
+class Cronometro:
+    """
+    Soma o tempo gasto produzindo os itens de um iterável (ex.: blocos lidos
+    da rede), para separar a espera da fonte do processamento do consumidor.
+    """
+
+    __slots__ = ("segundos",)
+
+    def __init__(self):
+        self.segundos = 0.0
+
+    def iterar(self, iteravel):
+        it = iter(iteravel)
+        while True:
+            inicio = time.perf_counter()
+            try:
+                item = next(it)
+            except StopIteration:
+                return
+            finally:
+                self.segundos += time.perf_counter() - inicio
+            yield item
+
+
+INSTR = Instrumentos()
+fase = INSTR.fase
+medir = INSTR.medir
+contar = INSTR.contar
+
+
+def memoria():
+    """Pico de RSS (KiB) do processo e dos filhos já terminados."""
+    if resource is None:
+        return {}
+    escala = 1024 if sys.platform == "darwin" else 1  # macOS mede em bytes
+    return {
+        "pico_rss_kib": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss // escala,
+        "pico_rss_filhos_kib": resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss // escala,
+    }
+
+
+def cpu():
+    tempos = os.times()
+    return {"usuario_s": round(tempos.user, 3), "sistema_s": round(tempos.system, 3),
+            "filhos_s": round(tempos.children_user + tempos.children_system, 3)}
+
+
+# ---------------------------------------------------------------------------
+# Perfis
+# ---------------------------------------------------------------------------
+class Amostrador:
+    """
+    Perfil por amostragem: uma thread lê ``sys._current_frames()`` a cada
+    ``intervalo`` segundos e conta as pilhas (todas as threads, sem custo nas
+    demais fora o GIL da leitura).
+    """
+
+    def __init__(self, intervalo=INTERVALO_AMOSTRA_MS / 1000.0):
+        self.intervalo = intervalo
+        self.pilhas = collections.Counter()
+        self.amostras = 0
+        self.parar = threading.Event()
+        self.thread = threading.Thread(target=self._rodar, name="amostrador", daemon=True)
+
+    def iniciar(self):
+        self.thread.start()
+
+    def _rodar(self):
+        proprio = threading.get_ident()
+        nomes = {}
+        while not self.parar.wait(self.intervalo):
+            for ident, frame in sys._current_frames().items():
+                if ident == proprio:
+                    continue
+                pilha = []
+                while frame is not None:
+                    codigo = frame.f_code
+                    pilha.append(f"{os.path.basename(codigo.co_filename)}:{codigo.co_name}")
+                    frame = frame.f_back
+                if ident not in nomes:
+                    nomes = {t.ident: t.name for t in threading.enumerate()}
+                pilha.append(nomes.get(ident, str(ident)))
+                self.pilhas[";".join(reversed(pilha))] += 1
+            self.amostras += 1
+
+    def terminar(self, caminho, saida=sys.stderr):
+        self.parar.set()
+        self.thread.join()
+        with open(caminho, "w", encoding="utf-8") as f:
+            for pilha, n in self.pilhas.most_common():
+                f.write(f"{pilha} {n}\n")
+        proprias = collections.Counter()
+        for pilha, n in self.pilhas.items():
+            proprias[pilha.rsplit(";", 1)[-1]] += n
+        total = sum(proprias.values()) or 1
+        print(f"[profile] {self.amostras} amostra(s) -> {caminho} (collapsed); mais frequentes no topo da pilha:",
+              file=saida)
+        for funcao, n in proprias.most_common(TOP_FUNCOES):
+            print(f"  {100.0 * n / total:5.1f}%  {funcao}", file=saida)
+
+
+class PerfilDeterministico:
+    def __init__(self):
+        self.perfil = cProfile.Profile()
+
+    def iniciar(self):
+        self.perfil.enable()
+
+    def terminar(self, caminho, saida=sys.stderr):
+        self.perfil.disable()
+        self.perfil.dump_stats(caminho)
+        texto = io.StringIO()
+        pstats.Stats(self.perfil, stream=texto).sort_stats("cumulative").print_stats(TOP_FUNCOES)
+        print(f"[profile] cProfile -> {caminho}", file=saida)
+        print(texto.getvalue().rstrip(), file=saida)
+
+
+# ---------------------------------------------------------------------------
+# Linha de comando
+# ---------------------------------------------------------------------------
+def adicionar_argumentos(parser):
+    """--stats, --profile, --profile-mode e --profile-interval."""
+    grupo = parser.add_argument_group("instrumentação")
+    grupo.add_argument("--stats", metavar="ARQ",
+                       help="Mede fases (DNS, conexão, TTFB, transferência, parse, escrita), bytes, "
+                            "itens e memória e grava um resumo JSON em ARQ ao sair ('-' = stderr)")
+    grupo.add_argument("--profile", metavar="ARQ",
+                       help="Grava um perfil de execução em ARQ (veja --profile-mode)")
+    grupo.add_argument("--profile-mode", choices=("cprofile", "sample"), default="cprofile",
+                       help="cprofile: determinístico, thread principal (pstats); sample: amostragem "
+                            "de pilhas de todas as threads (collapsed/flamegraph) (padrão: cprofile)")
+    grupo.add_argument("--profile-interval", type=float, default=INTERVALO_AMOSTRA_MS, metavar="MS",
+                       help=f"Intervalo entre amostras com --profile-mode sample (padrão: {INTERVALO_AMOSTRA_MS:g})")
+    return grupo
+
+
+def configurar(args, extra=None):
+    """
+    Liga o que ``args`` pede e registra a gravação do resumo/perfil na saída
+    do processo. ``extra()``, se dado, devolve um dict anexado ao resumo.
+    """
+    perfil = None
+    if args.profile:
+        if args.profile_mode == "sample":
+            perfil = Amostrador(max(args.profile_interval, 0.1) / 1000.0)
+        else:
+            perfil = PerfilDeterministico()
+        perfil.iniciar()
+    if args.stats:
+        INSTR.ativo = True
+
+    def ao_sair():
+        if perfil is not None:
+            try:
+                perfil.terminar(args.profile)
+            except OSError as e:
+                print(f"[profile] não foi possível gravar {args.profile}: {e}", file=sys.stderr)
+        if args.stats:
+            gravar_resumo(args.stats, extra() if extra else None)
+
+    atexit.register(ao_sair)
+    return INSTR
+
+
+def gravar_resumo(destino, extra=None):
+    texto = json.dumps(INSTR.resumo(extra), ensure_ascii=False, indent=2)
+    if destino == "-":
+        print(texto, file=sys.stderr)
+        return
+    try:
+        with open(destino, "w", encoding="utf-8") as f:
+            f.write(texto + "\n")
+    except OSError as e:
+        print(f"[stats] não foi possível gravar {destino}: {e}", file=sys.stderr)
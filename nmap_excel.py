@@ -0,0 +1,459 @@
+#!/usr/bin/env python3
+"""
+nmap_excel.py - Turn nmap results into a CSV, XLSX or JSONL table.
+
+Reads normal (-oN), greppable (-oG) and XML (-oX) output, detected per file,
+and writes one row per host/port with state, reason, service and version info
+(filtered and closed ports included). Several files are parsed in parallel
+worker processes and merged: the same host/port seen in more than one scan
+becomes one row, keeping the most conclusive state and the richest service
+details. Rows go through a temporary SQLite table on disk, so memory stays
+flat no matter how many hosts the scans cover.
+
+Usage:
+    python nmap_excel.py scan.xml -o ports.csv
+    python nmap_excel.py scans/*.xml scans/*.gnmap -o ports.xlsx -j 8
+    python nmap_excel.py scan.nmap -o - --format jsonl --state open
+"""
+
+import argparse
+import contextlib
+import csv
+import ipaddress
+import json
+import multiprocessing
+import os
+import re
+import sqlite3
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from queue import Empty
+from xml.etree.ElementTree import ParseError, XMLPullParser
+
+import instrumentacao
+from instrumentacao import contar, fase
+
+try:
+    from openpyxl import Workbook
+except ImportError:
+    Workbook = None
+
+READ_SIZE = 1 << 16
+BATCH = 2000            # rows per message from a worker process
+QUEUE_BATCHES = 64      # batches waiting for the writer before workers block
+WORKER_POLL = 1.0       # seconds between checks for a worker process that died
+FIELDS = ("host", "hostname", "port", "protocol", "state", "reason",
+          "service", "product", "version", "extrainfo", "sources")
+# When scans disagree, the most conclusive state wins
+STATE_RANK = {"open": 6, "closed": 5, "unfiltered": 4, "open|filtered": 3,
+              "closed|filtered": 2, "filtered": 1}
+
+NORMAL_HOST = re.compile(r"^Nmap scan report for (?:(\S+) \(([^)]+)\)|(\S+))")
+NORMAL_PORT = re.compile(r"^(\d+)/(tcp|udp|sctp)\s+(\S+)\s+(\S+)(?:\s+(.*?))?\s*$")
+GREP_HOST = re.compile(r"^Host: (\S+) \(([^)]*)\)\t")
+GREP_PORTS = re.compile(r"\tPorts: ([^\t]*)")
+
+
+def split_banner(banner):
+    """
+    (product, version, extrainfo) from the single version column of -oN/-oG
+    output, split the way -oX reports them: a trailing "(...)" is the extra
+    info, and the version starts at the first word beginning with a digit.
+    "OpenSSH 8.9p1 Ubuntu 3ubuntu0.1 (Ubuntu Linux; protocol 2.0)" becomes
+    ("OpenSSH", "8.9p1 Ubuntu 3ubuntu0.1", "Ubuntu Linux; protocol 2.0").
+    """
+    banner = banner.strip()
+    extrainfo = ""
+    paren = banner.find(" (")
+    if paren >= 0 and banner.endswith(")"):
+        banner, extrainfo = banner[:paren].rstrip(), banner[paren + 2:-1]
+    words = banner.split(" ")
+    for i, word in enumerate(words):
+        if i and word[:1].isdigit():
+            return " ".join(words[:i]), " ".join(words[i:]), extrainfo
+    return banner, "", extrainfo
+
+
+def empty_row(ip, hostname, source):
+    return {"host": ip, "hostname": hostname or "", "port": 0, "protocol": "",
+            "state": "", "reason": "", "service": "", "product": "", "version": "",
+            "extrainfo": "", "sources": source}
+
+
+def detect_format(head):
+    """'xml', 'grep' or 'normal', from the first bytes of a file."""
+    text = head.lstrip()
+    if text.startswith(b"<?xml") or text.startswith(b"<nmaprun") or text.startswith(b"<!DOCTYPE nmaprun"):
+        return "xml"
+    if re.search(rb"^Host: \S+ \(", head, re.M) or b"-oG " in head.split(b"\n", 1)[0]:
+        return "grep"
+    return "normal"
+
+
+def parse_xml(stream, source):
+    """
+    Rows from -oX output, one <host> at a time: each finished host is
+    dropped from the tree, so the file never has to fit in memory. A file cut
+    short by an interrupted scan still yields every complete host.
+    """
+    parser = XMLPullParser(events=("start", "end"))
+    root = None
+    try:
+        for data in iter(lambda: stream.read(READ_SIZE), b""):
+            parser.feed(data)
+            for event, elem in parser.read_events():
+                if root is None and event == "start":
+                    root = elem
+                if event == "end" and elem.tag == "host":
+                    yield from _xml_host(elem, source)
+                    root.clear()
+        parser.close()
+    except ParseError as e:
+        print(f"[WARN] {source}: {e} (kept the hosts before it)", file=sys.stderr)
+
+
+def _xml_host(host, source):
+    ip = mac = ""
+    for address in host.iter("address"):
+        kind = address.get("addrtype")
+        if kind in ("ipv4", "ipv6") and not ip:
+            ip = address.get("addr", "")
+        elif kind == "mac":
+            mac = address.get("addr", "")
+    names = [h for h in host.iter("hostname")]
+    user = [h.get("name") for h in names if h.get("type") == "user"]
+    hostname = (user or [h.get("name") for h in names] or [""])[0]
+    for port in host.iter("port"):
+        row = empty_row(ip or mac, hostname, source)
+        row["port"] = int(port.get("portid", 0))
+        row["protocol"] = port.get("protocol", "")
+        state = port.find("state")
+        if state is not None:
+            row["state"] = state.get("state", "")
+            row["reason"] = state.get("reason", "")
+        service = port.find("service")
+        if service is not None:
+            name = service.get("name", "")
+            row["service"] = f"{service.get('tunnel')}/{name}" if service.get("tunnel") else name
+            row["product"] = service.get("product", "")
+            row["version"] = service.get("version", "")
+            row["extrainfo"] = service.get("extrainfo", "")
+        yield row
+
+
+def parse_grep(stream, source):
+    """
+    Rows from -oG output. Each port is port/state/protocol/owner/service/
+    rpc/version, with '/' inside a field written as '|'. The version banner
+    is split into product/version/extrainfo (split_banner) so rows merge
+    consistently with -oX ones.
+    """
+    for raw in stream:
+        line = raw.decode("utf-8", "replace").rstrip("\r\n")
+        host = GREP_HOST.match(line)
+        ports = GREP_PORTS.search(line)
+        if not host or not ports:
+            continue
+        for entry in ports.group(1).split(", "):
+            fields = entry.split("/")
+            if len(fields) < 7 or not fields[0].strip().isdigit():
+                continue
+            row = empty_row(host.group(1), host.group(2), source)
+            row["port"] = int(fields[0].strip())
+            row["state"] = fields[1]
+            row["protocol"] = fields[2]
+            row["service"] = fields[4].replace("|", "/")
+            row["product"], row["version"], row["extrainfo"] = split_banner(fields[6].replace("|", "/"))
+            yield row
+
+
+def parse_normal(stream, source):
+    """
+    Rows from -oN output (what nmap_excel.sh read). With --reason the column
+    after the service is the reason; the rest of the line is the version
+    banner, split like parse_grep's.
+    """
+    ip = hostname = ""
+    reason_column = False
+    for raw in stream:
+        line = raw.decode("utf-8", "replace").rstrip("\r\n")
+        host = NORMAL_HOST.match(line)
+        if host:
+            if host.group(3):
+                ip, hostname = host.group(3), ""
+            else:
+                hostname, ip = host.group(1), host.group(2)
+            continue
+        if line.startswith("PORT "):
+            reason_column = " REASON " in line or line.rstrip().endswith(" REASON")
+            continue
+        port = NORMAL_PORT.match(line)
+        if not port or not ip:
+            continue
+        row = empty_row(ip, hostname, source)
+        row["port"] = int(port.group(1))
+        row["protocol"] = port.group(2)
+        row["state"] = port.group(3)
+        row["service"] = port.group(4)
+        rest = port.group(5) or ""
+        if reason_column and rest:
+            reason, _, rest = rest.partition(" ")
+            if rest.startswith("ttl "):
+                ttl, _, rest = rest[4:].partition(" ")
+                reason = f"{reason} ttl {ttl}"
+            row["reason"] = reason
+        row["product"], row["version"], row["extrainfo"] = split_banner(rest)
+        yield row
+
+
+PARSERS = {"xml": parse_xml, "grep": parse_grep, "normal": parse_normal}
+
+
+def parse_file(path):
+    """Rows of one nmap output file ('-' is stdin), format auto-detected."""
+    stream = sys.stdin.buffer if path == "-" else open(path, "rb")
+    try:
+        head = stream.peek(4096)[:4096] if hasattr(stream, "peek") else b""
+        yield from PARSERS[detect_format(head)](stream, os.path.basename(path) if path != "-" else "stdin")
+    finally:
+        if stream is not sys.stdin.buffer:
+            stream.close()
+
+
+# ---------------------------------------------------------------------------
+# Parallel parsing: workers push batches into a bounded queue
+# ---------------------------------------------------------------------------
+_queue = None
+
+
+def _init_worker(queue):
+    global _queue
+    _queue = queue
+
+
+def _parse_into_queue(index, path):
+    batch = []
+    count = 0
+    try:
+        for row in parse_file(path):
+            batch.append(row)
+            if len(batch) >= BATCH:
+                _queue.put(("rows", batch))
+                count += len(batch)
+                batch = []
+        if batch:
+            _queue.put(("rows", batch))
+            count += len(batch)
+        _queue.put(("done", index, count, None))
+    except Exception as e:  # the writer waits for every "done"
+        _queue.put(("done", index, count, f"{e.__class__.__name__}: {e}"))
+
+
+def iter_batches(paths, jobs):
+    """
+    Batches of rows from every file, parsed by up to ``jobs`` processes. A
+    worker that dies (OOM, killed) never sends its "done": the broken pool
+    fails its future instead, and that file is reported rather than waited for.
+    """
+    if jobs <= 1 or len(paths) <= 1 or "-" in paths:
+        for path in paths:
+            batch = []
+            try:
+                for row in parse_file(path):
+                    batch.append(row)
+                    if len(batch) >= BATCH:
+                        yield batch
+                        batch = []
+            except Exception as e:  # same report as a worker process gives
+                print(f"[ERROR] {path}: {e.__class__.__name__}: {e}", file=sys.stderr)
+            if batch:
+                yield batch
+        return
+
+    queue = multiprocessing.Queue(QUEUE_BATCHES)
+    pool = ProcessPoolExecutor(min(jobs, len(paths)), initializer=_init_worker, initargs=(queue,))
+    futures = [pool.submit(_parse_into_queue, i, path) for i, path in enumerate(paths)]
+    pending = set(range(len(paths)))
+    try:
+        while pending:
+            try:
+                message = queue.get(timeout=WORKER_POLL)
+            except Empty:
+                for i in [i for i in pending if futures[i].done() and futures[i].exception()]:
+                    pending.discard(i)
+                    error = futures[i].exception()
+                    print(f"[ERROR] {paths[i]}: {error.__class__.__name__}: {error}", file=sys.stderr)
+                continue
+            if message[0] == "rows":
+                yield message[1]
+                continue
+            _, i, count, error = message
+            pending.discard(i)
+            if error:
+                print(f"[ERROR] {paths[i]}: {error}", file=sys.stderr)
+    finally:
+        # Stopped early: workers blocked on the full queue only finish if it keeps draining
+        for future in futures:
+            future.cancel()
+        while not all(future.done() for future in futures):
+            with contextlib.suppress(Empty):
+                queue.get(timeout=WORKER_POLL)
+        pool.shutdown()
+
+
+# ---------------------------------------------------------------------------
+# Merge and output
+# ---------------------------------------------------------------------------
+def host_key(host):
+    """Sort key: IPv4 before IPv6, numerically; anything else (MAC, names) after."""
+    try:
+        address = ipaddress.ip_address(host)
+        return bytes([address.version]) + address.packed
+    except ValueError:
+        return b"\xff" + host.encode()
+
+
+# Service details move as a unit, from whichever scan described the port best
+SERVICE_RICHER = ("length(excluded.product || excluded.version || excluded.extrainfo)"
+                  " > length(product || version || extrainfo)")
+
+
+class PortTable:
+    """
+    Host/port rows merged in a SQLite table on disk. A port seen again keeps
+    the most conclusive state (open beats filtered) and the most detailed
+    service identification.
+    """
+
+    def __init__(self, path):
+        self.db = sqlite3.connect(path)
+        self.db.execute("PRAGMA journal_mode=OFF")
+        self.db.execute("PRAGMA synchronous=OFF")
+        self.db.execute("""
+            CREATE TABLE IF NOT EXISTS ports (
+                key BLOB, host TEXT, hostname TEXT, port INTEGER, protocol TEXT,
+                state TEXT, rank INTEGER, reason TEXT, service TEXT, product TEXT,
+                version TEXT, extrainfo TEXT, sources TEXT,
+                PRIMARY KEY (key, protocol, port))""")
+
+    def add(self, rows):
+        self.db.executemany("""
+            INSERT INTO ports VALUES (:key, :host, :hostname, :port, :protocol, :state, :rank,
+                                      :reason, :service, :product, :version, :extrainfo, :sources)
+            ON CONFLICT (key, protocol, port) DO UPDATE SET
+                state = CASE WHEN excluded.rank > rank THEN excluded.state ELSE state END,
+                reason = CASE WHEN excluded.rank > rank THEN excluded.reason ELSE reason END,
+                rank = max(rank, excluded.rank),
+                hostname = CASE WHEN hostname = '' THEN excluded.hostname ELSE hostname END,
+                service = CASE WHEN {richer} OR service = '' THEN excluded.service ELSE service END,
+                product = CASE WHEN {richer} THEN excluded.product ELSE product END,
+                version = CASE WHEN {richer} THEN excluded.version ELSE version END,
+                extrainfo = CASE WHEN {richer} THEN excluded.extrainfo ELSE extrainfo END,
+                sources = CASE WHEN instr(',' || sources || ',', ',' || excluded.sources || ',')
+                               THEN sources ELSE sources || ',' || excluded.sources END
+            """.format(richer=SERVICE_RICHER), ({**row, "key": host_key(row["host"]), "rank": STATE_RANK.get(row["state"], 0)}
+                  for row in rows))
+
+    def rows(self, states=None):
+        query = f"SELECT {', '.join(FIELDS)} FROM ports"
+        if states:
+            query += f" WHERE state IN ({', '.join('?' * len(states))})"
+        cursor = self.db.execute(query + " ORDER BY key, port, protocol", tuple(states or ()))
+        for values in cursor:
+            yield dict(zip(FIELDS, values))
+
+    def count(self):
+        return self.db.execute("SELECT count(*), count(DISTINCT key) FROM ports").fetchone()
+
+    def close(self):
+        self.db.commit()
+        self.db.close()
+
+
+def write_csv(rows, out):
+    writer = csv.DictWriter(out, FIELDS)
+    writer.writeheader()
+    writer.writerows(rows)
+
+
+def write_jsonl(rows, out):
+    for row in rows:
+        out.write(json.dumps(row, ensure_ascii=False) + "\n")
+
+
+def write_xlsx(rows, path):
+    # write_only streams rows to the file instead of building the sheet in memory
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet("ports")
+    sheet.append(list(FIELDS))
+    for row in rows:
+        sheet.append([row[field] for field in FIELDS])
+    workbook.save(path)
+
+
+def output_format(path, requested):
+    if requested:
+        return requested
+    extension = os.path.splitext(path)[1].lower()
+    return {".xlsx": "xlsx", ".jsonl": "jsonl", ".json": "jsonl"}.get(extension, "csv")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert nmap output (normal, greppable or XML) to CSV/XLSX/JSONL.")
+    parser.add_argument("inputs", nargs="+", help="nmap output files ('-' reads stdin)")
+    parser.add_argument("-o", "--output", required=True, help="Output file ('-' is stdout for csv/jsonl)")
+    parser.add_argument("--format", choices=("csv", "xlsx", "jsonl"),
+                        help="Output format (default: from the output extension, else csv)")
+    parser.add_argument("-j", "--jobs", type=int, default=os.cpu_count() or 1,
+                        help="Files parsed in parallel (default: number of CPUs)")
+    parser.add_argument("--state", action="append", metavar="STATE",
+                        help="Only ports in this state (repeatable, e.g. --state open --state open|filtered)")
+    parser.add_argument("--tmp-dir", help="Directory for the temporary merge database (default: system temp)")
+    instrumentacao.adicionar_argumentos(parser)
+    args = parser.parse_args()
+    instrumentacao.configurar(args)
+
+    fmt = output_format(args.output, args.format)
+    if fmt == "xlsx" and Workbook is None:
+        parser.error("XLSX output needs openpyxl (pip install openpyxl); use .csv or .jsonl")
+    if fmt == "xlsx" and args.output == "-":
+        parser.error("XLSX can't be written to stdout")
+    missing = [p for p in args.inputs if p != "-" and not os.path.isfile(p)]
+    if missing:
+        parser.error(f"input file does not exist: {', '.join(missing)}")
+
+    started = time.monotonic()
+    with tempfile.TemporaryDirectory(dir=args.tmp_dir) as tmp:
+        table = PortTable(os.path.join(tmp, "ports.db"))
+        parsed = 0
+        for batch in iter_batches(args.inputs, args.jobs):
+            # Parsing happens in the workers; only the merge is timed here
+            with fase("merge"):
+                table.add(batch)
+            parsed += len(batch)
+        rows, hosts = table.count()
+
+        with fase("escrita"):
+            if fmt == "xlsx":
+                write_xlsx(table.rows(args.state), args.output)
+            else:
+                out = sys.stdout if args.output == "-" else open(args.output, "w", newline="", encoding="utf-8")
+                try:
+                    (write_csv if fmt == "csv" else write_jsonl)(table.rows(args.state), out)
+                finally:
+                    if out is not sys.stdout:
+                        out.close()
+        table.close()
+    contar("itens.files", len(args.inputs))
+    contar("itens.entries", parsed)
+    contar("itens.rows", rows)
+    contar("itens.hosts", hosts)
+
+    print(f"[INFO] {len(args.inputs)} file(s), {parsed} port entries -> {rows} rows for {hosts} hosts "
+          f"in {time.monotonic() - started:.1f}s: {args.output}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
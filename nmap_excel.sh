@@ -26,52 +26,13 @@ exit 1
 
 fi
 
-# Create the CSV file and add the header
-
-echo "host,port,state,service" > "$output_file"
-
- 
-
-# Parse the Nmap file
-
-host=""
-
-while IFS= read -r line; do
-
-# Check if line starts with "Nmap scan report for" (indicating a new host)
-
-if [[ $line =~ ^Nmap\ scan\ report\ for\ (.*) ]]; then
-
-     host="${BASH_REMATCH[1]}"
-
-     echo "Found host: $host"  # Debugging: print host when found
-
-fi
-
-# Check if line contains port info (TCP/UDP ports)
-
-# Adjust the regex to ensure matching is more flexible with spaces and tabs
-
-if [[ $line =~ ([0-9]+)/(tcp|udp)[[:space:]]+(open|closed)[[:space:]]+([a-zA-Z0-9\-]+) ]]; then
-
-     port="${BASH_REMATCH[1]}"
-
-     protocol="${BASH_REMATCH[2]}"
-
-     state="${BASH_REMATCH[3]}"
-
-     service="${BASH_REMATCH[4]}" 
-
-     # Debugging: print port, state, service
-
-     echo "Found port: $port/$protocol, state: $state, service: $service"
-
-     # Write the host, port, state, and service to the CSV file
-
-     echo "$host,$port/$protocol,$state,$service" >> "$output_file"
-
-fi
-
-done < "$input_file"
-
-echo "CSV file created at $output_file"
+# Parsing lives in nmap_excel.py (normal, greppable and XML output; filtered
+# ports and versions included; .xlsx/.jsonl by extension)
+#
+# CSV schema change: the old loop wrote 4 columns, header host,port,state,service,
+# with port as "22/tcp" and only open/closed ports. The output now has 11 columns:
+#   host,hostname,port,protocol,state,reason,service,product,version,extrainfo,sources
+# port and protocol are split ("22" and "tcp"), hostname is new, and filtered
+# ports are included. Scripts that read the old columns need updating.
+
+exec python3 "$(dirname "$0")/nmap_excel.py" "$input_file" -o "$output_file"
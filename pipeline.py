@@ -0,0 +1,575 @@
+#!/usr/bin/env python3
+"""
+pipeline.py ― Encadeia as ferramentas de recon em fluxo, sem arquivos no meio.
+
+    subdomínios -> sonda robots/sitemap -> coleta de JS -> URLs/segredos -> sourcemaps
+                   (robots_sitemap)                     (3urls)         (decompiler)
+
+Cada etapa é um conjunto de workers lendo de uma fila limitada (--fila) e
+escrevendo na fila da etapa seguinte; as etapas rodam ao mesmo tempo, então o
+primeiro segredo ou mapa aparece segundos depois do primeiro host, não no fim
+da lista. Fila cheia segura quem produz (a sonda só pega novos hosts enquanto
+a fila seguinte tiver espaço), e a memória fica limitada pelo tamanho das filas.
+
+Etapas e registros (JSONL, um por linha, com o campo "etapa"):
+
+    sonda    {"host"} -> {"url", "status"} por resposta do robots.txt/sitemap.xml
+             e {"url", "lastmod", "sitemap"} por URL lida dos sitemaps
+    js       {"url"}  -> {"url", "pagina"}: arquivos .js citados nas páginas (a
+             raiz de cada host vivo e as páginas dos sitemaps, até
+             --paginas-por-host) e os .js que já vieram nos sitemaps
+    achados  {"url"}  -> {"source", "kind", "value"[, "type"]} por URL/segredo
+             novo (o formato do --jsonl do 3urls) e {"url", "mapa", "urls",
+             "segredos"} por bundle analisado
+    mapas    {"url"[, "mapa"]} -> {"url", "mapa", "dir", "arquivos"}: fontes
+             extraídas em --mapas-dir/<host>/<caminho>
+
+Com --de/--ate roda só um trecho, e a saída de um processo serve de entrada
+para o outro (linhas que não são JSON viram {"host"} na sonda e {"url"} nas
+demais; registros que a etapa não entende são ignorados).
+
+Uso:
+    python pipeline.py alvos.txt -o pipeline.jsonl --mapas-dir fontes
+    subfinder -d ex.com -silent | python pipeline.py --ate js | python pipeline.py --de achados
+    python pipeline.py js_urls.txt --de achados --emitir achados      # só o 3urls + sourcemaps
+"""
+
+import argparse
+import asyncio
+import contextlib
+import functools
+import importlib.util
+import json
+import os
+import queue
+import re
+import sys
+import threading
+import time
+from urllib.parse import urljoin, urlparse
+
+import decompiler
+import instrumentacao
+import robots_sitemap
+from canon_urls import ESTATICOS
+from cliente_http import RETRIES, USER_AGENT, ClienteHTTP, charset_de
+from instrumentacao import contar, medir
+
+ETAPAS = ("sonda", "js", "achados", "mapas")
+FILA = 1000            # registros esperando entre uma etapa e a seguinte
+PAGINAS_POR_HOST = 20  # páginas HTML baixadas por host atrás de <script src>
+PAGINA_MAX = 2 << 20   # bytes lidos de cada página
+TIMEOUT = 15.0
+FIM = object()         # sentinela de fim de fluxo numa fila
+ESPERA_FILA = 0.2      # de quanto em quanto tempo quem espera numa fila cheia confere se a etapa morreu
+
+JS_EXT = ("js", "mjs")
+SCRIPT_SRC = re.compile(r"""<script\b[^>]*?\ssrc\s*=\s*(?:"([^"]+)"|'([^']+)'|([^\s>]+))""", re.I)
+
+
+def entregar(fila, registro, parada):
+    """``fila.put`` que desiste se a etapa que lê a fila parou (``parada``)."""
+    while not parada.is_set():
+        try:
+            fila.put(registro, timeout=ESPERA_FILA)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+
+def load_3urls():
+    """Importa o 3urls.py (o nome começa com dígito, então não dá para usar import)."""
+    caminho = os.path.join(os.path.dirname(os.path.abspath(__file__)), "3urls.py")
+    spec = importlib.util.spec_from_file_location("urls3", caminho)
+    mod = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(mod)
+    return mod
+
+
+def extensao(url):
+    ultimo = urlparse(url).path.rsplit("/", 1)[-1]
+    return ultimo.rsplit(".", 1)[-1].lower() if "." in ultimo else ""
+
+
+class Etapa:
+    """
+    Uma etapa com ``workers`` threads. Cada registro que ``aceita`` (vindo da
+    etapa ``anterior`` ou avulso, sem "etapa") vai para ``processar(registro,
+    emitir)``; uma exceção vira um registro com "erro" (só na saída) e não
+    derruba a etapa.
+    """
+
+    nome = ""
+    anterior = None
+
+    def __init__(self, workers=1):
+        self.workers = workers
+        self.entradas = 0
+        self.erros = 0
+        self.falha = None
+        self.parada = threading.Event()  # a etapa não lê mais a entrada
+        self.lock = threading.Lock()
+
+    def aceita(self, registro):
+        return ("url" in registro and "erro" not in registro
+                and registro.get("etapa") in (None, self.anterior))
+
+    def processar(self, registro, emitir):
+        raise NotImplementedError
+
+    def fechar(self):
+        pass
+
+    def _worker(self, entrada, emitir):
+        while True:
+            registro = entrada.get()
+            if registro is FIM:
+                entrada.put(FIM)  # os outros workers também precisam ver o fim
+                return
+            if not self.aceita(registro):
+                continue
+            with self.lock:
+                self.entradas += 1
+            inicio = time.perf_counter()
+            try:
+                self.processar(registro, emitir)
+            except Exception as e:
+                with self.lock:
+                    self.erros += 1
+                alvo = registro.get("url") or registro.get("host")
+                emitir({"url": alvo, "erro": f"{e.__class__.__name__}: {e}"}, adiante=False)
+            medir(f"etapa.{self.nome}", time.perf_counter() - inicio)
+
+    def executar(self, entrada, emitir):
+        threads = [threading.Thread(target=self._worker, args=(entrada, emitir), daemon=True)
+                   for _ in range(self.workers)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.fechar()
+
+
+class EtapaSonda(Etapa):
+    """
+    robots_sitemap.Prober num laço asyncio próprio, com ``concurrency`` hosts
+    em paralelo e os sitemaps lidos pelo mesmo pool. O laço não pode bloquear
+    numa fila cheia (as conexões abertas estourariam o timeout), então a saída
+    desta etapa não tem limite e a pressão volta pela entrada: um host novo
+    só entra enquanto a etapa seguinte tiver espaço.
+    """
+
+    nome = "sonda"
+
+    def __init__(self, concurrency, timeout, paths, verify_ssl, retries, per_host,
+                 sitemap_concurrency, sitemap_depth, verbose=False):
+        super().__init__(concurrency)
+        self.timeout = timeout
+        self.paths = tuple(paths)
+        self.verify_ssl = verify_ssl
+        self.retries = retries
+        self.per_host = per_host
+        self.sitemap_concurrency = sitemap_concurrency
+        self.sitemap_depth = sitemap_depth
+        self.verbose = verbose
+
+    def aceita(self, registro):
+        return bool(registro.get("host"))
+
+    async def _hosts(self, entrada, emitir):
+        loop = asyncio.get_running_loop()
+        ler = functools.partial(entrada.get, timeout=ESPERA_FILA)
+        while True:
+            while emitir.cheia():
+                await asyncio.sleep(0.05)
+            # Leituras curtas: se o Prober morrer, o asyncio.run não fica
+            # esperando uma thread do executor presa na fila vazia
+            try:
+                registro = await loop.run_in_executor(None, ler)
+            except queue.Empty:
+                continue
+            if registro is FIM:
+                return
+            if self.aceita(registro):
+                self.entradas += 1
+                yield registro["host"].strip().lower().rstrip(".")
+
+    async def _rodar(self, entrada, emitir):
+        def emit_url(loc, lastmod, sitemap):
+            emitir({"url": loc, "lastmod": lastmod, "sitemap": sitemap})
+
+        def sitemaps(pool):
+            return robots_sitemap.SitemapIngester(pool, emit_url, self.timeout, self.sitemap_concurrency,
+                                                  self.sitemap_depth, log=self._log)
+
+        prober = robots_sitemap.Prober(self.workers, self.timeout, self.paths, self.verify_ssl,
+                                       emit=self._log, sitemaps=sitemaps, retries=self.retries,
+                                       per_host=self.per_host,
+                                       on_response=lambda url, status: emitir({"url": url, "status": status}))
+        await prober.run(self._hosts(entrada, emitir))
+        contar("conexoes.abertas", prober.pool.opened)
+        contar("conexoes.reaproveitadas", prober.pool.reused)
+
+    def _log(self, linha):
+        if self.verbose:
+            print(linha, file=sys.stderr, flush=True)
+
+    def executar(self, entrada, emitir):
+        asyncio.run(self._rodar(entrada, emitir))
+
+
+class EtapaJS(Etapa):
+    """
+    URLs de JavaScript: as .js que chegam passam direto; das respostas da
+    sonda sai a raiz do host, e das demais páginas (até ``paginas_por_host``
+    por host) saem os <script src>. Cada JS é emitido uma vez só.
+    """
+
+    nome = "js"
+    anterior = "sonda"
+
+    def __init__(self, cliente, workers, paginas_por_host=PAGINAS_POR_HOST):
+        super().__init__(workers)
+        self.cliente = cliente
+        self.paginas_por_host = paginas_por_host
+        self.vistos = set()
+        self.paginas = {}
+
+    def _novo(self, url):
+        with self.lock:
+            if url in self.vistos:
+                return False
+            self.vistos.add(url)
+            return True
+
+    def _reservar_pagina(self, url):
+        host = urlparse(url).netloc.lower()
+        with self.lock:
+            if url in self.vistos or self.paginas.get(host, 0) >= self.paginas_por_host:
+                return False
+            self.vistos.add(url)
+            self.paginas[host] = self.paginas.get(host, 0) + 1
+            return True
+
+    def processar(self, registro, emitir):
+        url = registro["url"]
+        if not url.lower().startswith(("http://", "https://")):
+            return
+        if "status" in registro:
+            url = urljoin(url, "/")  # robots.txt/sitemap.xml respondeu: o host está vivo
+        ext = extensao(url)
+        if ext in JS_EXT:
+            if self._novo(url):
+                emitir({"url": url, "pagina": None})
+            return
+        if ext in ESTATICOS or not self._reservar_pagina(url):
+            return
+
+        with self.cliente.abrir(url) as resposta:
+            tipo = resposta.headers.get("Content-Type", "")
+            if resposta.status_code != 200 or "html" not in tipo.lower():
+                return
+            resposta.raw.decode_content = True
+            corpo = resposta.raw.read(PAGINA_MAX)
+            base = resposta.url
+        html = corpo.decode(charset_de(resposta.headers), errors="ignore")
+        for m in SCRIPT_SRC.finditer(html):
+            js = urljoin(base, next(g for g in m.groups() if g).strip())
+            if js.lower().startswith(("http://", "https://")) and self._novo(js):
+                emitir({"url": js, "pagina": url})
+
+
+class EtapaAchados(Etapa):
+    """
+    O 3urls sobre cada bundle: baixa o corpo uma vez, extrai URLs e segredos
+    (extract_all) e já procura a referência ao sourcemap, que segue para a
+    próxima etapa sem um segundo download do JS. Achados repetidos entre
+    bundles saem uma vez só.
+    """
+
+    nome = "achados"
+    anterior = "js"
+
+    def __init__(self, cliente, workers, urls3, guess_map=False):
+        super().__init__(workers)
+        self.cliente = cliente
+        self.urls3 = urls3
+        self.guess_map = guess_map
+        self.achados = set()
+
+    def _novos(self, chaves):
+        with self.lock:
+            novos = [c for c in chaves if c not in self.achados]
+            self.achados.update(novos)
+        return novos
+
+    def processar(self, registro, emitir):
+        url = registro["url"]
+        with self.cliente.abrir(url) as resposta:
+            resposta.raise_for_status()
+            corpo = self.urls3.decoded_body(resposta.raw).read()
+            texto = corpo.decode(charset_de(resposta.headers), errors="ignore")
+            ref = resposta.headers.get("SourceMap") or resposta.headers.get("X-SourceMap")
+            base = resposta.url
+        urls, segredos = self.urls3.extract_all(texto, url)
+        ref = ref or decompiler.find_sourcemap_reference(texto)
+
+        for tipo, valor in self._novos([("url", u) for u in urls] + segredos):
+            if tipo == "url":
+                emitir({"source": url, "kind": "url", "value": valor}, adiante=False)
+            else:
+                emitir({"source": url, "kind": "secret", "type": tipo, "value": valor}, adiante=False)
+        if ref is not None and ref.startswith("data:"):
+            ref = "data:"  # mapa embutido: a etapa mapas relê o JS em vez de levar o mapa na linha
+        elif ref is not None:
+            ref = urljoin(base, ref)
+        elif self.guess_map:
+            ref = url + ".map"
+        emitir({"url": url, "mapa": ref, "urls": len(urls), "segredos": len(segredos)})
+
+
+class EtapaMapas(Etapa):
+    """decompiler.BatchExtractor sobre o mesmo cliente; cada mapa é extraído uma vez."""
+
+    nome = "mapas"
+    anterior = "achados"
+
+    def __init__(self, cliente, workers, saida, jobs=1, guess_map=False, store=None):
+        super().__init__(workers)
+        self.extrator = decompiler.BatchExtractor(saida, workers=workers, jobs=jobs,
+                                                  guess_map=guess_map, store=store, client=cliente)
+
+    def processar(self, registro, emitir):
+        url = registro["url"]
+        ref = registro.get("mapa", "data:")
+        if ref is None:
+            return
+        if ref == "data:":
+            ref = self.extrator.discover(url)  # entrada avulsa ou mapa embutido: lê o próprio JS
+        resultado = self.extrator.extract(url, ref)
+        if resultado is not None:
+            pasta, arquivos = resultado
+            emitir({"url": url, "mapa": ref if not ref.startswith("data:") else "data:",
+                    "dir": pasta, "arquivos": arquivos})
+
+    def fechar(self):
+        self.extrator.close()
+
+
+class Saida:
+    """Grava os registros em JSONL com flush a cada linha, de qualquer thread."""
+
+    def __init__(self, arquivo, etapas=None):
+        self.arquivo = arquivo
+        self.etapas = etapas
+        self.lock = threading.Lock()
+        self.registros = 0
+        self.primeiro = None
+
+    def escrever(self, registro):
+        if self.etapas and registro["etapa"] not in self.etapas:
+            return
+        linha = json.dumps(registro, ensure_ascii=False) + "\n"
+        with self.lock:
+            try:
+                self.arquivo.write(linha)
+                self.arquivo.flush()
+            except BrokenPipeError:
+                return
+            self.registros += 1
+            if self.primeiro is None:
+                self.primeiro = time.monotonic()
+
+
+class Emissor:
+    """``emitir(registro, adiante=True)`` de uma etapa: grava e repassa à seguinte."""
+
+    def __init__(self, etapa, saida, proxima, limite, parada=None):
+        self.etapa = etapa
+        self.saida = saida
+        self.proxima = proxima
+        self.limite = limite
+        self.parada = parada
+        self.emitidos = 0
+        self.lock = threading.Lock()
+
+    def __call__(self, registro, adiante=True):
+        registro = {"etapa": self.etapa.nome, **registro}
+        with self.lock:
+            self.emitidos += 1
+        contar(f"itens.{self.etapa.nome}")
+        self.saida.escrever(registro)
+        if adiante and self.proxima is not None:
+            entregar(self.proxima, registro, self.parada)
+
+    def cheia(self):
+        return self.proxima is not None and self.proxima.qsize() >= self.limite
+
+
+def ler_registros(arquivos, primeira):
+    """Registros de entrada: JSON por linha ou texto puro (host na sonda, URL nas outras)."""
+    chave = "host" if primeira == "sonda" else "url"
+    for nome in arquivos or ["-"]:
+        f = sys.stdin if nome == "-" else open(nome, encoding="utf-8", errors="ignore")
+        with f:
+            for linha in f:
+                linha = linha.strip()
+                if not linha or linha.startswith("#"):
+                    continue
+                if linha.startswith("{"):
+                    try:
+                        yield json.loads(linha)
+                        continue
+                    except ValueError:
+                        pass
+                yield {chave: linha}
+
+
+def rodar(etapas, registros, saida, tamanho_fila=FILA):
+    """
+    Liga as etapas por filas e alimenta a primeira com ``registros``. Cada
+    etapa roda na sua thread; quando termina, manda FIM à seguinte. Uma
+    etapa que morre marca ``parada``: quem escreve na fila dela descarta os
+    registros em vez de travar na fila cheia, e as seguintes terminam normalmente.
+    ``registros`` é lido numa thread à parte, então uma entrada lenta (stdin
+    interativo) não segura o fim depois que a primeira etapa morreu.
+    """
+    # A saída de uma etapa assíncrona não tem limite (ver EtapaSonda)
+    filas = [queue.Queue(0 if i and isinstance(etapas[i - 1], EtapaSonda) else tamanho_fila)
+             for i in range(len(etapas))]
+    emissores = [Emissor(etapa, saida, filas[i + 1] if i + 1 < len(etapas) else None, tamanho_fila,
+                         etapas[i + 1].parada if i + 1 < len(etapas) else None)
+                 for i, etapa in enumerate(etapas)]
+
+    def executar(i):
+        etapa = etapas[i]
+        try:
+            etapa.executar(filas[i], emissores[i])
+        except Exception as e:
+            etapa.falha = f"{e.__class__.__name__}: {e}"
+            print(f"[ERRO] etapa {etapa.nome} parou: {etapa.falha}", file=sys.stderr, flush=True)
+        finally:
+            etapa.parada.set()
+            if i + 1 < len(etapas):
+                entregar(filas[i + 1], FIM, etapas[i + 1].parada)
+
+    threads = [threading.Thread(target=executar, args=(i,), name=etapa.nome, daemon=True)
+               for i, etapa in enumerate(etapas)]
+    erros = []
+
+    def alimentar():
+        try:
+            for registro in registros:
+                if not entregar(filas[0], registro, etapas[0].parada):
+                    break
+        except Exception as e:
+            erros.append(e)
+        finally:
+            entregar(filas[0], FIM, etapas[0].parada)
+
+    for t in threads:
+        t.start()
+    threading.Thread(target=alimentar, name="entrada", daemon=True).start()
+    for t in threads:
+        t.join()
+    if erros:
+        raise erros[0]
+    return emissores
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Sonda robots/sitemap, coleta JS, extrai URLs/segredos e "
+                                             "sourcemaps em fluxo, com as etapas sobrepostas.")
+    ap.add_argument("inputs", nargs="*", help="Subdomínios (ou registros JSONL) por linha (padrão: stdin)")
+    ap.add_argument("-o", "--output", default="-", help="Arquivo JSONL de saída (padrão: stdout)")
+    ap.add_argument("--de", choices=ETAPAS, default=ETAPAS[0], help="Primeira etapa (padrão: sonda)")
+    ap.add_argument("--ate", choices=ETAPAS, default=ETAPAS[-1], help="Última etapa (padrão: mapas)")
+    ap.add_argument("--emitir", action="append", choices=ETAPAS, metavar="ETAPA",
+                    help="Só grava os registros destas etapas (repetível; padrão: todas)")
+    ap.add_argument("--fila", type=int, default=FILA,
+                    help=f"Registros esperando entre duas etapas; fila cheia segura a anterior (padrão: {FILA})")
+
+    conc = ap.add_argument_group("concorrência por etapa")
+    conc.add_argument("-c", "--concurrency", type=int, default=robots_sitemap.CONCURRENCY,
+                      help=f"Hosts sondados ao mesmo tempo (padrão: {robots_sitemap.CONCURRENCY})")
+    conc.add_argument("--sitemap-concurrency", type=int, default=robots_sitemap.SITEMAP_CONCURRENCY,
+                      help=f"Sitemaps lidos ao mesmo tempo (padrão: {robots_sitemap.SITEMAP_CONCURRENCY})")
+    conc.add_argument("--js-workers", type=int, default=8, help="Páginas baixadas ao mesmo tempo (padrão: 8)")
+    conc.add_argument("--achados-workers", type=int, default=8,
+                      help="Bundles analisados ao mesmo tempo (padrão: 8)")
+    conc.add_argument("--mapas-workers", type=int, default=4, help="Mapas baixados ao mesmo tempo (padrão: 4)")
+    conc.add_argument("-j", "--jobs", type=int, default=1,
+                      help="Processos para extrair os mapas (padrão: 1, na própria thread)")
+    conc.add_argument("--per-host", type=int, default=4,
+                      help="Requisições simultâneas por host nas etapas js/achados/mapas (padrão: 4)")
+
+    ap.add_argument("--timeout", type=float, default=TIMEOUT, help=f"Timeout por requisição (padrão: {TIMEOUT:g})")
+    ap.add_argument("--retries", type=int, default=RETRIES, help=f"Reenvios em falha de conexão (padrão: {RETRIES})")
+    ap.add_argument("--insecure", action="store_true", help="Não verifica certificados TLS")
+    ap.add_argument("--paths", nargs="+", default=list(robots_sitemap.DEFAULT_PATHS),
+                    help="Caminhos sondados em cada host (padrão: robots.txt sitemap.xml)")
+    ap.add_argument("--sitemap-depth", type=int, default=robots_sitemap.SITEMAP_DEPTH,
+                    help=f"Níveis máximos de índices de sitemap (padrão: {robots_sitemap.SITEMAP_DEPTH})")
+    ap.add_argument("--paginas-por-host", type=int, default=PAGINAS_POR_HOST,
+                    help=f"Páginas HTML lidas por host atrás de <script src> (padrão: {PAGINAS_POR_HOST})")
+    ap.add_argument("--guess-map", action="store_true", help="Sem sourceMappingURL, tenta <url do JS>.map")
+    ap.add_argument("--mapas-dir", default="fontes", metavar="DIR",
+                    help="Onde os sourcemaps são extraídos (padrão: fontes)")
+    ap.add_argument("--store", metavar="DIR", help="Armazena as fontes por conteúdo (o --store do decompiler)")
+    ap.add_argument("-v", "--verbose", action="store_true", help="Mostra as linhas da sonda no stderr")
+    instrumentacao.adicionar_argumentos(ap)
+    args = ap.parse_args()
+
+    inicio, fim = ETAPAS.index(args.de), ETAPAS.index(args.ate)
+    if inicio > fim:
+        ap.error("--de precisa vir antes de --ate")
+    if min(args.fila, args.concurrency, args.sitemap_concurrency, args.js_workers,
+           args.achados_workers, args.mapas_workers, args.jobs, args.per_host) < 1:
+        ap.error("--fila, workers, --jobs e --per-host precisam ser >= 1")
+    nomes = ETAPAS[inicio:fim + 1]
+
+    urls3 = load_3urls()
+    cliente = ClienteHTTP(timeout=args.timeout, retries=args.retries, per_host=args.per_host,
+                          pool_size=args.js_workers + args.achados_workers + args.mapas_workers,
+                          verify=not args.insecure,
+                          headers={"User-Agent": USER_AGENT, "Accept-Encoding": urls3.ACCEPT_ENCODING})
+    instrumentacao.configurar(args, lambda: {"http": cliente.estatisticas()})
+
+    construtores = {
+        "sonda": lambda: EtapaSonda(args.concurrency, args.timeout, args.paths, not args.insecure, args.retries,
+                                    None, args.sitemap_concurrency, args.sitemap_depth, args.verbose),
+        "js": lambda: EtapaJS(cliente, args.js_workers, args.paginas_por_host),
+        "achados": lambda: EtapaAchados(cliente, args.achados_workers, urls3, args.guess_map),
+        "mapas": lambda: EtapaMapas(
+            cliente, args.mapas_workers, os.path.abspath(args.mapas_dir), args.jobs, args.guess_map,
+            decompiler.BlobStore(os.path.abspath(args.store)) if args.store else None),
+    }
+    etapas = [construtores[nome]() for nome in nomes]
+
+    comeco = time.monotonic()
+    out = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8")
+    saida = Saida(out, set(args.emitir) if args.emitir else None)
+    try:
+        # O decompiler anuncia cada arquivo salvo no stdout, que aqui pode ser a saída JSONL
+        with contextlib.redirect_stdout(sys.stderr):
+            emissores = rodar(etapas, ler_registros(args.inputs, nomes[0]), saida, args.fila)
+    except KeyboardInterrupt:
+        sys.exit(130)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+        cliente.fechar()
+
+    total = time.monotonic() - comeco
+    for etapa, emissor in zip(etapas, emissores):
+        print(f"[INFO] {etapa.nome}: {etapa.entradas} entrada(s) -> {emissor.emitidos} registro(s), "
+              f"{etapa.erros} erro(s)", file=sys.stderr)
+    primeiro = f"; primeiro em {saida.primeiro - comeco:.1f}s" if saida.primeiro else ""
+    print(f"[INFO] {saida.registros} registro(s) gravado(s) em {total:.1f}s{primeiro}", file=sys.stderr)
+    if any(etapa.falha for etapa in etapas):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -23,6 +23,9 @@ read -p "[+] Digite o domínio alvo (ex: exemplo.com ou site.com.br): " DOMINIO
 DOMINIO_SEM_PROTOCOL=$(echo $DOMINIO | sed -E 's/^https?:\/\///')
 DOMINIO_SEM_TLD=$(echo $DOMINIO_SEM_PROTOCOL | sed -E 's/\.[a-z]+$//')
 
+# Pasta dos scripts auxiliares (antes do cd)
+SCRIPT_DIR=$(cd "$(dirname "$0")" && pwd)
+
 # Cria a pasta com o nome do domínio sem protocolo e TLD
 mkdir -p busca/$DOMINIO_SEM_TLD
 cd busca/$DOMINIO_SEM_TLD || exit
@@ -35,7 +38,8 @@ function coleta_urls() {
   gau $DOMINIO > gau.txt
   katana -u https://$DOMINIO -silent > katana.txt
   cat wayback.txt gau.txt katana.txt | sort -u > all_urls.txt
-  cat all_urls.txt | grep "=" > urls_com_param.txt
+  # Uma URL por padrão (host + caminho + nomes de parâmetros), já canonicalizada
+  python3 "$SCRIPT_DIR/canon_urls.py" all_urls.txt -o urls_com_param.txt
   echo "[+] URLs totais com parâmetros: $(wc -l < urls_com_param.txt)"
 }
 
@@ -90,6 +94,21 @@ function fuzzar_xss() {
   echo "[+] Resultados salvos em ffuf_xss_resultados.txt"
 }
 
+# 🔗 Pipeline em fluxo: robots/sitemap -> JS -> URLs/segredos -> sourcemaps
+function pipeline_fluxo() {
+  if [[ -f alvos.txt ]]; then
+    entrada=alvos.txt
+  else
+    echo "[*] alvos.txt não encontrado; usando só $DOMINIO_SEM_PROTOCOL"
+    echo "$DOMINIO_SEM_PROTOCOL" > alvos_pipeline.txt
+    entrada=alvos_pipeline.txt
+  fi
+  echo "[*] Rodando o pipeline (resultados aparecem em pipeline.jsonl enquanto roda)..."
+  python3 "$SCRIPT_DIR/pipeline.py" "$entrada" -o pipeline.jsonl --mapas-dir fontes
+  echo "[+] Segredos encontrados: $(grep -c '"kind": "secret"' pipeline.jsonl)"
+  echo "[+] Fontes extraídas em fontes/"
+}
+
 # 🧩 Função para mostrar o menu
 function show_menu() {
   echo ""
@@ -99,6 +118,7 @@ function show_menu() {
   echo "3) Verificar URLs ativas com httpx"
   echo "4) Rodar nuclei (CVE scan)"
   echo "5) Rodar fuzzing básico de XSS com ffuf"
+  echo "6) Pipeline em fluxo: robots/sitemap, JS, URLs/segredos e sourcemaps"
   echo "0) Sair"
   echo "=============================================="
 }
@@ -115,6 +135,7 @@ while true; do
     3) verificar_httpx ;;
     4) rodar_nuclei ;;
     5) fuzzar_xss ;;
+    6) pipeline_fluxo ;;
     0) 
       echo "[+] Saindo do script. Até a próxima!" 
       exit 0
@@ -1,44 +1,454 @@
-import requests
-import concurrent.futures
+import argparse
+import asyncio
+import json
+import re
+import sys
+import time
+import zlib
+from urllib.parse import urldefrag, urljoin
+from xml.etree.ElementTree import ParseError, XMLPullParser
 
-def fetch_url(url):
-    # Tenta a versão https
-    try:
-        response = requests.get(url, timeout=5)
-        if response.status_code == 200:
-            return f"[+] {url} encontrado ({len(response.text)} bytes)"
-        elif response.status_code == 403:
-            return f"[-] {url} bloqueado (403 Forbidden)"
+import instrumentacao
+from cliente_http import PROBE_ERRORS, ConnectionPool, DNSCache
+from instrumentacao import contar, fase
+
+DEFAULT_PATHS = ("robots.txt", "sitemap.xml")
+CONCURRENCY = 200      # hosts sondados ao mesmo tempo
+TIMEOUT = 5.0          # por requisição (conexão + resposta)
+RETRIES = 1            # reenvios de falha de conexão por requisição
+USER_AGENT = "Mozilla/5.0 (compatible; robots-sitemap)"
+ROBOTS_MAX = 1 << 20   # bytes de robots.txt guardados para achar as linhas Sitemap:
+SITEMAP_CONCURRENCY = 16
+SITEMAP_DEPTH = 5      # índices dentro de índices (o protocolo diz 1; há quem aninhe)
+GZIP_STEP = 1 << 20    # saída máxima por chamada ao descompressor
+ROBOTS_SITEMAP = re.compile(r"^\s*sitemap\s*:\s*(\S+)", re.I | re.M)
+
+def describe(url, status, size):
+    """Linha de saída de uma resposta: encontrado, bloqueado ou não encontrado."""
+    if status == 200:
+        return f"[+] {url} encontrado ({size} bytes)"
+    elif status == 403:
+        return f"[-] {url} bloqueado (403 Forbidden)"
+    return f"[-] {url} não encontrado ({status})"
+
+
+class Prober:
+    """
+    Sonda robots.txt/sitemap.xml de muitos hosts com ``concurrency`` hosts
+    em paralelo. No primeiro caminho de cada host, HTTPS e HTTP correm ao
+    mesmo tempo: vale o HTTPS se ele responder (o HTTP é cancelado), senão o
+    HTTP; um host morto custa um timeout, não dois. Os caminhos seguintes usam
+    o esquema que respondeu, pelas conexões já abertas. Cada linha é
+    entregue a ``emit`` assim que fica pronta.
+
+    Com ``sitemaps`` (um SitemapIngester sobre o mesmo pool), as linhas
+    Sitemap: do robots.txt e os sitemap.xml encontrados são lidos também.
+    ``on_response(url, status)`` recebe cada resposta obtida (o host está vivo
+    nesse esquema), para quem encadeia outras etapas na sonda.
+    """
+
+    def __init__(self, concurrency=CONCURRENCY, timeout=TIMEOUT, paths=DEFAULT_PATHS,
+                 verify_ssl=True, emit=print, sitemaps=None, retries=RETRIES, per_host=None,
+                 on_response=None):
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self.paths = paths
+        self.emit = emit
+        self.on_response = on_response
+        self.dns = DNSCache()
+        self.pool = ConnectionPool(self.dns, timeout, verify_ssl, user_agent=USER_AGENT,
+                                   per_host=per_host, retries=retries)
+        self.sitemaps = sitemaps(self.pool) if sitemaps else None
+        self.hosts = 0
+        self.results = 0
+
+    def _found(self, url, status, body):
+        """Repassa ao leitor de sitemaps o que a sonda encontrou."""
+        if self.on_response is not None:
+            self.on_response(url, status)
+        if self.sitemaps is None or status != 200:
+            return
+        if url.lower().endswith("robots.txt"):
+            # Os caminhos da própria sonda ficam para ela, que lê o sitemap na mesma requisição
+            probed = {urljoin(url, "/" + path) for path in self.paths}
+            for m in ROBOTS_SITEMAP.finditer(body.decode("utf-8", "ignore")):
+                sitemap = urljoin(url, m.group(1))
+                if sitemap not in probed:
+                    self.sitemaps.add(sitemap)
         else:
-            return f"[-] {url} não encontrado ({response.status_code})"
-    except requests.RequestException:
-        # Se falhar, tenta com http
-        url_http = url.replace("https://", "http://")
+            self.sitemaps.add(url)
+
+    async def _get(self, url, keep_body=False, sitemap=False):
+        """
+        (status, tamanho, corpo); o corpo só é guardado com ``keep_body`` (até
+        ROBOTS_MAX). Com ``sitemap``, um 200 vai direto para o leitor de
+        sitemaps, que lê o corpo desta mesma resposta em vez de baixá-lo de novo.
+        """
+        response = await self.pool.request(url)
+        if sitemap and response.status == 200 and self.sitemaps.claim(url):
+            try:
+                size = await self.sitemaps.ingest(response, url)
+            finally:
+                response.close()
+            return response.status, size, None
+        kept = []
+
+        async def consume():
+            total = 0
+            async for block in response.iter_body():
+                if keep_body and total < ROBOTS_MAX:
+                    kept.append(block[:ROBOTS_MAX - total])
+                total += len(block)
+            return total
+
         try:
-            response = requests.get(url_http, timeout=5)
-            if response.status_code == 200:
-                return f"[+] {url_http} encontrado ({len(response.text)} bytes)"
-            elif response.status_code == 403:
-                return f"[-] {url_http} bloqueado (403 Forbidden)"
+            size = await asyncio.wait_for(consume(), self.timeout)
+        finally:
+            response.close()
+        return response.status, size, b"".join(kept) if keep_body else None
+
+    async def _race(self, https_url, http_url, keep_body=False):
+        """(esquema, url, status, tamanho, corpo) do melhor esquema, ou None se nenhum respondeu."""
+        https = asyncio.ensure_future(self._get(https_url, keep_body))
+        http = asyncio.ensure_future(self._get(http_url, keep_body))
+        try:
+            try:
+                return ("https", https_url) + await https
+            except PROBE_ERRORS:
+                pass
+            try:
+                return ("http", http_url) + await http
+            except PROBE_ERRORS:
+                return None
+        finally:
+            for task in (https, http):
+                if not task.done():
+                    task.cancel()
+            await asyncio.gather(https, http, return_exceptions=True)
+
+    async def probe_host(self, subdomain):
+        scheme = None
+        for path in self.paths:
+            https_url = f"https://{subdomain}/{path}"
+            http_url = f"http://{subdomain}/{path}"
+            keep_body = self.sitemaps is not None and path.lower().endswith("robots.txt")
+            if scheme is None:
+                result = await self._race(https_url, http_url, keep_body)
+                if result is None:
+                    # Nenhum esquema respondeu: o host está fora, não insiste
+                    for rest in self.paths[self.paths.index(path):]:
+                        self.emit(f"[-] http://{subdomain}/{rest} erro ao conectar")
+                        self.results += 1
+                    return
+                scheme, url, status, size, body = result
+            else:
+                # Esquema já conhecido: um sitemap achado é lido nesta mesma
+                # requisição (na corrida o perdedor é cancelado, então lá não)
+                sitemap = self.sitemaps is not None and not path.lower().endswith("robots.txt")
+                url = https_url if scheme == "https" else http_url
+                try:
+                    status, size, body = await self._get(url, keep_body, sitemap)
+                except PROBE_ERRORS:
+                    if scheme == "http":
+                        self.emit(f"[-] {url} erro ao conectar")
+                        self.results += 1
+                        continue
+                    try:
+                        url = http_url
+                        status, size, body = await self._get(url, keep_body)
+                    except PROBE_ERRORS:
+                        self.emit(f"[-] {url} erro ao conectar")
+                        self.results += 1
+                        continue
+            self.emit(describe(url, status, size))
+            self.results += 1
+            self._found(url, status, body)
+
+    async def _worker(self, queue):
+        while True:
+            subdomain = await queue.get()
+            try:
+                if subdomain is None:
+                    return
+                await self.probe_host(subdomain)
+                self.hosts += 1
+            finally:
+                queue.task_done()
+
+    async def run(self, subdomains):
+        """
+        Fila limitada: a lista de entrada pode ser um iterador preguiçoso, ou
+        assíncrono quando os hosts chegam de outra etapa enquanto a sonda roda.
+        """
+        queue = asyncio.Queue(self.concurrency * 2)
+        workers = [asyncio.ensure_future(self._worker(queue)) for _ in range(self.concurrency)]
+        try:
+            if hasattr(subdomains, "__aiter__"):
+                async for subdomain in subdomains:
+                    await queue.put(subdomain)
             else:
-                return f"[-] {url_http} não encontrado ({response.status_code})"
-        except requests.RequestException:
-            return f"[-] {url_http} erro ao conectar"
-
-def scan_subdomains(subdomains):
-    urls = []
-    for subdomain in subdomains:
-        urls.append(f"https://{subdomain}/robots.txt")
-        urls.append(f"https://{subdomain}/sitemap.xml")
-    
-    with concurrent.futures.ThreadPoolExecutor(max_workers=10) as executor:
-        results = executor.map(fetch_url, urls)
-    
-    for result in results:
-        print(result)
-
-def load_subdomains():
-    filename = "alvos.txt"  # Defina aqui o nome do arquivo
+                for subdomain in subdomains:
+                    await queue.put(subdomain)
+            for _ in workers:
+                await queue.put(None)
+            await asyncio.gather(*workers)
+            if self.sitemaps is not None:
+                await self.sitemaps.wait()
+        finally:
+            for worker in workers:
+                worker.cancel()
+            self.pool.close()
+
+# ---------------------------------------------------------------------------
+# Sitemaps: leitura em fluxo, recursiva, com .xml.gz
+# ---------------------------------------------------------------------------
+def _local(tag):
+    return tag.rsplit("}", 1)[-1]
+
+class SitemapParser:
+    """
+    Parser incremental de um sitemap: recebe bytes com ``feed`` e devolve
+    ("url" | "sitemap", loc, lastmod) à medida que cada <url>/<sitemap>
+    fecha. Cada entrada é descartada da árvore logo depois, então a memória
+    não cresce com o tamanho do arquivo. Aceita também o formato texto (uma
+    URL por linha).
+    """
+
+    def __init__(self):
+        self.mode = None     # "xml" ou "text", decidido pelo primeiro byte útil
+        self.xml = None
+        self.root = None
+        self.carry = b""
+
+    def _detect(self, data):
+        start = data.lstrip()[:1]
+        if not start:
+            return False
+        self.mode = "xml" if start == b"<" else "text"
+        if self.mode == "xml":
+            self.xml = XMLPullParser(events=("start", "end"))
+        return True
+
+    def _xml_events(self):
+        found = []
+        for event, elem in self.xml.read_events():
+            if event == "start":
+                if self.root is None:
+                    self.root = elem
+                continue
+            kind = _local(elem.tag)
+            if kind not in ("url", "sitemap"):
+                continue
+            loc = lastmod = None
+            for child in elem:
+                name = _local(child.tag)
+                if name == "loc":
+                    loc = (child.text or "").strip()
+                elif name == "lastmod":
+                    lastmod = (child.text or "").strip()
+            if loc:
+                found.append((kind, loc, lastmod))
+            self.root.clear()  # entradas já lidas saem da árvore
+        return found
+
+    def _text_lines(self, data, final=False):
+        data = self.carry + data
+        lines = data.split(b"\n")
+        self.carry = b"" if final else lines.pop()
+        found = []
+        for line in lines:
+            line = line.strip().decode("utf-8", "ignore")
+            if line.startswith(("http://", "https://")):
+                found.append(("url", line, None))
+        return found
+
+    def feed(self, data):
+        if self.mode is None:
+            self.carry += data
+            if not self._detect(self.carry):
+                return []
+            data, self.carry = self.carry, b""
+        if self.mode == "text":
+            return self._text_lines(data)
+        self.xml.feed(data)
+        return self._xml_events()
+
+    def close(self):
+        if self.mode == "text":
+            return self._text_lines(b"", final=True)
+        if self.mode == "xml":
+            self.xml.close()
+            return self._xml_events()
+        return []
+
+class SitemapIngester:
+    """
+    Lê sitemaps recursivamente sobre o pool de conexões: índices viram novas
+    leituras (no máximo ``concurrency`` ao mesmo tempo, cada sitemap uma vez
+    só, até ``max_depth`` níveis) e cada URL encontrada vai para
+    ``emit_url(loc, lastmod, sitemap)`` assim que é lida. Sitemaps .gz são
+    reconhecidos pelo cabeçalho e descomprimidos em fluxo.
+    """
+
+    def __init__(self, pool, emit_url, timeout=TIMEOUT, concurrency=SITEMAP_CONCURRENCY,
+                 max_depth=SITEMAP_DEPTH, log=None):
+        self.pool = pool
+        self.emit_url = emit_url
+        self.timeout = timeout
+        self.max_depth = max_depth
+        self.log = log or (lambda line: print(line, file=sys.stderr, flush=True))
+        self.sem = asyncio.Semaphore(concurrency)
+        self.seen = set()
+        self.tasks = set()
+        self.read = 0
+        self.failed = 0
+        self.urls = 0
+        self.bytes = 0
+
+    def add(self, url, depth=0):
+        url, _ = urldefrag(url.strip())
+        if not url.lower().startswith(("http://", "https://")) or url in self.seen:
+            return
+        if depth > self.max_depth:
+            self.log(f"[-] {url} ignorado (índice aninhado demais)")
+            return
+        self.seen.add(url)
+        task = asyncio.ensure_future(self._read(url, depth))
+        self.tasks.add(task)
+        task.add_done_callback(self.tasks.discard)
+
+    async def wait(self):
+        while self.tasks:
+            await asyncio.gather(*list(self.tasks), return_exceptions=True)
+
+    def claim(self, url):
+        """
+        Marca ``url`` como lido por quem já tem a resposta aberta (a sonda),
+        que então chama ``ingest``; False se o sitemap já foi visto.
+        """
+        url, _ = urldefrag(url.strip())
+        if url in self.seen:
+            return False
+        self.seen.add(url)
+        return True
+
+    async def _blocks(self, response, received):
+        """
+        Corpo da resposta, já descomprimido se for gzip, com timeout por bloco;
+        ``received[0]`` soma os bytes recebidos.
+        """
+        body = response.iter_body()
+        gz = None
+        first = True
+        while True:
+            try:
+                block = await asyncio.wait_for(body.__anext__(), self.timeout)
+            except StopAsyncIteration:
+                break
+            self.bytes += len(block)
+            received[0] += len(block)
+            if first:
+                first = False
+                if block[:2] == b"\x1f\x8b":
+                    gz = zlib.decompressobj(16 + zlib.MAX_WBITS)
+            if gz is None:
+                yield block
+                continue
+            while block:
+                yield gz.decompress(block, GZIP_STEP)
+                block = gz.unconsumed_tail
+        if gz is not None:
+            yield gz.flush()
+
+    async def _read(self, url, depth):
+        async with self.sem:
+            try:
+                response = await self.pool.request(url)
+            except PROBE_ERRORS as e:
+                self.failed += 1
+                self.log(f"[-] sitemap {url} erro ao conectar ({e.__class__.__name__})")
+                return
+            try:
+                if response.status != 200:
+                    self.failed += 1
+                    self.log(f"[-] sitemap {url} não encontrado ({response.status})")
+                    return
+                await self.ingest(response, url, depth)
+            finally:
+                response.close()
+
+    async def ingest(self, response, url, depth=0):
+        """Lê e interpreta o corpo de um 200 já aberto; devolve os bytes recebidos."""
+        received = [0]
+        try:
+            parser = SitemapParser()
+            async for data in self._blocks(response, received):
+                with fase("parse"):
+                    entries = parser.feed(data)
+                self._handle(entries, url, depth)
+            with fase("parse"):
+                entries = parser.close()
+            self._handle(entries, url, depth)
+            self.read += 1
+        except (PROBE_ERRORS + (ParseError, zlib.error)) as e:
+            self.failed += 1
+            self.log(f"[-] sitemap {url} inválido ou interrompido ({e.__class__.__name__}: {e})")
+        return received[0]
+
+    def _handle(self, entries, sitemap, depth):
+        for kind, loc, lastmod in entries:
+            if kind == "sitemap":
+                self.add(urljoin(sitemap, loc), depth + 1)
+            else:
+                self.urls += 1
+                self.emit_url(loc, lastmod, sitemap)
+
+def scan_subdomains(subdomains, concurrency=CONCURRENCY, timeout=TIMEOUT, paths=DEFAULT_PATHS,
+                    verify_ssl=True, urls_out=None, jsonl=False,
+                    sitemap_concurrency=SITEMAP_CONCURRENCY, sitemap_depth=SITEMAP_DEPTH,
+                    retries=RETRIES, per_host=None):
+    """
+    Com ``urls_out`` (arquivo já aberto), lê os sitemaps encontrados e grava
+    ali uma URL por linha (ou JSON com lastmod e sitemap de origem); se for a
+    saída padrão, as linhas da sonda vão para stderr.
+    """
+    report = sys.stderr if urls_out is sys.stdout else sys.stdout
+    sitemaps = None
+    if urls_out is not None:
+        def emit_url(loc, lastmod, sitemap):
+            with fase("escrita"):
+                if jsonl:
+                    urls_out.write(json.dumps({"url": loc, "lastmod": lastmod, "sitemap": sitemap}) + "\n")
+                else:
+                    urls_out.write(loc + "\n")
+
+        def sitemaps(pool):
+            return SitemapIngester(pool, emit_url, timeout, sitemap_concurrency, sitemap_depth)
+
+    prober = Prober(concurrency, timeout, tuple(paths), verify_ssl,
+                    emit=lambda line: print(line, file=report, flush=True), sitemaps=sitemaps,
+                    retries=retries, per_host=per_host)
+    started = time.monotonic()
+    asyncio.run(prober.run(subdomains))
+    elapsed = time.monotonic() - started
+    if urls_out is not None:
+        urls_out.flush()
+    contar("itens.hosts", prober.hosts)
+    contar("itens.resultados", prober.results)
+    contar("conexoes.abertas", prober.pool.opened)
+    contar("conexoes.reaproveitadas", prober.pool.reused)
+    contar("conexoes.reenvios", prober.pool.retried)
+    print(f"[INFO] {prober.hosts} host(s), {prober.results} resultado(s) em {elapsed:.1f}s | "
+          f"DNS: {prober.dns.lookups} consulta(s) | conexões: {prober.pool.opened} aberta(s), "
+          f"{prober.pool.reused} reaproveitada(s), {prober.pool.retried} reenvio(s)", file=sys.stderr)
+    if prober.sitemaps is not None:
+        ing = prober.sitemaps
+        print(f"[INFO] Sitemaps: {ing.read} lido(s), {ing.failed} com falha, "
+              f"{ing.urls} URL(s), {ing.bytes / (1 << 20):.1f} MB", file=sys.stderr)
+        contar("itens.sitemaps", ing.read)
+        contar("itens.urls", ing.urls)
+
+def load_subdomains(filename="alvos.txt"):
     try:
         with open(filename, "r") as f:
             return [line.strip() for line in f if line.strip()]
@@ -46,7 +456,57 @@ def load_subdomains():
         print(f"Erro: Arquivo '{filename}' não encontrado.")
         return []
 
+def main():
+    parser = argparse.ArgumentParser(description="Sonda robots.txt e sitemap.xml de uma lista de subdomínios.")
+    parser.add_argument("-i", "--input", default="alvos.txt",
+                        help="Arquivo com um subdomínio por linha (padrão: alvos.txt)")
+    parser.add_argument("-c", "--concurrency", type=int, default=CONCURRENCY,
+                        help=f"Hosts sondados ao mesmo tempo (padrão: {CONCURRENCY})")
+    parser.add_argument("--timeout", type=float, default=TIMEOUT,
+                        help=f"Timeout de cada requisição, em segundos (padrão: {TIMEOUT:g})")
+    parser.add_argument("--retries", type=int, default=RETRIES,
+                        help=f"Reenvios em falha de conexão, com backoff (padrão: {RETRIES})")
+    parser.add_argument("--per-host", type=int, metavar="N",
+                        help="Máximo de conexões em uso por host (padrão: sem limite)")
+    parser.add_argument("--paths", nargs="+", default=list(DEFAULT_PATHS),
+                        help="Caminhos sondados em cada host (padrão: robots.txt sitemap.xml)")
+    parser.add_argument("--insecure", action="store_true",
+                        help="Não verifica certificados TLS")
+    parser.add_argument("--sitemaps", action="store_true",
+                        help="Lê os sitemaps (sitemap.xml e linhas Sitemap: do robots.txt), "
+                             "seguindo índices e .xml.gz, e emite as URLs encontradas")
+    parser.add_argument("--urls-out", default="-", metavar="ARQ",
+                        help="Destino das URLs com --sitemaps; '-' é a saída padrão, e aí o "
+                             "relatório da sonda vai para stderr (padrão: -)")
+    parser.add_argument("--jsonl", action="store_true",
+                        help="Com --sitemaps, emite JSON por linha com url, lastmod e sitemap")
+    parser.add_argument("--sitemap-concurrency", type=int, default=SITEMAP_CONCURRENCY,
+                        help=f"Sitemaps lidos ao mesmo tempo (padrão: {SITEMAP_CONCURRENCY})")
+    parser.add_argument("--sitemap-depth", type=int, default=SITEMAP_DEPTH,
+                        help=f"Níveis máximos de índices de sitemap (padrão: {SITEMAP_DEPTH})")
+    instrumentacao.adicionar_argumentos(parser)
+    args = parser.parse_args()
+    if args.concurrency < 1 or args.sitemap_concurrency < 1:
+        parser.error("--concurrency e --sitemap-concurrency precisam ser >= 1")
+    if args.retries < 0 or (args.per_host is not None and args.per_host < 1):
+        parser.error("--retries precisa ser >= 0 e --per-host >= 1")
+    instrumentacao.configurar(args)
+
+    subdomains = load_subdomains(args.input)
+    if not subdomains:
+        return
+    urls_out = None
+    if args.sitemaps:
+        urls_out = sys.stdout if args.urls_out == "-" else open(args.urls_out, "w", encoding="utf-8")
+    try:
+        scan_subdomains(subdomains, args.concurrency, args.timeout, args.paths,
+                        verify_ssl=not args.insecure, urls_out=urls_out, jsonl=args.jsonl,
+                        sitemap_concurrency=args.sitemap_concurrency,
+                        sitemap_depth=args.sitemap_depth, retries=args.retries,
+                        per_host=args.per_host)
+    finally:
+        if urls_out not in (None, sys.stdout):
+            urls_out.close()
+
 if __name__ == "__main__":
-    subdomains = load_subdomains()
-    if subdomains:
-        scan_subdomains(subdomains)
+    main()
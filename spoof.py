@@ -1,5 +1,30 @@
 import subprocess
 import argparse
+import asyncio
+import random
+import re
+import socket
+import struct
+import sys
+import time
+from collections import deque, namedtuple
+
+import instrumentacao
+from instrumentacao import contar, fase
+
+DNS_PORT = 53
+DNS_TIMEOUT = 2.0        # per attempt
+DNS_RETRIES = 2
+DNS_CONCURRENCY = 100    # queries in flight
+NEGATIVE_TTL = 300       # cache time for NXDOMAIN/NODATA without an SOA
+MAX_CACHE_TTL = 86400
+EDNS_UDP_SIZE = 1232     # lets long TXT answers fit in UDP without truncation
+QTYPE_A = 1
+QTYPE_CNAME = 5
+QTYPE_TXT = 16
+QTYPE_SOA = 6
+QTYPE_OPT = 41
+SPF_LOOKUP_LIMIT = 10    # RFC 7208 section 4.6.4
 
 # Define ANSI color codes for terminal output
 RED = "\033[91m"
@@ -47,7 +72,8 @@ def check_dmarc_record(record):
 
 def check_spf(domain):
     """Check the SPF record for a domain using the dig command."""
-    result = subprocess.run(["dig", "+short", "TXT", domain], stdout=subprocess.PIPE, text=True)
+    with fase("dns"):
+        result = subprocess.run(["dig", "+short", "TXT", domain], stdout=subprocess.PIPE, text=True)
     records = result.stdout.strip().split("\n")
     for record in records:
         if "v=spf1" in record:
@@ -56,18 +82,517 @@ def check_spf(domain):
 
 def check_dmarc(domain):
     """Check the DMARC record for a domain using the dig command."""
-    result = subprocess.run(["dig", "+short", "TXT", f"_dmarc.{domain}"], stdout=subprocess.PIPE, text=True)
+    with fase("dns"):
+        result = subprocess.run(["dig", "+short", "TXT", f"_dmarc.{domain}"], stdout=subprocess.PIPE, text=True)
     records = result.stdout.strip().split("\n")
     for record in records:
         if "v=DMARC1" in record:
             return record.strip('"')
     return None
 
+# ---------------------------------------------------------------------------
+# In-process DNS: wire format, UDP with TCP fallback, TTL cache
+# ---------------------------------------------------------------------------
+class DNSError(Exception):
+    pass
+
+def default_nameserver():
+    """First nameserver in /etc/resolv.conf, or a public resolver."""
+    try:
+        with open("/etc/resolv.conf") as f:
+            for line in f:
+                parts = line.split()
+                if len(parts) >= 2 and parts[0] == "nameserver":
+                    return parts[1]
+    except OSError:
+        pass
+    return "8.8.8.8"
+
+def parse_server(server):
+    """'1.2.3.4', '1.2.3.4:5353' or '[::1]:5353' -> (host, port)."""
+    if server.startswith("["):
+        host, _, rest = server[1:].partition("]")
+        return host, int(rest.lstrip(":") or DNS_PORT)
+    if server.count(":") == 1:
+        host, port = server.split(":")
+        return host, int(port)
+    return server, DNS_PORT
+
+def encode_name(name):
+    """
+    ``name`` in wire format. A name that can't go on the wire (empty or
+    over-long label, bad IDNA) is a DNSError, so it fails only the lookup
+    that asked for it.
+    """
+    try:
+        labels = name.rstrip(".").encode("idna").split(b".")
+    except UnicodeError as e:
+        raise DNSError(f"invalid name {name!r}: {e}") from None
+    if any(not 0 < len(label) <= 63 for label in labels) or sum(len(l) + 1 for l in labels) > 254:
+        raise DNSError(f"invalid name {name!r}")
+    return b"".join(bytes([len(label)]) + label for label in labels) + b"\x00"
+
+def build_query(qid, name, qtype=QTYPE_TXT):
+    """A recursive query for ``name`` with an EDNS0 OPT record."""
+    header = struct.pack("!HHHHHH", qid, 0x0100, 1, 0, 0, 1)
+    qname = encode_name(name)
+    opt = b"\x00" + struct.pack("!HHIH", QTYPE_OPT, EDNS_UDP_SIZE, 0, 0)
+    return header + qname + struct.pack("!HH", qtype, 1) + opt
+
+def _read_name(data, offset):
+    """Skip a (possibly compressed) name; return the offset after it."""
+    while True:
+        if offset >= len(data):
+            raise DNSError("truncated name")
+        length = data[offset]
+        if length & 0xC0 == 0xC0:
+            return offset + 2
+        if length == 0:
+            return offset + 1
+        offset += 1 + length
+
+def _decode_name(data, offset):
+    """Read a (possibly compressed) name at ``offset``."""
+    labels = []
+    for _ in range(128):  # bounds pointer loops
+        if offset >= len(data):
+            raise DNSError("truncated name")
+        length = data[offset]
+        if length & 0xC0 == 0xC0:
+            offset = ((length & 0x3F) << 8) | data[offset + 1]
+        elif length == 0:
+            return ".".join(labels).lower()
+        else:
+            labels.append(data[offset + 1:offset + 1 + length].decode("ascii", "replace"))
+            offset += 1 + length
+    raise DNSError("name pointer loop")
+
+def parse_response(data, qid):
+    """
+    (rcode, truncated, answers, ttl) from a response, where answers are
+    (type, value) pairs for the A, CNAME and TXT records in the answer
+    section, in order. Each TXT record's character-strings are joined, as
+    RFC 7208 asks for SPF. ``ttl`` is the smallest answer TTL, or the SOA
+    minimum for negative answers.
+    """
+    if len(data) < 12:
+        raise DNSError("short response")
+    rid, flags, qdcount, ancount, nscount, _ = struct.unpack("!HHHHHH", data[:12])
+    if rid != qid:
+        raise DNSError("mismatched id")
+    rcode = flags & 0x000F
+    truncated = bool(flags & 0x0200)
+    offset = 12
+    for _ in range(qdcount):
+        offset = _read_name(data, offset) + 4
+
+    records, ttls = [], []
+    negative_ttl = None
+    for index in range(ancount + nscount):
+        offset = _read_name(data, offset)
+        rtype, _, ttl, rdlength = struct.unpack("!HHIH", data[offset:offset + 10])
+        offset += 10
+        rdata = data[offset:offset + rdlength]
+        offset += rdlength
+        if index < ancount:
+            if rtype == QTYPE_TXT:
+                strings, pos = [], 0
+                while pos < len(rdata):
+                    size = rdata[pos]
+                    strings.append(rdata[pos + 1:pos + 1 + size])
+                    pos += 1 + size
+                records.append((rtype, b"".join(strings).decode("utf-8", "replace")))
+            elif rtype == QTYPE_CNAME:
+                records.append((rtype, _decode_name(data, offset - rdlength)))
+            elif rtype == QTYPE_A and rdlength == 4:
+                records.append((rtype, socket.inet_ntoa(rdata)))
+            else:
+                continue
+            ttls.append(ttl)
+        elif rtype == QTYPE_SOA and len(rdata) >= 4:
+            minimum = struct.unpack("!I", rdata[-4:])[0]
+            negative_ttl = min(ttl, minimum)
+    if records:
+        ttl = min(ttls)
+    else:
+        ttl = negative_ttl if negative_ttl is not None else NEGATIVE_TTL
+    return rcode, truncated, records, ttl
+
+class _UDPQuery(asyncio.DatagramProtocol):
+    def __init__(self, qid):
+        self.qid = qid
+        self.future = asyncio.get_running_loop().create_future()
+
+    def datagram_received(self, data, addr):
+        # Ignore stray packets; only our id completes the query
+        if not self.future.done() and data[:2] == struct.pack("!H", self.qid):
+            self.future.set_result(data)
+
+    def error_received(self, exc):
+        if not self.future.done():
+            self.future.set_exception(exc)
+
+class DNSResolver:
+    """
+    Asynchronous lookups against one DNS server. Queries go over UDP
+    (a fresh socket and random id per attempt) and fall back to TCP when the
+    answer is truncated. Each attempt has a timeout; a failed query is resent
+    up to ``retries`` more times, with growing waits in between. At most
+    ``concurrency`` queries are in flight. Answers, including NXDOMAIN/NODATA, are cached for their
+    TTL, and concurrent lookups of the same name share one query.
+    """
+
+    def __init__(self, server=None, timeout=DNS_TIMEOUT, retries=DNS_RETRIES,
+                 concurrency=DNS_CONCURRENCY):
+        self.host, self.port = parse_server(server or default_nameserver())
+        self.timeout = timeout
+        self.retries = retries
+        self.semaphore = asyncio.Semaphore(concurrency)
+        self.cache = {}
+        self.pending = {}
+        self.queries = 0
+        self.hits = 0
+        self.tcp = 0
+
+    async def _udp(self, packet, qid):
+        loop = asyncio.get_running_loop()
+        family = socket.AF_INET6 if ":" in self.host else socket.AF_INET
+        transport, protocol = await loop.create_datagram_endpoint(
+            lambda: _UDPQuery(qid), remote_addr=(self.host, self.port), family=family)
+        try:
+            transport.sendto(packet)
+            return await asyncio.wait_for(protocol.future, self.timeout)
+        finally:
+            transport.close()
+
+    async def _tcp(self, packet):
+        self.tcp += 1
+        reader, writer = await asyncio.wait_for(
+            asyncio.open_connection(self.host, self.port), self.timeout)
+        try:
+            writer.write(struct.pack("!H", len(packet)) + packet)
+            await writer.drain()
+            size = struct.unpack("!H", await asyncio.wait_for(reader.readexactly(2), self.timeout))[0]
+            return await asyncio.wait_for(reader.readexactly(size), self.timeout)
+        finally:
+            writer.close()
+
+    async def _query(self, name, qtype):
+        last = None
+        for attempt in range(self.retries + 1):
+            if attempt:
+                await asyncio.sleep(0.2 * 2 ** attempt)
+            qid = random.getrandbits(16)
+            packet = build_query(qid, name, qtype)
+            try:
+                async with self.semaphore:
+                    self.queries += 1
+                    with fase("dns"):
+                        rcode, truncated, records, ttl = parse_response(await self._udp(packet, qid), qid)
+                        if truncated:
+                            rcode, truncated, records, ttl = parse_response(await self._tcp(packet), qid)
+            except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError,
+                    DNSError, struct.error) as e:
+                last = e
+                contar("dns.failed_attempts")
+                continue
+            if rcode in (0, 3):  # NOERROR / NXDOMAIN
+                return rcode, records, ttl
+            last = DNSError(f"rcode {rcode}")  # SERVFAIL, REFUSED...: try again
+        raise DNSError(f"{name}: {last.__class__.__name__} {last}".strip())
+
+    async def resolve(self, name, qtype=QTYPE_A):
+        """
+        (rcode, answers) for ``name``: rcode 3 is NXDOMAIN, and answers are
+        (type, value) pairs, CNAMEs the resolver followed included.
+        """
+        key = (name.strip().rstrip(".").lower(), qtype)
+        entry = self.cache.get(key)
+        if entry and entry[0] > time.monotonic():
+            self.hits += 1
+            contar("dns.cache")
+            return entry[1]
+        if key in self.pending:
+            self.hits += 1
+            contar("dns.cache")
+            return await asyncio.shield(self.pending[key])
+        task = self.pending[key] = asyncio.ensure_future(self._resolve(key))
+        return await asyncio.shield(task)
+
+    async def _resolve(self, key):
+        try:
+            rcode, records, ttl = await self._query(*key)
+        finally:
+            self.pending.pop(key, None)
+        self.cache[key] = (time.monotonic() + min(ttl, MAX_CACHE_TTL), (rcode, records))
+        return rcode, records
+
+    async def txt(self, name):
+        """TXT records of ``name`` (an empty list if there are none)."""
+        _, answers = await self.resolve(name, QTYPE_TXT)
+        return [value for rtype, value in answers if rtype == QTYPE_TXT]
+
+# ---------------------------------------------------------------------------
+# SPF evaluation: include/redirect expansion with a shared cache
+# ---------------------------------------------------------------------------
+SPF_QUALIFIERS = {"+": "pass", "-": "fail", "~": "softfail", "?": "neutral"}
+SPF_DNS_MECHANISMS = ("include", "a", "mx", "ptr", "exists")
+SPF_MECHANISMS = SPF_DNS_MECHANISMS + ("all", "ip4", "ip6")
+SPF_MATCH_ANY = ("ip4:0.0.0.0/0", "ip6:::/0")
+SPF_MODIFIER = re.compile(r"([A-Za-z][\w.-]*)=(.*)")
+
+# lookups: DNS-querying terms in the fully expanded tree
+# qualifier: what a sender that matches nothing else gets ("+", "-", "~", "?")
+# via: the term chain that decided the qualifier
+# errors: permerror/temperror conditions found anywhere in the tree
+SPFResult = namedtuple("SPFResult", "lookups qualifier via errors")
+
+def is_domain_spec(name):
+    """Whether an include:/redirect= target is a name that can be looked up."""
+    try:
+        encode_name(name)
+    except DNSError:
+        return False
+    return True
+
+def is_spf_record(record):
+    return record.lower().split()[:1] == ["v=spf1"]
+
+class SPFEvaluator:
+    """
+    Expands include: and redirect= and works out, for the whole tree, the
+    number of DNS lookups and the qualifier that decides for an unknown sender.
+    An include only matches when the included record passes everything, so an
+    include whose tree ends in +all makes the parent permissive too.
+
+    Results are memoized per domain for the whole run, so the include trees
+    shared by thousands of domains (_spf.google.com, spf.protection.outlook.com)
+    are fetched and evaluated once. Lookup counts are those of the subtree,
+    which doesn't depend on who includes it.
+    """
+
+    def __init__(self, resolver):
+        self.resolver = resolver
+        self.cache = {}
+        self.waits = {}  # domain -> includes its evaluation is waiting on
+        self.evaluated = 0
+
+    def _reaches(self, start, target):
+        stack, seen = [start], set()
+        while stack:
+            node = stack.pop()
+            if node == target:
+                return True
+            if node not in seen:
+                seen.add(node)
+                stack.extend(self.waits.get(node, ()))
+        return False
+
+    async def evaluate(self, domain, parent=None):
+        """SPFResult for the SPF record published at ``domain``."""
+        domain = domain.strip().rstrip(".").lower()
+        # Waiting on a domain that (transitively) waits on us would deadlock:
+        # that's an include loop
+        if parent is not None and self._reaches(domain, parent):
+            return SPFResult(0, "?", "loop", (f"permerror: include loop through {domain}",))
+        task = self.cache.get(domain)
+        if task is None:
+            task = self.cache[domain] = asyncio.ensure_future(self._evaluate_domain(domain))
+        if parent is None:
+            return await asyncio.shield(task)
+        waiting = self.waits.setdefault(parent, set())
+        waiting.add(domain)
+        try:
+            return await asyncio.shield(task)
+        finally:
+            waiting.discard(domain)
+
+    async def _evaluate_domain(self, domain):
+        self.evaluated += 1
+        try:
+            records = [r for r in await self.resolver.txt(domain) if is_spf_record(r)]
+        except DNSError as e:
+            return SPFResult(0, "?", "temperror", (f"temperror: {e}",))
+        if not records:
+            return SPFResult(0, "?", "none", (f"permerror: no SPF record at {domain}",))
+        if len(records) > 1:
+            return SPFResult(0, "?", "permerror", (f"permerror: {len(records)} SPF records at {domain}",))
+        return await self.evaluate_record(records[0], domain)
+
+    async def evaluate_record(self, record, domain):
+        lookups = 0
+        errors = []
+        qualifier = via = redirect = None
+        for term in record.split()[1:]:
+            modifier = SPF_MODIFIER.fullmatch(term)
+            if modifier:
+                if modifier.group(1).lower() == "redirect":
+                    redirect = modifier.group(2)
+                continue
+            qual = term[0] if term[0] in SPF_QUALIFIERS else "+"
+            body = term[1:] if term[0] in SPF_QUALIFIERS else term
+            mechanism, _, argument = body.partition(":")
+            mechanism = mechanism.split("/")[0].lower()
+            if mechanism not in SPF_MECHANISMS:
+                errors.append(f"permerror: unknown mechanism '{term}' at {domain}")
+                continue
+            if mechanism == "all" or body.lower() in SPF_MATCH_ANY:
+                qualifier, via = qual, term
+                break
+            if mechanism not in SPF_DNS_MECHANISMS:
+                continue
+            lookups += 1
+            if mechanism != "include":
+                continue
+            if "%" in argument:
+                errors.append(f"include:{argument} uses macros, not expanded")
+                continue
+            if not is_domain_spec(argument):
+                # RFC 7208 4.6/5.2: a malformed target is a permerror for this record
+                errors.append(f"permerror: invalid include target '{argument}' at {domain}")
+                return SPFResult(lookups, "?", "permerror", tuple(dict.fromkeys(errors)))
+            included = await self.evaluate(argument, domain)
+            lookups += included.lookups
+            errors.extend(included.errors)
+            if included.qualifier == "+":
+                qualifier, via = qual, f"{term} > {included.via}"
+                break
+        if qualifier is None and redirect:
+            lookups += 1
+            if "%" in redirect:
+                errors.append(f"redirect={redirect} uses macros, not expanded")
+                qualifier, via = "?", f"redirect={redirect}"
+            elif not is_domain_spec(redirect):
+                errors.append(f"permerror: invalid redirect target '{redirect}' at {domain}")
+                qualifier, via = "?", "permerror"
+            else:
+                target = await self.evaluate(redirect, domain)
+                lookups += target.lookups
+                errors.extend(target.errors)
+                qualifier, via = target.qualifier, f"redirect={redirect} > {target.via}"
+        if qualifier is None:
+            qualifier, via = "?", "no all (defaults to neutral)"
+        return SPFResult(lookups, qualifier, via, tuple(dict.fromkeys(errors)))
+
+def check_spf_evaluation(result):
+    """Analyze an expanded SPF tree, in the same (message, secure) form as check_spf_record."""
+    qualifier = f"{result.qualifier}all ({SPF_QUALIFIERS[result.qualifier]}) via {result.via}"
+    if result.lookups > SPF_LOOKUP_LIMIT:
+        return (f"{result.lookups} DNS lookups exceed the limit of {SPF_LOOKUP_LIMIT}: receivers return permerror.", False)
+    if any(error.startswith("permerror") for error in result.errors):
+        return (f"SPF tree has errors: {'; '.join(result.errors)}", False)
+    if result.qualifier == "-":
+        return (f"Effective policy is {qualifier}.", True)
+    if result.qualifier == "+":
+        return (f"Effective policy passes every sender: {qualifier}.", False)
+    return (f"Effective policy does not reject unknown senders: {qualifier}.", False)
+
+def _first_with(records, marker):
+    for record in records:
+        if marker in record:
+            return record
+    return None
+
+async def lookup_records(resolver, domain):
+    """(spf_record, dmarc_record), like check_spf/check_dmarc but in-process."""
+    spf, dmarc = await asyncio.gather(resolver.txt(domain), resolver.txt(f"_dmarc.{domain}"))
+    return _first_with(spf, "v=spf1"), _first_with(dmarc, "v=DMARC1")
+
+def print_report(domain, spf_record, dmarc_record, spf_result=None):
+    spf_analysis, spf_secure = check_spf_record(spf_record)
+    dmarc_analysis, dmarc_secure = check_dmarc_record(dmarc_record)
+    if spf_result is not None:
+        tree_analysis, tree_secure = check_spf_evaluation(spf_result)
+        spf_secure = spf_secure and tree_secure
+
+    # Print organized information with color
+    print(f"Domain: {domain}")
+    print(f"SPF Record: {colorize(spf_record if spf_record else 'None', spf_secure)}")
+    print(f"  Analysis: {colorize(spf_analysis, spf_secure)}")
+    if spf_result is not None:
+        lookups_ok = spf_result.lookups <= SPF_LOOKUP_LIMIT
+        print(f"  Lookups: {colorize(f'{spf_result.lookups}/{SPF_LOOKUP_LIMIT}', lookups_ok)}")
+        print(f"  Expanded: {colorize(tree_analysis, tree_secure)}")
+    print(f"  Vulnerable: {colorize('Yes' if not spf_secure else 'No', spf_secure)}")
+    print(f"DMARC Record: {colorize(dmarc_record if dmarc_record else 'None', dmarc_secure)}")
+    print(f"  Analysis: {colorize(dmarc_analysis, dmarc_secure)}")
+    print(f"  Vulnerable: {colorize('Yes' if not dmarc_secure else 'No', dmarc_secure)}\n")
+
+async def check_domains(domains, server=None, timeout=DNS_TIMEOUT, retries=DNS_RETRIES,
+                        concurrency=DNS_CONCURRENCY, expand_spf=True):
+    """
+    Look up every domain concurrently and print the reports in input order,
+    each one as soon as it and all the ones before it are done. Only a
+    window of domains is in flight at once, so long lists stay bounded.
+    """
+    resolver = DNSResolver(server, timeout, retries, concurrency)
+    evaluator = SPFEvaluator(resolver) if expand_spf else None
+    window = deque()
+    failures = 0
+    started = time.monotonic()
+    domains = iter(domains)
+
+    async def one(domain):
+        try:
+            spf_record, dmarc_record = await lookup_records(resolver, domain)
+        except DNSError as e:
+            return (None, None, None), e
+        # The TXT answer is cached, so this costs no extra query for the domain itself
+        spf_result = await evaluator.evaluate(domain) if evaluator and spf_record else None
+        return (spf_record, dmarc_record, spf_result), None
+
+    def fill():
+        while len(window) < concurrency * 2:
+            domain = next(domains, None)
+            if domain is None:
+                return
+            domain = domain.strip()
+            if domain:
+                window.append((domain, asyncio.ensure_future(one(domain))))
+
+    fill()
+    while window:
+        domain, task = window.popleft()
+        (spf_record, dmarc_record, spf_result), error = await task
+        fill()
+        contar("itens.domains")
+        if error is not None:
+            failures += 1
+            contar("itens.failed")
+            print(colorize(f"Domain: {domain}\n  DNS lookup failed: {error}\n", False))
+            continue
+        print_report(domain, spf_record, dmarc_record, spf_result)
+    evaluated = f"{evaluator.evaluated} SPF records evaluated, " if evaluator else ""
+    contar("dns.queries", resolver.queries)
+    contar("dns.tcp", resolver.tcp)
+    if evaluator:
+        contar("itens.spf_evaluated", evaluator.evaluated)
+    print(f"[INFO] {resolver.queries} DNS queries ({resolver.tcp} over TCP), {resolver.hits} cache hits, "
+          f"{evaluated}{failures} failed domain(s) in {time.monotonic() - started:.1f}s", file=sys.stderr)
+
 def main():
     parser = argparse.ArgumentParser(description="Check and analyze SPF and DMARC records of a domain.")
     parser.add_argument("-d", "--domain", type=str, help="The domain to check.")
     parser.add_argument("-l", "--list", type=str, help="A file containing a list of domains to check.")
+    parser.add_argument("--resolver", choices=("async", "dig"), default="async",
+                        help="In-process concurrent resolver (default) or one dig subprocess per record.")
+    parser.add_argument("--dns-server", metavar="HOST[:PORT]",
+                        help="DNS server for the async resolver (default: first nameserver in /etc/resolv.conf).")
+    parser.add_argument("--concurrency", type=int, default=DNS_CONCURRENCY,
+                        help=f"Maximum DNS queries in flight (default: {DNS_CONCURRENCY}).")
+    parser.add_argument("--timeout", type=float, default=DNS_TIMEOUT,
+                        help=f"Timeout per DNS attempt in seconds (default: {DNS_TIMEOUT:g}).")
+    parser.add_argument("--retries", type=int, default=DNS_RETRIES,
+                        help=f"Resends per query after the first attempt (default: {DNS_RETRIES}).")
+    parser.add_argument("--no-spf-expand", action="store_true",
+                        help="Only analyze the top-level SPF record; don't follow include:/redirect=.")
+    instrumentacao.adicionar_argumentos(parser)
     args = parser.parse_args()
+    if args.concurrency < 1:
+        parser.error("--concurrency must be >= 1")
+    if args.retries < 0:
+        parser.error("--retries must be >= 0")
+    instrumentacao.configurar(args)
 
     if args.domain:
         domains = [args.domain]
@@ -82,20 +607,14 @@ def main():
         print(colorize("No domain or list provided.", False))
         return
 
+    if args.resolver == "async":
+        asyncio.run(check_domains(domains, args.dns_server, args.timeout, args.retries,
+                                  args.concurrency, not args.no_spf_expand))
+        return
+
     for domain in domains:
-        spf_record = check_spf(domain)
-        dmarc_record = check_dmarc(domain)
-        spf_analysis, spf_secure = check_spf_record(spf_record)
-        dmarc_analysis, dmarc_secure = check_dmarc_record(dmarc_record)
-
-        # Print organized information with color
-        print(f"Domain: {domain}")
-        print(f"SPF Record: {colorize(spf_record if spf_record else 'None', spf_secure)}")
-        print(f"  Analysis: {colorize(spf_analysis, spf_secure)}")
-        print(f"  Vulnerable: {colorize('Yes' if not spf_secure else 'No', spf_secure)}")
-        print(f"DMARC Record: {colorize(dmarc_record if dmarc_record else 'None', dmarc_secure)}")
-        print(f"  Analysis: {colorize(dmarc_analysis, dmarc_secure)}")
-        print(f"  Vulnerable: {colorize('Yes' if not dmarc_secure else 'No', dmarc_secure)}\n")
+        print_report(domain, check_spf(domain), check_dmarc(domain))
+        contar("itens.domains")
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,434 @@
+#!/usr/bin/env python3
+"""
+takeover.py ― Subdomain takeover em paralelo (substitui subdomain.sh e crt.sh).
+
+Para cada host, uma consulta DNS (a resposta do tipo A já traz a cadeia de
+CNAMEs e diz se o destino final existe) e uma única requisição HTTP, que
+guarda status e corpo juntos. O corpo é comparado com uma tabela de
+assinaturas de serviços conhecidos (S3, GitHub Pages, Heroku, Azure...).
+A requisição HTTP usa o mesmo resultado DNS, sem consultar de novo.
+
+Os hosts vêm de uma wordlist (palavra.dominio, como no subdomain.sh), de uma
+lista pronta e/ou dos logs de certificate transparency do crt.sh. O JSON do
+crt.sh é lido em fluxo, objeto a objeto, e cada nome novo já entra na fila
+de verificação enquanto o resto ainda está chegando.
+
+Uso:
+    python takeover.py -d exemplo.com -w alvos.txt
+    python takeover.py -d exemplo.com --ct crt.sh --ct-out subdominios.txt
+    python takeover.py -d exemplo.com --ct dump_crtsh.json -c 300 --jsonl achados.jsonl
+    python takeover.py -d exemplo.com --ct crt.sh --ct-only > subdominios.txt
+"""
+
+import argparse
+import asyncio
+import codecs
+import json
+import re
+import sys
+import time
+from collections import namedtuple
+from urllib.parse import quote
+
+import instrumentacao
+from cliente_http import PROBE_ERRORS, ConnectionPool, DNSCache
+from instrumentacao import contar, fase
+from spoof import DNS_RETRIES, QTYPE_A, QTYPE_CNAME, DNSError, DNSResolver, encode_name
+
+CONCURRENCY = 200       # hosts verificados ao mesmo tempo
+TIMEOUT = 8.0           # por requisição HTTP
+BODY_MAX = 1 << 16      # bytes do corpo guardados para as assinaturas
+JSON_OBJECT_MAX = 1 << 20
+CRTSH_URL = "https://crt.sh/?q={}&output=json"
+SUSPEITOS = (401, 403, 404, 500)  # os status que o subdomain.sh tratava como alerta
+
+RED = "\033[31m"
+VERDE = "\033[32m"
+AMARELO = "\033[33m"
+AZUL = "\033[34m"
+RESET = "\033[0m"
+
+# serviço, sufixos de CNAME, texto da página de "não existe"
+Assinatura = namedtuple("Assinatura", "servico cnames corpo")
+ASSINATURAS = [
+    Assinatura("AWS S3", ("s3.amazonaws.com", "s3-website", ".amazonaws.com"),
+               re.compile(r"NoSuchBucket|The specified bucket does not exist")),
+    Assinatura("GitHub Pages", ("github.io",), re.compile(r"There isn't a GitHub Pages site here")),
+    Assinatura("Heroku", ("herokuapp.com", "herokudns.com", "herokussl.com"),
+               re.compile(r"No such app|There's nothing here, yet|herokucdn\.com/error-pages/no-such-app")),
+    Assinatura("Azure", ("azurewebsites.net", "cloudapp.net", "cloudapp.azure.com", "trafficmanager.net",
+                         "blob.core.windows.net", "azureedge.net"),
+               re.compile(r"404 Web Site not found|The resource you are looking for has been removed")),
+    Assinatura("Shopify", ("myshopify.com",), re.compile(r"Sorry, this shop is currently unavailable")),
+    Assinatura("Fastly", ("fastly.net",), re.compile(r"Fastly error: unknown domain")),
+    Assinatura("Pantheon", ("pantheonsite.io",), re.compile(r"The gods are wise, but do not know of the site")),
+    Assinatura("Tumblr", ("domains.tumblr.com",),
+               re.compile(r"Whatever you were looking for doesn't currently exist at this address")),
+    Assinatura("Ghost", ("ghost.io",), re.compile(r"The thing you were looking for is no longer here")),
+    Assinatura("Surge", ("surge.sh",), re.compile(r"project not found")),
+    Assinatura("Bitbucket", ("bitbucket.io",), re.compile(r"Repository not found")),
+    Assinatura("Zendesk", ("zendesk.com",), re.compile(r"Help Center Closed")),
+    Assinatura("Netlify", ("netlify.app", "netlify.com"), re.compile(r"Not Found - Request ID")),
+    Assinatura("Webflow", ("proxy.webflow.com", "proxy-ssl.webflow.com"),
+               re.compile(r"The page you are looking for doesn't exist or has been moved")),
+    # As mensagens que o subdomain.sh procurava, para qualquer CNAME
+    Assinatura("genérica", (), re.compile(r"No Such Bucket|There's nothing here yet|Domain not found|404 Not Found", re.I)),
+]
+
+Resultado = namedtuple("Resultado", "host nivel motivo cnames status servico")
+
+
+# ---------------------------------------------------------------------------
+# Certificate transparency: JSON do crt.sh em fluxo
+# ---------------------------------------------------------------------------
+class JsonArrayStream:
+    """
+    Lê um array JSON de objetos aos pedaços e devolve cada elemento assim que
+    ele fecha. Só o objeto em andamento fica no buffer.
+    """
+
+    def __init__(self):
+        self.decoder = json.JSONDecoder()
+        self.utf8 = codecs.getincrementaldecoder("utf-8")("replace")
+        self.buffer = ""
+        self.started = False
+
+    def feed(self, data, final=False):
+        self.buffer += self.utf8.decode(data, final)
+        found = []
+        pos = 0
+        buffer = self.buffer
+        while True:
+            while pos < len(buffer) and buffer[pos] in " \t\r\n,":
+                pos += 1
+            if pos >= len(buffer):
+                break
+            if not self.started:
+                if buffer[pos] != "[":
+                    raise ValueError("o JSON não começa com um array")
+                self.started = True
+                pos += 1
+                continue
+            if buffer[pos] == "]":
+                pos = len(buffer)
+                break
+            try:
+                item, end = self.decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                # Objeto ainda incompleto: espera o próximo pedaço
+                if final or len(buffer) - pos > JSON_OBJECT_MAX:
+                    raise ValueError(f"JSON inválido perto do byte {pos}")
+                break
+            found.append(item)
+            pos = end
+        self.buffer = buffer[pos:]
+        return found
+
+
+def nomes_do_certificado(item, dominio):
+    """Nomes de um registro do crt.sh, sem o "*." e só os que terminam no domínio."""
+    for campo in ("name_value", "common_name"):
+        for nome in str(item.get(campo) or "").split("\n"):
+            nome = nome.strip().lower().rstrip(".")
+            if nome.startswith("*."):
+                nome = nome[2:]
+            if nome == dominio or nome.endswith("." + dominio):
+                yield nome
+
+
+async def ler_ct(fonte, dominio, pool):
+    """Pedaços de bytes do JSON de CT: arquivo local, '-' (stdin) ou URL ('crt.sh' é o endpoint oficial)."""
+    if fonte == "crt.sh":
+        fonte = CRTSH_URL.format(quote(f"%.{dominio}"))
+    if fonte.startswith(("http://", "https://")):
+        resposta = await pool.request(fonte)
+        if resposta.status != 200:
+            resposta.close()
+            raise OSError(f"{fonte} respondeu {resposta.status}")
+        async for bloco in resposta.iter_body():
+            yield bloco
+        return
+    arquivo = sys.stdin.buffer if fonte == "-" else open(fonte, "rb")
+    try:
+        for bloco in iter(lambda: arquivo.read(1 << 16), b""):
+            yield bloco
+            await asyncio.sleep(0)  # deixa as verificações andarem enquanto lê
+    finally:
+        if arquivo is not sys.stdin.buffer:
+            arquivo.close()
+
+
+# ---------------------------------------------------------------------------
+# Verificação
+# ---------------------------------------------------------------------------
+class ResolverDNS(DNSCache):
+    """
+    Endereços para o pool HTTP a partir da mesma consulta que trouxe os
+    CNAMEs: o DNSResolver guarda a resposta e junta consultas simultâneas,
+    então cada host custa uma consulta só.
+    """
+
+    def __init__(self, resolver):
+        super().__init__()
+        self.resolver = resolver
+
+    async def resolve(self, host):
+        try:
+            rcode, respostas = await self.resolver.resolve(host)
+        except DNSError as e:
+            raise OSError(str(e)) from e
+        enderecos = [valor for tipo, valor in respostas if tipo == QTYPE_A]
+        if not enderecos:
+            raise OSError(f"{host} não resolve (rcode {rcode})")
+        return enderecos
+
+
+def classificar(host, rcode, cnames, status, corpo):
+    """Resultado de um host a partir do DNS e da resposta HTTP."""
+    texto = corpo.decode("utf-8", "ignore") if corpo else ""
+    destino = cnames[-1] if cnames else ""
+    for assinatura in ASSINATURAS:
+        do_servico = any(sufixo in destino for sufixo in assinatura.cnames)
+        if assinatura.cnames and not do_servico:
+            continue
+        if not assinatura.cnames and not cnames:
+            continue  # a genérica, como no subdomain.sh, só vale com CNAME
+        if texto and assinatura.corpo.search(texto):
+            nivel = "VULNERAVEL" if do_servico else "ALERTA"
+            return Resultado(host, nivel, "o host demonstrou mensagens vulneráveis a takeover",
+                             cnames, status, assinatura.servico)
+    if cnames and rcode == 3:
+        servico = next((a.servico for a in ASSINATURAS if any(s in destino for s in a.cnames)), "")
+        return Resultado(host, "VULNERAVEL", f"CNAME pendente: {destino} não existe (NXDOMAIN)",
+                         cnames, status, servico)
+    if status in SUSPEITOS:
+        motivo = f"pode estar vulnerável (HTTP {status})"
+        if not cnames:
+            motivo += "; o CNAME não foi encontrado"
+        return Resultado(host, "ALERTA", motivo, cnames, status, "")
+    if status is None and not cnames:
+        motivo = "não resolve" if rcode == 3 else "sem resposta HTTP"
+        return Resultado(host, "OK", motivo, cnames, status, "")
+    return Resultado(host, "OK", "subdomínio parece não vulnerável", cnames, status, "")
+
+
+class Verificador:
+    """
+    Verifica hosts com ``concurrency`` em paralelo. A fila é limitada, então
+    os hosts podem vir de um gerador que ainda está lendo o crt.sh.
+    """
+
+    def __init__(self, resolver, concurrency=CONCURRENCY, timeout=TIMEOUT, scheme="http",
+                 verify_ssl=False, emit=print):
+        self.resolver = resolver
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self.scheme = scheme
+        self.emit = emit
+        self.pool = ConnectionPool(ResolverDNS(resolver), timeout, verify_ssl)
+        self.hosts = 0
+        self.niveis = {}
+
+    async def _http(self, host):
+        """(status, primeiros BODY_MAX bytes do corpo) com uma requisição só, ou (None, b"")."""
+        try:
+            resposta = await self.pool.request(f"{self.scheme}://{host}/")
+        except PROBE_ERRORS:
+            return None, b""
+        guardado = []
+
+        async def consumir():
+            total = 0
+            async for bloco in resposta.iter_body():
+                if total < BODY_MAX:
+                    guardado.append(bloco[:BODY_MAX - total])
+                total += len(bloco)
+                if total >= BODY_MAX:
+                    break  # o resto não muda o veredito; a conexão é descartada
+
+        try:
+            await asyncio.wait_for(consumir(), self.timeout)
+        except PROBE_ERRORS:
+            pass
+        finally:
+            resposta.close()
+        return resposta.status, b"".join(guardado)
+
+    async def verificar(self, host):
+        # A consulta sai já; o HTTP, ao resolver o host, espera essa mesma consulta
+        dns = asyncio.ensure_future(self.resolver.resolve(host))
+        status, corpo = await self._http(host)
+        try:
+            rcode, respostas = await dns
+        except DNSError:
+            rcode, respostas = None, []
+        cnames = [valor for tipo, valor in respostas if tipo == QTYPE_CNAME]
+        with fase("parse"):
+            return classificar(host, rcode, cnames, status, corpo)
+
+    async def _worker(self, fila):
+        while True:
+            host = await fila.get()
+            try:
+                if host is None:
+                    return
+                resultado = await self.verificar(host)
+                self.hosts += 1
+                self.niveis[resultado.nivel] = self.niveis.get(resultado.nivel, 0) + 1
+                contar("itens.hosts")
+                contar(f"itens.{resultado.nivel.lower()}")
+                self.emit(resultado)
+            finally:
+                fila.task_done()
+
+    async def run(self, hosts):
+        fila = asyncio.Queue(self.concurrency * 2)
+        workers = [asyncio.ensure_future(self._worker(fila)) for _ in range(self.concurrency)]
+        try:
+            async for host in hosts:
+                await fila.put(host)
+            for _ in workers:
+                await fila.put(None)
+            await asyncio.gather(*workers)
+        finally:
+            for worker in workers:
+                worker.cancel()
+            self.pool.close()
+
+
+def mostrar(resultado):
+    """Mesmas mensagens do subdomain.sh, uma linha por host."""
+    cor = {"VULNERAVEL": RED, "ALERTA": AMARELO}.get(resultado.nivel, VERDE)
+    if resultado.nivel == "OK":
+        print(f"{cor}[{resultado.host}] {resultado.motivo}{RESET}", flush=True)
+        return
+    extra = f" CNAME = {' -> '.join(resultado.cnames)}" if resultado.cnames else ""
+    servico = f" [{resultado.servico}]" if resultado.servico else ""
+    print(f"{cor}[{resultado.nivel}] [{resultado.host}] {resultado.motivo}{servico}{extra}{RESET}", flush=True)
+
+
+def nome_valido(host):
+    """Nomes que não vão para o DNS (rótulo vazio ou longo demais) são descartados com aviso."""
+    try:
+        encode_name(host)
+    except DNSError as e:
+        print(f"{AMARELO}[AVISO] {e}: ignorado{RESET}", file=sys.stderr)
+        return False
+    return True
+
+
+async def gerar_hosts(args, pool, vistos, ct_saida):
+    """Hosts da wordlist, da lista e do CT, sem repetir, na ordem em que chegam."""
+    dominio = args.domain.lower().rstrip(".") if args.domain else ""
+    if args.wordlist:
+        with open(args.wordlist, encoding="utf-8", errors="ignore") as f:
+            for palavra in f:
+                palavra = palavra.strip().lower()
+                host = f"{palavra}.{dominio}" if dominio else palavra
+                if palavra and host not in vistos:
+                    vistos.add(host)
+                    if nome_valido(host):
+                        yield host
+    if args.list:
+        with open(args.list, encoding="utf-8", errors="ignore") as f:
+            for linha in f:
+                host = linha.strip().lower().rstrip(".")
+                if host and host not in vistos:
+                    vistos.add(host)
+                    if nome_valido(host):
+                        yield host
+    if args.ct:
+        leitor = JsonArrayStream()
+        async for bloco in ler_ct(args.ct, dominio, pool):
+            with fase("parse"):
+                itens = leitor.feed(bloco)
+            contar("itens.certificados", len(itens))
+            for item in itens:
+                for host in nomes_do_certificado(item, dominio):
+                    if host not in vistos:
+                        vistos.add(host)
+                        if not nome_valido(host):
+                            continue
+                        if ct_saida:
+                            ct_saida.write(host + "\n")
+                        yield host
+        leitor.feed(b"", final=True)
+
+
+async def principal(args):
+    resolver = DNSResolver(args.dns_server, args.dns_timeout, args.retries, args.concurrency)
+    vistos = set()
+    jsonl = open(args.jsonl, "w", encoding="utf-8") if args.jsonl else None
+    ct_saida = open(args.ct_out, "w", encoding="utf-8") if args.ct_out else None
+
+    def emitir(resultado):
+        with fase("escrita"):
+            if resultado.nivel != "OK" or not args.only_vuln:
+                mostrar(resultado)
+            if jsonl:
+                jsonl.write(json.dumps(resultado._asdict(), ensure_ascii=False) + "\n")
+
+    inicio = time.monotonic()
+    verificador = Verificador(resolver, args.concurrency, args.timeout, args.scheme, emit=emitir)
+    try:
+        if args.ct_only:
+            if ct_saida is None:
+                ct_saida = sys.stdout
+            async for _ in gerar_hosts(args, verificador.pool, vistos, ct_saida):
+                pass
+        else:
+            await verificador.run(gerar_hosts(args, verificador.pool, vistos, ct_saida))
+    finally:
+        verificador.pool.close()
+        for arquivo in (jsonl, ct_saida):
+            if arquivo not in (None, sys.stdout):
+                arquivo.close()
+    niveis = ", ".join(f"{n} {nivel}" for nivel, n in sorted(verificador.niveis.items()))
+    print(f"{AZUL}[INFO] {len(vistos)} hosts únicos, {verificador.hosts} verificados ({niveis or 'nenhum'}); "
+          f"{resolver.queries} consultas DNS em {time.monotonic() - inicio:.1f}s{RESET}", file=sys.stderr)
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Subdomain takeover em paralelo (CNAME + HTTP + assinaturas).")
+    ap.add_argument("-d", "--domain", help="Domínio alvo (as palavras da wordlist viram palavra.domínio)")
+    ap.add_argument("-w", "--wordlist", help="Wordlist de subdomínios (o alvos.txt do subdomain.sh)")
+    ap.add_argument("-l", "--list", help="Arquivo com hosts completos, um por linha")
+    ap.add_argument("--ct", metavar="FONTE",
+                    help="JSON de certificate transparency: 'crt.sh', uma URL, um arquivo ou '-' (stdin)")
+    ap.add_argument("--ct-out", metavar="ARQ", help="Grava os nomes únicos vindos do CT (o que o crt.sh fazia)")
+    ap.add_argument("--ct-only", action="store_true", help="Só coleta os nomes do CT, sem verificar")
+    ap.add_argument("-c", "--concurrency", type=int, default=CONCURRENCY,
+                    help=f"Hosts verificados ao mesmo tempo (padrão: {CONCURRENCY})")
+    ap.add_argument("--timeout", type=float, default=TIMEOUT, help=f"Timeout HTTP em segundos (padrão: {TIMEOUT:g})")
+    ap.add_argument("--scheme", choices=("http", "https"), default="http", help="Esquema da requisição (padrão: http)")
+    ap.add_argument("--dns-server", metavar="HOST[:PORTA]", help="Servidor DNS (padrão: o do /etc/resolv.conf)")
+    ap.add_argument("--dns-timeout", type=float, default=2.0, help="Timeout por tentativa DNS (padrão: 2)")
+    ap.add_argument("--retries", type=int, default=DNS_RETRIES,
+                    help=f"Reenvios por consulta DNS após a primeira tentativa (padrão: {DNS_RETRIES})")
+    ap.add_argument("--only-vuln", action="store_true", help="Mostra só ALERTA/VULNERAVEL")
+    ap.add_argument("--jsonl", metavar="ARQ", help="Grava todos os resultados em JSONL")
+    instrumentacao.adicionar_argumentos(ap)
+    args = ap.parse_args()
+    instrumentacao.configurar(args)
+
+    if not (args.wordlist or args.list or args.ct):
+        ap.error("informe -w, -l e/ou --ct")
+    if (args.wordlist or args.ct) and not args.domain:
+        ap.error("-w e --ct precisam de -d/--domain")
+    if args.concurrency < 1:
+        ap.error("--concurrency precisa ser >= 1")
+    if args.retries < 0:
+        ap.error("--retries precisa ser >= 0")
+
+    print(f"{AZUL} \n\n ---SUBDOMAIN TAKEOVER--- \n\n {RESET}", file=sys.stderr)
+    try:
+        asyncio.run(principal(args))
+    except (OSError, ValueError) as e:
+        print(f"{RED}[ERRO] {e}{RESET}", file=sys.stderr)
+        sys.exit(1)
+    except KeyboardInterrupt:
+        sys.exit(130)
+
+
+if __name__ == "__main__":
+    main()